@@ -1,3 +1,4 @@
+import os
 from multi_week_analyzer import MultiWeekAttendanceAnalyzer
 
 def analyze_new_week():
@@ -19,7 +20,7 @@ def analyze_new_week():
         week_id="week_14Sep-18Sep",
         start_date="14-Sep",
         end_date="18-Sep", 
-        excel_file_path=r'Attendance sheets\كشوفات الغياب الاسبوعي 14-09-2025(drive).xlsx',
+        excel_file_path=os.path.join('Attendance sheets', 'كشوفات الغياب الاسبوعي 14-09-2025(drive).xlsx'),
         description="Third week of September 2025 - Continued monitoring"
     )
     
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+from urllib.request import urlopen
+
+
+def sample_paths(base_url):
+    """Request mix built from what the running API reports: weeks, groups, students and aggregates"""
+    with urlopen(f"{base_url}/api/weeks") as response:
+        weeks = [week['week_id'] for week in json.load(response)]
+    with urlopen(f"{base_url}/api/groups") as response:
+        groups = [group['group_id'] for group in json.load(response)]
+
+    paths = ['/api/weeks', '/api/groups', '/api/aggregates', '/api/aggregates?last_weeks=2']
+    for week_id in weeks:
+        paths.append(f"/api/weeks/{week_id}")
+        paths.append(f"/api/weeks/{week_id}/students")
+    for group_id in groups:
+        paths.append(f"/api/groups/{group_id}")
+        paths.append(f"/api/groups/{group_id}?last_weeks=1")
+    for name in ['محمد', 'احمد', 'عبدالله', 'ابراهيم']:
+        paths.append(f"/api/students?q={quote(name)}")
+    return paths
+
+
+async def client(host, port, paths, deadline, latencies, options):
+    """One keep-alive connection sending requests back to back until the deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    i = 0
+    statuses = {}
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+            if options.gzip:
+                lines.append('Accept-Encoding: gzip')
+            if options.revalidate and path in etags:
+                lines.append(f"If-None-Match: {etags[path]}")
+            started = time.perf_counter()
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8'))
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'etag':
+                    etags[path] = value.strip()
+            await reader.readexactly(length)
+
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+    return statuses
+
+
+async def run_load(host, port, paths, connections, duration, options):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        client(host, port, paths, deadline, latencies, options) for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - started
+
+    statuses = {}
+    for result in results:
+        for status, count in result.items():
+            statuses[status] = statuses.get(status, 0) + count
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+        'statuses': statuses,
+    }
+
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urlopen(f"{base_url}/api/weeks"):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"API did not start at {base_url}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the attendance API with the analyzed sample weeks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument('--no-server', action='store_true', help="test an API that is already running")
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    server = None
+    if not args.no_server:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attendance_api.py')
+        server = subprocess.Popen([sys.executable, script, '--host', args.host, '--port', str(args.port)])
+    try:
+        wait_for_server(base_url)
+        paths = sample_paths(base_url)
+        print(f"{len(paths)} distinct requests, {args.connections} connections, {args.duration:.0f}s per scenario\n")
+
+        scenarios = [
+            ('plain', argparse.Namespace(gzip=False, revalidate=False)),
+            ('gzip', argparse.Namespace(gzip=True, revalidate=False)),
+            ('If-None-Match', argparse.Namespace(gzip=True, revalidate=True)),
+        ]
+        for label, options in scenarios:
+            result = asyncio.run(run_load(args.host, args.port, paths, args.connections, args.duration, options))
+            print(f"{label:15} {result['requests_per_second']:9.0f} req/s   "
+                  f"p50 {result['p50_ms']:.2f} ms   p99 {result['p99_ms']:.2f} ms   "
+                  f"statuses {result['statuses']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
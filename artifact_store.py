@@ -0,0 +1,306 @@
+import argparse
+import filecmp
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from PIL import Image
+
+# Week outputs kept in the store: charts, Excel reports and the per-group reports
+ARTIFACT_PATTERNS = ('*.png', '*.xlsx', 'groups/*.xlsx', 'groups/*.html')
+MANIFEST = 'assets.json'
+
+# Zip members that only hold save timestamps (openpyxl writes the current time)
+VOLATILE_MEMBERS = {'docProps/core.xml'}
+
+
+def content_digest(data, suffix):
+    """
+    SHA-256 of an artifact's content
+
+    xlsx files are hashed member by member without their timestamps, so a
+    report with the same cells hashes the same however often it is saved.
+    """
+    if suffix == '.xlsx':
+        digest = hashlib.sha256()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for name in sorted(archive.namelist()):
+                if name in VOLATILE_MEMBERS:
+                    continue
+                digest.update(name.encode('utf-8') + b'\0')
+                digest.update(archive.read(name) + b'\0')
+        return digest.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_image(data, image_format='png', colors=256):
+    """
+    Re-encode a chart as a palette PNG (or lossless WebP)
+
+    Charts use a handful of flat colours plus anti-aliasing, so 256 palette
+    entries keep them visually identical at a fraction of the size. The
+    original bytes are returned if re-encoding does not make them smaller.
+
+    Returns:
+        tuple: (bytes, file suffix)
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        out = io.BytesIO()
+        if image_format == 'webp':
+            image.save(out, 'WEBP', lossless=True, method=6)
+            return out.getvalue(), '.webp'
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        method = Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+        image.quantize(colors=colors, method=method).save(out, 'PNG', optimize=True)
+    encoded = out.getvalue()
+    return (encoded, '.png') if len(encoded) < len(data) else (data, '.png')
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp files are private; stored objects are read like any other output
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _link_or_copy(source, target, link=True):
+    """Hard-link target to source (no extra bytes), copying if link is off or links are not supported"""
+    if os.path.lexists(target):
+        os.remove(target)
+    if link:
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+
+
+def load_manifest(week_dir):
+    path = os.path.join(week_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of the week outputs under weeks/assets/
+
+    Every artifact is stored once, under the SHA-256 of its content, as
+    assets/<2 hex>/<rest of the hash><suffix>; charts are re-encoded when
+    they are first stored. A week directory records its artifacts in
+    assets.json (file -> hash and object) and keeps each file as a hard link
+    to its object (a copy without link_files) so the usual paths keep
+    working. Re-publishing a week whose outputs did not change writes no
+    new objects.
+    """
+
+    def __init__(self, root, image_format='png', link_files=True):
+        self.root = root
+        self.image_format = image_format
+        self.link_files = link_files
+
+    def object_path(self, entry):
+        return os.path.join(self.root, entry['object'])
+
+    def holds(self, path, entry):
+        """True if path is its manifest entry's stored object (the same file, or a copy of it)"""
+        object_path = self.object_path(entry)
+        if not (os.path.exists(path) and os.path.exists(object_path)):
+            return False
+        return os.path.samefile(path, object_path) or filecmp.cmp(path, object_path, shallow=False)
+
+    def put(self, path):
+        """
+        Store one file
+
+        Returns:
+            tuple: (entry dict with hash, object, bytes and source_bytes,
+                bytes newly written to the store)
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        suffix = os.path.splitext(path)[1].lower()
+        digest = content_digest(data, suffix)
+
+        # Images are re-encoded, so the object suffix may differ from the file's
+        stored_suffix = '.webp' if suffix == '.png' and self.image_format == 'webp' else suffix
+        relative = f"{digest[:2]}/{digest[2:]}{stored_suffix}"
+        object_path = os.path.join(self.root, relative)
+        written = 0
+        if not os.path.exists(object_path):
+            if suffix == '.png':
+                data, _ = encode_image(data, self.image_format)
+            _write_atomic(object_path, data)
+            written = len(data)
+        entry = {
+            'hash': digest,
+            'object': relative,
+            'bytes': os.path.getsize(object_path),
+            'source_bytes': os.path.getsize(path),
+        }
+        return entry, written
+
+    def artifacts(self, week_dir):
+        """Files of a week directory that belong in the store (relative, '/'-separated)"""
+        found = []
+        for root, _, files in os.walk(week_dir):
+            for name in files:
+                relative = os.path.relpath(os.path.join(root, name), week_dir).replace(os.sep, '/')
+                if any(fnmatch.fnmatchcase(relative, pattern) and relative.count('/') == pattern.count('/')
+                       for pattern in ARTIFACT_PATTERNS):
+                    found.append(relative)
+        return sorted(found)
+
+    def release(self, week_dir):
+        """
+        Unlink a week's files that are hard links into the store
+
+        Call before regenerating a week: writing through a hard link would
+        change the stored object shared with other weeks. Files the run does
+        not write again are linked back by publish().
+        """
+        for name, entry in load_manifest(week_dir).items():
+            path = os.path.join(week_dir, entry.get('file', name))
+            object_path = self.object_path(entry)
+            if os.path.exists(path) and os.path.exists(object_path) and os.path.samefile(path, object_path):
+                os.remove(path)
+
+    def publish(self, week_dir):
+        """
+        Move a week's artifacts into the store and write its assets.json
+
+        Returns:
+            dict: {'files', 'new_objects', 'new_bytes', 'source_bytes', 'stored_bytes'}
+        """
+        stats = {'files': 0, 'new_objects': 0, 'new_bytes': 0, 'source_bytes': 0, 'stored_bytes': 0}
+
+        artifacts = self.artifacts(week_dir)
+
+        # Files still holding their object are already published: objects are keyed by the
+        # hash of the original chart, so hashing the re-encoded file would store it again.
+        # Files released before a run that did not write them again are linked back.
+        manifest = {}
+        for name, entry in load_manifest(week_dir).items():
+            path = os.path.join(week_dir, entry.get('file', name))
+            if self.holds(path, entry):
+                if self.link_files and not os.path.samefile(path, self.object_path(entry)):
+                    _link_or_copy(self.object_path(entry), path)
+                manifest[name] = entry
+            elif name not in artifacts and not os.path.lexists(path) and os.path.exists(self.object_path(entry)):
+                _link_or_copy(self.object_path(entry), path, self.link_files)
+                manifest[name] = entry
+        published = {entry.get('file', name) for name, entry in manifest.items()}
+        for entry in manifest.values():
+            stats['files'] += 1
+            stats['source_bytes'] += entry['source_bytes']
+            stats['stored_bytes'] += entry['bytes']
+
+        for name in artifacts:
+            if name in published:
+                continue
+            path = os.path.join(week_dir, name)
+            entry, written = self.put(path)
+            # A chart stored as WebP is linked under its new extension
+            file_name = name
+            if entry['object'].endswith('.webp') and name.endswith('.png'):
+                file_name = name[:-len('.png')] + '.webp'
+            if file_name != name:
+                entry['file'] = file_name
+            manifest[name] = entry
+
+            target = os.path.join(week_dir, file_name)
+            if file_name != name:
+                os.remove(path)
+            object_path = self.object_path(entry)
+            linked = os.path.exists(target) and os.path.samefile(target, object_path)
+            if not linked and (self.link_files or not self.holds(target, entry)):
+                _link_or_copy(object_path, target, self.link_files)
+
+            stats['files'] += 1
+            stats['new_objects'] += bool(written)
+            stats['new_bytes'] += written
+            stats['source_bytes'] += entry['source_bytes']
+            stats['stored_bytes'] += entry['bytes']
+
+        with open(os.path.join(week_dir, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        return stats
+
+    def checkout(self, week_dir):
+        """Recreate a week's artifact files from its assets.json (e.g. after a deploy without them)"""
+        manifest = load_manifest(week_dir)
+        for name, entry in manifest.items():
+            target = os.path.join(week_dir, entry.get('file', name))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _link_or_copy(self.object_path(entry), target, self.link_files)
+        return len(manifest)
+
+    def prune(self, week_dirs):
+        """Delete stored objects no week manifest references; returns (objects, bytes) removed"""
+        referenced = {
+            os.path.normpath(entry['object'])
+            for week_dir in week_dirs for entry in load_manifest(week_dir).values()
+        }
+        removed, freed = 0, 0
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.normpath(os.path.relpath(path, self.root)) not in referenced:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+
+def week_directories(base_dir):
+    """Week folders under base_dir (everything except the store itself)"""
+    return [
+        os.path.join(base_dir, name) for name in sorted(os.listdir(base_dir))
+        if os.path.isdir(os.path.join(base_dir, name)) and name != 'assets'
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store week charts and reports once, by content hash")
+    parser.add_argument('command', choices=['publish', 'checkout', 'prune'],
+                        help="publish: move every week's artifacts into the store; checkout: recreate "
+                             "the files from assets.json; prune: delete unreferenced objects")
+    parser.add_argument('--base-dir', default='weeks')
+    parser.add_argument('--image-format', choices=['png', 'webp'], default='png',
+                        help="encoding of newly stored charts (default: palette PNG)")
+    parser.add_argument('--no-links', action='store_true',
+                        help="copy the stored files into the week folders instead of hard-linking them")
+    args = parser.parse_args()
+
+    store = ArtifactStore(os.path.join(args.base_dir, 'assets'), args.image_format, not args.no_links)
+    week_dirs = week_directories(args.base_dir)
+    if args.command == 'publish':
+        for week_dir in week_dirs:
+            stats = store.publish(week_dir)
+            print(f"{os.path.basename(week_dir)}: {stats['files']} files, {stats['source_bytes'] / 1e6:.2f} MB -> "
+                  f"{stats['stored_bytes'] / 1e6:.2f} MB, {stats['new_objects']} new objects ({stats['new_bytes'] / 1e6:.2f} MB)")
+    elif args.command == 'checkout':
+        for week_dir in week_dirs:
+            print(f"{os.path.basename(week_dir)}: {store.checkout(week_dir)} files")
+    else:
+        removed, freed = store.prune(week_dirs)
+        print(f"Removed {removed} unreferenced objects ({freed / 1e6:.2f} MB)")
@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from attendance_history import AttendanceHistory, load_week_students
+from group_registry import GroupRegistry, load_week_group_stats
+from student_search import build_search_index, search
+from weeks_index import WeeksIndex
+
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 512
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+class NotFound(Exception):
+    pass
+
+
+class AttendanceStore:
+    """
+    Read-only view over the analyzer's stored data
+
+    Reads weeks_index.json (with its journal) and the files saved under
+    weeks/ (data, student records, group registry). Everything is reloaded
+    when the index changes on disk, i.e. after a new week has been analyzed
+    and saved.
+    """
+
+    def __init__(self, index_path='weeks_index.json', base_dir='weeks'):
+        self.index_path = index_path
+        self.weeks_index = WeeksIndex(index_path)
+        self.base_dir = base_dir
+        self.generation = 0
+        self._mtime = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """Reload the stored data if the weeks index changed; returns True if it did"""
+        mtime = self.weeks_index.mtime()
+        if mtime == self._mtime and self.generation:
+            return False
+
+        self._mtime = mtime
+        self.generation += 1
+        self.weeks_data = {}
+        if mtime is not None:
+            self.weeks_data = self.weeks_index.load()
+        self.group_registry = GroupRegistry(os.path.join(self.base_dir, 'group_registry.json')).load()
+        self._history = None
+        self._search_index = None
+        self._group_stats = {}
+        self._group_stats_by_id = {}
+        self._students = {}
+        return True
+
+    @property
+    def history(self):
+        if self._history is None:
+            self._history = AttendanceHistory(self.weeks_data, self.group_registry)
+        return self._history
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            self._search_index = build_search_index(self.weeks_data)
+        return self._search_index
+
+    def _week_info(self, week_id):
+        if week_id not in self.weeks_data:
+            raise NotFound(f"Unknown week: {week_id}")
+        return self.weeks_data[week_id]
+
+    def group_stats(self, week_id):
+        if week_id not in self._group_stats:
+            self._group_stats[week_id] = load_week_group_stats(self._week_info(week_id)) or {}
+        return self._group_stats[week_id]
+
+    def group_stats_by_id(self, week_id):
+        """
+        A week's group statistics keyed by group id
+
+        The saved statistics are keyed by sheet name as typed (e.g. with a
+        trailing space), so they are matched on their group_id, or on the
+        registry's id for the sheet name in weeks saved before it was stored.
+        """
+        if week_id not in self._group_stats_by_id:
+            by_id = {}
+            for sheet_name, stats in self.group_stats(week_id).items():
+                group_id = stats.get('group_id') or self.group_registry.lookup(sheet_name)
+                if group_id is not None:
+                    by_id.setdefault(group_id, stats)
+            self._group_stats_by_id[week_id] = by_id
+        return self._group_stats_by_id[week_id]
+
+    def student_records(self, week_id):
+        if week_id not in self._students:
+            self._students[week_id] = load_week_students(self._week_info(week_id))
+        if self._students[week_id] is None:
+            raise NotFound(f"No student records for {week_id}")
+        return self._students[week_id]
+
+    def _group_id(self, group):
+        group_id = int(group) if str(group).isdigit() else self.group_registry.lookup(group)
+        if group_id not in self.group_registry.groups:
+            raise NotFound(f"Unknown group: {group}")
+        return group_id
+
+    # Endpoints
+
+    def weeks(self):
+        return [
+            {
+                'week_id': week_id,
+                'start_date': info['start_date'],
+                'end_date': info['end_date'],
+                'year': info.get('year', 2025),
+                'status': info.get('status'),
+                'summary': info.get('summary'),
+            }
+            for week_id, info in self.weeks_data.items()
+        ]
+
+    def week(self, week_id):
+        info = self._week_info(week_id)
+        return {
+            'week_id': week_id,
+            'start_date': info['start_date'],
+            'end_date': info['end_date'],
+            'year': info.get('year', 2025),
+            'summary': info.get('summary'),
+            'group_stats': self.group_stats(week_id),
+        }
+
+    def week_students(self, week_id, group=None):
+        records = self.student_records(week_id)
+        rows = zip(records['person_key'], records['name'], records['student_id'], records['group'],
+                   records['group_id'], records['daily_attendance'])
+        group_id = self._group_id(group) if group else None
+        return [
+            {'person_key': key, 'name': name, 'student_id': student_id, 'group': group_name,
+             'group_id': gid, 'daily_attendance': daily, 'days_attended': sum(daily)}
+            for key, name, student_id, group_name, gid, daily in rows
+            if group_id is None or gid == group_id
+        ]
+
+    def groups(self):
+        groups = []
+        for group_id in sorted(self.group_registry.groups):
+            name = self.group_registry.name(group_id)
+            weeks = {}
+            for week_id in self.weeks_data:
+                stats = self.group_stats_by_id(week_id).get(group_id)
+                if stats:
+                    weeks[week_id] = {
+                        'total_students': stats['total_students'],
+                        'average_attendance': stats['average_attendance'],
+                    }
+            groups.append({'group_id': group_id, 'name': name, 'weeks': weeks})
+        return groups
+
+    def group(self, group, **window):
+        group_id = self._group_id(group)
+        name = self.group_registry.name(group_id)
+        try:
+            window_stats = self.history.group_window(group_id, **window)
+        except KeyError:
+            window_stats = None
+        return {
+            'group_id': group_id,
+            'name': name,
+            'window': window_stats,
+            'weeks': {
+                week_id: self.group_stats_by_id(week_id)[group_id]
+                for week_id in self.weeks_data
+                if group_id in self.group_stats_by_id(week_id)
+            },
+        }
+
+    def find_students(self, query, limit=20):
+        return [
+            {
+                'person_key': doc['k'],
+                'name': doc['n'],
+                'group': doc['g'],
+                'weeks': {self.search_index['weeks'][w]['id']: rate for w, rate in zip(doc['w'], doc['a'])},
+            }
+            for doc in search(self.search_index, query, limit)
+        ]
+
+    def student(self, key, **window):
+        history = self.history
+        if key not in history.person_index:
+            raise NotFound(f"Unknown student: {key}")
+        weeks = {}
+        for week_id in history.week_ids:
+            records = self.student_records(week_id)
+            if key in records['person_key']:
+                row = records['person_key'].index(key)
+                weeks[week_id] = {
+                    'group': records['group'][row],
+                    'daily_attendance': records['daily_attendance'][row],
+                }
+        return {
+            'person_key': key,
+            'name': history.names[history.person_index.get_loc(key)],
+            'window': history.student_window(key, **window),
+            'weeks': weeks,
+        }
+
+    def aggregates(self, **window):
+        frame = self.history.all_students_window(**window)
+        enrolled = frame[frame['days_enrolled'] > 0]
+        groups = {}
+        for group_id in self.history.group_index:
+            groups[self.group_registry.name(group_id)] = self.history.group_window(int(group_id), **window)
+        return {
+            'students': len(enrolled),
+            'days_present': int(enrolled['days_present'].sum()),
+            'days_enrolled': int(enrolled['days_enrolled'].sum()),
+            'average_attendance': float(enrolled['attendance_rate'].mean()) if len(enrolled) else None,
+            'groups': groups,
+        }
+
+
+def window_params(params):
+    """Rolling-window arguments from the query string (last_weeks, or start/end dates)"""
+    window = {}
+    if 'last_weeks' in params:
+        value = params['last_weeks'].strip()
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError(f"last_weeks must be a positive whole number, got {params['last_weeks']!r}")
+        window['last_weeks'] = int(value)
+    if 'start' in params:
+        window['start_date'] = params['start']
+    if 'end' in params:
+        window['end_date'] = params['end']
+    return window
+
+
+def route(store, path, params):
+    """
+    Map a request path to a store call
+
+    /api/weeks                         all weeks with their summaries
+    /api/weeks/<week_id>               one week with its group statistics
+    /api/weeks/<week_id>/students      the week's students (?group=<id or name>)
+    /api/groups                        all canonical groups with per-week stats
+    /api/groups/<id or name>           one group (?last_weeks=N or ?start=&end=)
+    /api/students?q=<name>             name search (Arabic spelling variants match)
+    /api/students/<person_key>         one student's history (window as above)
+    /api/aggregates                    overall and per-group window rates
+    """
+    parts = [unquote(p) for p in path.strip('/').split('/')]
+    if parts[:1] != ['api']:
+        raise NotFound(path)
+    parts = parts[1:]
+
+    if parts == ['weeks']:
+        return store.weeks()
+    if len(parts) == 2 and parts[0] == 'weeks':
+        return store.week(parts[1])
+    if len(parts) == 3 and parts[0] == 'weeks' and parts[2] == 'students':
+        return store.week_students(parts[1], params.get('group'))
+    if parts == ['groups']:
+        return store.groups()
+    if len(parts) == 2 and parts[0] == 'groups':
+        return store.group(parts[1], **window_params(params))
+    if parts == ['students']:
+        return store.find_students(params.get('q', ''), int(params.get('limit', 20)))
+    if len(parts) == 2 and parts[0] == 'students':
+        return store.student(parts[1], **window_params(params))
+    if parts == ['aggregates']:
+        return store.aggregates(**window_params(params))
+    raise NotFound(path)
+
+
+class ResponseCache:
+    """LRU cache of encoded responses: key -> (etag, body, gzipped body)"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+def encode_response(data):
+    """JSON body, its ETag and (for larger bodies) a gzipped copy"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+    return etag, body, gzipped
+
+
+class AttendanceAPI:
+    """
+    Small HTTP/1.1 JSON API over the stored attendance data
+
+    Built on asyncio streams only (no web framework). Responses are served
+    from an in-memory LRU cache that is dropped whenever the stored data
+    changes; clients can revalidate with If-None-Match and get gzip bodies
+    when they send Accept-Encoding: gzip. Connections are kept alive.
+    """
+
+    def __init__(self, store, cache_size=256):
+        self.store = store
+        self.cache = ResponseCache(cache_size)
+
+    def respond(self, target, headers):
+        """Status, extra headers and body for a GET request target"""
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if self.store.reload_if_changed():
+            self.cache.clear()
+
+        key = (url.path, tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        if entry is None:
+            try:
+                entry = encode_response(route(self.store, url.path, params))
+            except NotFound as e:
+                return 404, {}, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+            except (ValueError, KeyError) as e:
+                return 400, {}, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+            except Exception as e:
+                print(f"Error serving {target}: {str(e)}")
+                return 500, {}, json.dumps({'error': 'internal error'}).encode('utf-8')
+            self.cache.put(key, entry)
+
+        etag, body, gzipped = entry
+        extra = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            return 304, extra, b''
+        if gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            extra['Content-Encoding'] = 'gzip'
+            return 200, extra, gzipped
+        return 200, extra, body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ')
+                except ValueError:
+                    await self.write(writer, 400, {}, b'', keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if method not in ('GET', 'HEAD'):
+                    status, extra, body = 405, {'Allow': 'GET, HEAD'}, b''
+                else:
+                    status, extra, body = self.respond(target, headers)
+                await self.write(writer, status, extra, body, keep_alive, head=method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def write(self, writer, status, extra, body, keep_alive, head=False):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+        if status != 304:
+            lines.append('Content-Type: application/json; charset=utf-8')
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+        lines.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, index_path='weeks_index.json', base_dir='weeks', cache_size=256):
+    """Run the API until cancelled"""
+    api = AttendanceAPI(AttendanceStore(index_path, base_dir), cache_size)
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"Attendance API listening on http://{host}:{port}/api/weeks ({len(api.store.weeks_data)} weeks)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the analyzed attendance data as a local JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--index', default='weeks_index.json', help="weeks index written by the analyzer")
+    parser.add_argument('--base-dir', default='weeks')
+    parser.add_argument('--cache-size', type=int, default=256, help="number of responses kept in memory")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.index, args.base_dir, args.cache_size))
+    except KeyboardInterrupt:
+        pass
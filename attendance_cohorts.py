@@ -0,0 +1,149 @@
+import json
+import os
+
+import pandas as pd
+
+
+class CohortTracker:
+    """
+    Cohort retention analysis by first-seen week
+
+    Every person belongs to the cohort of the week they first appeared in.
+    For each ingested week the tracker adds the attendance of every student
+    to the (cohort, weeks since join) cell with one vectorized group-by, so
+    adding a week only costs that week's roster.
+    """
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.weeks = []
+        # Start date (ISO) of every tracked week, None for weeks tracked before dates were kept
+        self.week_starts = []
+        self.first_seen = {}
+        self.contributions = {}
+
+    def load(self):
+        """Load the cohort state from disk if it exists"""
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.weeks = data['weeks']
+            self.week_starts = data.get('week_starts', [None] * len(self.weeks))
+            self.first_seen = data['first_seen']
+            self.contributions = data['contributions']
+        return self
+
+    def save(self):
+        """Persist the cohort state"""
+        data = {
+            'weeks': self.weeks,
+            'week_starts': self.week_starts,
+            'first_seen': self.first_seen,
+            'contributions': self.contributions,
+        }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def is_out_of_order(self, week_id, week_start):
+        """True if a week starting after week_start (other than week_id itself) is already tracked"""
+        start = week_start.date().isoformat()
+        return any(other != week_id and other_start is not None and other_start > start
+                   for other, other_start in zip(self.weeks, self.week_starts))
+
+    def update_week(self, week_id, all_students, week_start=None):
+        """
+        Add one week (a StudentTable) to the cohort matrix
+
+        Weeks must be added in chronological order. Re-adding the most recent
+        week replaces its contribution; older weeks are left untouched. A
+        week starting (week_start, a datetime) before a tracked week is
+        refused: first-seen cohorts and offsets depend on the order, so the
+        matrix has to be rebuilt in date order instead.
+        """
+        if week_start is not None and self.is_out_of_order(week_id, week_start):
+            print(f"Cohort matrix has weeks after {week_id}, not updated (rebuild it in date order)")
+            return False
+        if self.weeks and week_id == self.weeks[-1]:
+            self.weeks.pop()
+            self.week_starts.pop()
+            self.contributions.pop(week_id, None)
+            self.first_seen = {key: cohort for key, cohort in self.first_seen.items() if cohort != week_id}
+        elif week_id in self.weeks:
+            print(f"Cohort matrix already includes {week_id}, skipping (only the latest week can be re-applied)")
+            return False
+
+        if not len(all_students):
+            return False
+
+        frame = pd.DataFrame({
+            'person_key': all_students.person_keys(),
+            'attendance': all_students.percentage,
+        }).drop_duplicates('person_key')
+
+        week_pos = len(self.weeks)
+        positions = {w: i for i, w in enumerate(self.weeks)}
+        cohort = frame['person_key'].map(self.first_seen)
+        new_people = cohort.isna()
+        cohort = cohort.fillna(week_id)
+        frame['cohort'] = cohort
+        frame['offset'] = week_pos - cohort.map(positions).fillna(week_pos).astype(int)
+
+        cells = frame.groupby(['cohort', 'offset'])['attendance'].agg(['sum', 'count']).reset_index()
+        self.contributions[week_id] = cells.to_dict('records')
+        self.first_seen.update(dict.fromkeys(frame.loc[new_people, 'person_key'], week_id))
+        self.weeks.append(week_id)
+        self.week_starts.append(week_start.date().isoformat() if week_start is not None else None)
+        return True
+
+    def matrix(self):
+        """
+        Cohort × weeks-since-join matrix of average attendance (%)
+
+        Rows are cohorts (first-seen week, in chronological order) with their
+        size; columns are "Week +0", "Week +1", ...
+        """
+        rows = [cell for week_id in self.weeks for cell in self.contributions.get(week_id, [])]
+        if not rows:
+            return pd.DataFrame()
+
+        cells = pd.DataFrame(rows).groupby(['cohort', 'offset'])[['sum', 'count']].sum()
+        averages = (cells['sum'] / cells['count']).unstack('offset')
+        averages = averages.reindex([w for w in self.weeks if w in averages.index])
+        averages.columns = [f"Week +{offset}" for offset in averages.columns]
+
+        sizes = pd.Series(self.first_seen).value_counts()
+        averages.insert(0, 'Cohort Size', sizes.reindex(averages.index).fillna(0).astype(int))
+        averages.index.name = 'Cohort'
+        return averages
+
+    def to_records(self):
+        """The matrix as plain JSON-friendly records (None for empty cells)"""
+        matrix = self.matrix()
+        if matrix.empty:
+            return []
+        matrix = matrix.astype(object).where(matrix.notna(), None)
+        return [
+            {'cohort': cohort, **{col: (round(v, 1) if isinstance(v, float) else v) for col, v in row.items()}}
+            for cohort, row in matrix.iterrows()
+        ]
+
+
+def cohort_table_html(records):
+    """Render cohort records as an HTML table for the dashboards"""
+    if not records:
+        return ''
+    columns = [col for col in records[0] if col != 'cohort']
+    header = ''.join(f'<th>{col}</th>' for col in columns)
+    body = ''
+    for record in records:
+        cells = ''
+        for col in columns:
+            value = record[col]
+            if value is None:
+                cells += '<td>-</td>'
+            elif col == 'Cohort Size':
+                cells += f'<td>{value}</td>'
+            else:
+                cells += f'<td>{value:.1f}%</td>'
+        body += f'<tr><td>{record["cohort"]}</td>{cells}</tr>'
+    return f'<table class="cohort-table"><thead><tr><th>Cohort</th>{header}</tr></thead><tbody>{body}</tbody></table>'
@@ -0,0 +1,254 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from student_keys import person_key
+from student_table import StudentTable
+
+DAYS_PER_WEEK = 5
+
+
+def week_start_datetime(week_info):
+    """Return the first day (Sunday) of a week from its "DD-Mon" start date and year"""
+    return datetime.strptime(f"{week_info['start_date']}-{week_info.get('year', 2025)}", "%d-%b-%Y")
+
+
+def students_file_path(week_info):
+    """Path of the per-student records saved for a week"""
+    week_dir = week_info["directory"].replace('\\', os.sep)
+    return os.path.join(week_dir, f"students_{week_info['week_id']}.json")
+
+
+def save_week_students(week_info, students):
+    """
+    Save the per-student records of a week (a StudentTable) as compact columnar JSON
+
+    Session data is flattened to 20 values (5 days × 4 sessions) per student.
+    For a provisional week, days_elapsed records how many days have data.
+    When a sheet left whole days blank, recorded_days holds every student's
+    per-day recorded flags (see load_recorded_days).
+    """
+    data = {
+        'week_id': week_info['week_id'],
+        'person_key': students.person_keys(),
+        'name': students.names.tolist(),
+        'student_id': students.id_strings(),
+        'group': students.group_names.tolist(),
+        'group_id': students.row_group_ids.tolist(),
+        'daily_attendance': students.daily.tolist(),
+        'session_data': students.sessions.reshape(len(students), -1).tolist(),
+        'days_elapsed': week_info.get('days_elapsed', DAYS_PER_WEEK),
+    }
+    recorded = students.recorded_days
+    if not recorded.all():
+        data['recorded_days'] = recorded.tolist()
+    with open(students_file_path(week_info), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def load_week_students(week_info):
+    """Load the per-student records of a week, or None if they were never saved"""
+    path = students_file_path(week_info)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_recorded_days(records):
+    """
+    Students × days 0/1 array of the days that count for each student of a
+    week's records: elapsed days their sheet recorded
+    """
+    count = len(records['person_key'])
+    elapsed = np.arange(DAYS_PER_WEEK) < records.get('days_elapsed', DAYS_PER_WEEK)
+    recorded = np.array(records.get('recorded_days') or [[1] * DAYS_PER_WEEK] * count, dtype=np.int32)
+    return recorded.reshape(count, DAYS_PER_WEEK) * elapsed
+
+
+def week_student_table(records):
+    """
+    StudentTable of a week's saved records (see save_week_students)
+
+    Used to replay stored weeks, e.g. when the risk and cohort trackers are
+    rebuilt in date order. Daily presence is taken as saved (student numbers
+    are not saved), and rates are over the week's elapsed recorded days.
+    """
+    count = len(records['person_key'])
+    recorded_days = records.get('recorded_days') or [[1] * DAYS_PER_WEEK] * count
+    group_ids = records.get('group_id') or [None] * count
+    table = StudentTable.from_records(
+        {
+            'group': group, 'group_id': group_id, 'student_number': None, 'name': name,
+            'student_id': student_id, 'session_data': sessions, 'recorded_days': days,
+        }
+        for group, group_id, name, student_id, sessions, days in zip(
+            records['group'], group_ids, records['name'], records['student_id'],
+            records['session_data'], recorded_days)
+    )
+    table.daily = np.array(records['daily_attendance'], dtype=np.int8).reshape(count, DAYS_PER_WEEK)
+    table.days_attended = table.daily.sum(axis=1, dtype=np.int8)
+    table.percentage = table.rates(records.get('days_elapsed', DAYS_PER_WEEK))
+    return table
+
+
+class AttendanceHistory:
+    """
+    Per-student attendance history with O(1) rolling-window queries
+
+    Day-level presence and enrolment matrices (people × days) are built once
+    from the stored weekly student records, and their prefix sums along the
+    day axis are kept for people and for groups. Any window rate is then the
+    difference of two prefix-sum columns.
+    """
+
+    def __init__(self, weeks_data, group_registry):
+        self.group_registry = group_registry
+        self.week_ids = []
+        self.week_starts = []
+        self.day_dates = np.array([], dtype='datetime64[D]')
+        self.person_index = pd.Index([])
+        self.group_index = pd.Index([])
+        self.names = np.array([], dtype=object)
+        self._build(weeks_data)
+
+    def _build(self, weeks_data):
+        weeks = []
+        for week_id, week_info in weeks_data.items():
+            records = load_week_students(week_info)
+            if records is None:
+                print(f"No student records for {week_id}, re-run analyze_week to include it in the history")
+                continue
+            weeks.append((week_start_datetime(week_info), week_id, records))
+        weeks.sort(key=lambda item: item[0])
+
+        self.week_ids = [week_id for _, week_id, _ in weeks]
+        self.week_starts = [start for start, _, _ in weeks]
+        self.day_dates = np.array(
+            [start + timedelta(days=d) for start in self.week_starts for d in range(DAYS_PER_WEEK)],
+            dtype='datetime64[D]'
+        )
+
+        # One long frame of (person, group, week position) rows, one per student-week
+        frames = []
+        for week_pos, (_, week_id, records) in enumerate(weeks):
+            frame = pd.DataFrame({
+                'person_key': records['person_key'],
+                'name': records['name'],
+                'group_id': records.get('group_id') or [self.group_registry.resolve(g) for g in records['group']],
+            })
+            frame['week_pos'] = week_pos
+            frame['daily'] = records['daily_attendance']
+            frame['recorded'] = load_recorded_days(records).tolist()
+            frames.append(frame.drop_duplicates('person_key'))
+
+        day_count = len(self.day_dates)
+        if not frames:
+            self.person_present = np.zeros((0, 1), dtype=np.int32)
+            self.person_enrolled = np.zeros((0, 1), dtype=np.int32)
+            self.group_present = np.zeros((0, 1), dtype=np.int32)
+            self.group_enrolled = np.zeros((0, 1), dtype=np.int32)
+            return
+
+        rows = pd.concat(frames, ignore_index=True)
+        person_codes, self.person_index = pd.factorize(rows['person_key'])
+        group_codes, self.group_index = pd.factorize(rows['group_id'])
+        self.person_index = pd.Index(self.person_index)
+        self.group_index = pd.Index(self.group_index)
+        self.names = rows.groupby(person_codes)['name'].last().to_numpy(dtype=object)
+
+        daily = np.array(rows['daily'].tolist(), dtype=np.int32)
+        day_cols = rows['week_pos'].to_numpy()[:, None] * DAYS_PER_WEEK + np.arange(DAYS_PER_WEEK)
+
+        present = np.zeros((len(self.person_index), day_count), dtype=np.int32)
+        enrolled = np.zeros_like(present)
+        # Days not yet recorded in a provisional week, or left blank for the
+        # whole sheet, are not counted as enrolled
+        recorded = np.array(rows['recorded'].tolist(), dtype=np.int32)
+        present[person_codes[:, None], day_cols] = daily
+        enrolled[person_codes[:, None], day_cols] = recorded
+
+        group_present = np.zeros((len(self.group_index), day_count), dtype=np.int32)
+        group_enrolled = np.zeros_like(group_present)
+        np.add.at(group_present, (group_codes[:, None], day_cols), daily)
+        np.add.at(group_enrolled, (group_codes[:, None], day_cols), recorded)
+
+        self.person_present = self._prefix(present)
+        self.person_enrolled = self._prefix(enrolled)
+        self.group_present = self._prefix(group_present)
+        self.group_enrolled = self._prefix(group_enrolled)
+
+    @staticmethod
+    def _prefix(matrix):
+        """Cumulative sums along the day axis with a leading zero column"""
+        out = np.zeros((matrix.shape[0], matrix.shape[1] + 1), dtype=np.int32)
+        np.cumsum(matrix, axis=1, out=out[:, 1:])
+        return out
+
+    def _day_range(self, start_date=None, end_date=None, last_weeks=None):
+        """Translate a date range or a number of recent weeks into [lo, hi) day columns"""
+        if last_weeks is not None:
+            if last_weeks < 1:
+                raise ValueError(f"last_weeks must be at least 1, got {last_weeks}")
+            hi = len(self.day_dates)
+            return max(0, hi - last_weeks * DAYS_PER_WEEK), hi
+
+        lo = 0 if start_date is None else int(np.searchsorted(self.day_dates, np.datetime64(pd.Timestamp(start_date).date(), 'D'), side='left'))
+        hi = len(self.day_dates) if end_date is None else int(np.searchsorted(self.day_dates, np.datetime64(pd.Timestamp(end_date).date(), 'D'), side='right'))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _window(present, enrolled, row, lo, hi):
+        days_present = int(present[row, hi] - present[row, lo])
+        days_enrolled = int(enrolled[row, hi] - enrolled[row, lo])
+        return {
+            'days_present': days_present,
+            'days_enrolled': days_enrolled,
+            'attendance_rate': days_present / days_enrolled * 100 if days_enrolled else None,
+        }
+
+    def student_window(self, key, start_date=None, end_date=None, last_weeks=None):
+        """
+        Attendance of one student over a window
+
+        Args:
+            key (str): Person key (see student_keys.person_key)
+            start_date, end_date: Inclusive date bounds (anything pandas can parse)
+            last_weeks (int): Alternatively, the number of most recent weeks
+        """
+        row = self.person_index.get_loc(key)
+        lo, hi = self._day_range(start_date, end_date, last_weeks)
+        return self._window(self.person_present, self.person_enrolled, row, lo, hi)
+
+    def group_window(self, group, start_date=None, end_date=None, last_weeks=None):
+        """
+        Attendance of a whole group over a window (student-days present / enrolled)
+
+        The group can be given as a canonical group id or any sheet name.
+        """
+        group_id = group if isinstance(group, int) else self.group_registry.resolve(group)
+        row = self.group_index.get_loc(group_id)
+        lo, hi = self._day_range(start_date, end_date, last_weeks)
+        return self._window(self.group_present, self.group_enrolled, row, lo, hi)
+
+    def student_lookup(self, student_id=None, name=None):
+        """Return the person key for a student ID or name"""
+        return person_key({'student_id': student_id if student_id is not None else 'N/A', 'name': name or ''})
+
+    def all_students_window(self, start_date=None, end_date=None, last_weeks=None):
+        """Window rates for every student at once as a DataFrame"""
+        lo, hi = self._day_range(start_date, end_date, last_weeks)
+        days_present = self.person_present[:, hi] - self.person_present[:, lo]
+        days_enrolled = self.person_enrolled[:, hi] - self.person_enrolled[:, lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.where(days_enrolled > 0, days_present / days_enrolled * 100, np.nan)
+        return pd.DataFrame({
+            'person_key': self.person_index,
+            'name': self.names,
+            'days_present': days_present,
+            'days_enrolled': days_enrolled,
+            'attendance_rate': rate,
+        })
@@ -0,0 +1,219 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class AttendanceRiskTracker:
+    """
+    Incremental early-warning state for chronically absent students
+
+    For every person ever seen the tracker keeps the number of consecutive
+    absent days, the attendance rate of the last few weeks and an
+    exponentially weighted absence score. Each ingested week updates the
+    state in a single vectorized step, so no week history is rescanned.
+    """
+
+    def __init__(self, state_path, window_weeks=4, alpha=0.5):
+        self.state_path = state_path
+        self.window_weeks = window_weeks
+        self.alpha = alpha
+        self.weeks = []
+        # Start date (ISO) of every tracked week, None for weeks tracked before dates were kept
+        self.week_starts = []
+        self.state = self._empty_state()
+        self.previous = None
+
+    def _empty_state(self):
+        return {
+            'keys': np.array([], dtype=object),
+            'names': np.array([], dtype=object),
+            'groups': np.array([], dtype=object),
+            'consecutive_absent': np.zeros(0, dtype=np.int32),
+            'recent_rates': np.full((0, self.window_weeks), np.nan),
+            'score': np.full(0, np.nan),
+            'last_week': np.array([], dtype=object),
+        }
+
+    def _copy_state(self, state):
+        return {name: values.copy() for name, values in state.items()}
+
+    def load(self):
+        """Load the tracker state from disk if it exists"""
+        if not os.path.exists(self.state_path):
+            return self
+
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.window_weeks = data.get('window_weeks', self.window_weeks)
+        self.alpha = data.get('alpha', self.alpha)
+        self.weeks = data.get('weeks', [])
+        self.week_starts = data.get('week_starts', [None] * len(self.weeks))
+        self.state = self._decode_state(data['state'])
+        self.previous = self._decode_state(data['previous']) if data.get('previous') else None
+        return self
+
+    def save(self):
+        """Persist the tracker state as columnar JSON"""
+        data = {
+            'window_weeks': self.window_weeks,
+            'alpha': self.alpha,
+            'weeks': self.weeks,
+            'week_starts': self.week_starts,
+            'state': self._encode_state(self.state),
+            'previous': self._encode_state(self.previous) if self.previous is not None else None,
+        }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def _encode_state(self, state):
+        rates = state['recent_rates']
+        return {
+            'keys': state['keys'].tolist(),
+            'names': state['names'].tolist(),
+            'groups': state['groups'].tolist(),
+            'consecutive_absent': state['consecutive_absent'].tolist(),
+            'recent_rates': np.where(np.isnan(rates), None, rates).tolist(),
+            'score': np.where(np.isnan(state['score']), None, state['score']).tolist(),
+            'last_week': state['last_week'].tolist(),
+        }
+
+    def _decode_state(self, data):
+        rates = np.array(data['recent_rates'], dtype=float).reshape(-1, self.window_weeks)
+        return {
+            'keys': np.array(data['keys'], dtype=object),
+            'names': np.array(data['names'], dtype=object),
+            'groups': np.array(data['groups'], dtype=object),
+            'consecutive_absent': np.array(data['consecutive_absent'], dtype=np.int32),
+            'recent_rates': rates,
+            'score': np.array(data['score'], dtype=float),
+            'last_week': np.array(data['last_week'], dtype=object),
+        }
+
+    def is_out_of_order(self, week_id, week_start):
+        """True if a week starting after week_start (other than week_id itself) is already tracked"""
+        start = week_start.date().isoformat()
+        return any(other != week_id and other_start is not None and other_start > start
+                   for other, other_start in zip(self.weeks, self.week_starts))
+
+    def update_week(self, week_id, all_students, week_start=None):
+        """
+        Fold one week of students (a StudentTable) into the risk state
+
+        Weeks must be ingested in chronological order. Re-ingesting the most
+        recent week replaces its previous contribution; older weeks are
+        ignored because their effect is already part of the running state.
+        A week starting (week_start, a datetime) before a tracked week is
+        refused: streaks and scores would be folded in the wrong order, so
+        the state has to be rebuilt in date order instead.
+        """
+        if week_start is not None and self.is_out_of_order(week_id, week_start):
+            print(f"Risk state has weeks after {week_id}, not updated (rebuild it in date order)")
+            return False
+        if self.weeks and week_id == self.weeks[-1] and self.previous is not None:
+            self.state = self._copy_state(self.previous)
+            self.weeks.pop()
+            self.week_starts.pop()
+        elif week_id in self.weeks:
+            print(f"Risk state already includes {week_id}, skipping (only the latest week can be re-applied)")
+            return False
+
+        if not len(all_students):
+            return False
+
+        keys = pd.Index(all_students.person_keys())
+        first = ~keys.duplicated()
+        keys = keys[first]
+        students = all_students.take(np.flatnonzero(first))
+        daily = students.daily
+        # Days left blank for the whole sheet are skipped: they neither extend nor break a streak
+        recorded = students.recorded_days
+
+        self.previous = self._copy_state(self.state)
+        state = self.state
+
+        # Append rows for people seen for the first time
+        positions = pd.Index(state['keys']).get_indexer(keys)
+        new_rows = positions == -1
+        new_count = int(new_rows.sum())
+        if new_count:
+            positions[new_rows] = np.arange(len(state['keys']), len(state['keys']) + new_count)
+            state['keys'] = np.concatenate([state['keys'], np.array(keys[new_rows], dtype=object)])
+            state['names'] = np.concatenate([state['names'], np.empty(new_count, dtype=object)])
+            state['groups'] = np.concatenate([state['groups'], np.empty(new_count, dtype=object)])
+            state['consecutive_absent'] = np.concatenate([state['consecutive_absent'], np.zeros(new_count, dtype=np.int32)])
+            state['recent_rates'] = np.vstack([state['recent_rates'], np.full((new_count, self.window_weeks), np.nan)])
+            state['score'] = np.concatenate([state['score'], np.full(new_count, np.nan)])
+            state['last_week'] = np.concatenate([state['last_week'], np.empty(new_count, dtype=object)])
+
+        # Trailing absent days in this week continue the previous streak only
+        # when the whole week was missed
+        not_present = 1 - daily * recorded
+        trailing_run = np.cumprod(not_present[:, ::-1], axis=1)
+        trailing = (trailing_run * recorded[:, ::-1]).sum(axis=1)
+        whole_week = trailing_run[:, -1] == 1
+        state['consecutive_absent'][positions] = np.where(
+            whole_week, state['consecutive_absent'][positions] + trailing, trailing
+        )
+
+        # Rate over the recorded days; NaN (left out of the rolling rate) when none was recorded
+        days = recorded.sum(axis=1)
+        week_rate = np.divide((daily * recorded).sum(axis=1), days, out=np.full(len(days), np.nan), where=days > 0)
+        state['recent_rates'][positions] = np.column_stack([state['recent_rates'][positions, 1:], week_rate])
+
+        old_score = state['score'][positions]
+        absence = 1.0 - week_rate
+        state['score'][positions] = np.where(
+            np.isnan(absence), old_score,
+            np.where(np.isnan(old_score), absence, self.alpha * absence + (1 - self.alpha) * old_score)
+        )
+
+        state['names'][positions] = students.names
+        state['groups'][positions] = students.group_names
+        state['last_week'][positions] = week_id
+
+        self.weeks.append(week_id)
+        self.week_starts.append(week_start.date().isoformat() if week_start is not None else None)
+        return True
+
+    def at_risk_by_group(self, week_id=None, min_score=0.6, min_consecutive_days=5):
+        """
+        Ranked at-risk students per group
+
+        Only people present on the roster of the given week (default: the
+        latest ingested week) are listed. A student is at risk when the
+        weighted absence score reaches min_score or the absence streak
+        reaches min_consecutive_days.
+        """
+        week_id = week_id or (self.weeks[-1] if self.weeks else None)
+        state = self.state
+        # Mean over the rated weeks of the window; NaN when none was rated
+        rated = ~np.isnan(state['recent_rates'])
+        rated_weeks = rated.sum(axis=1)
+        rolling_rate = np.divide(
+            np.where(rated, state['recent_rates'], 0.0).sum(axis=1), rated_weeks,
+            out=np.full(len(rated_weeks), np.nan), where=rated_weeks > 0,
+        )
+
+        at_risk = (
+            (state['last_week'] == week_id)
+            & ((state['score'] >= min_score) | (state['consecutive_absent'] >= min_consecutive_days))
+        )
+
+        frame = pd.DataFrame({
+            'person_key': state['keys'][at_risk],
+            'name': state['names'][at_risk],
+            'group': state['groups'][at_risk],
+            'risk_score': state['score'][at_risk],
+            'consecutive_absent_days': state['consecutive_absent'][at_risk],
+            'rolling_attendance_rate': rolling_rate[at_risk] * 100,
+        }).sort_values(['group', 'risk_score', 'consecutive_absent_days'], ascending=[True, False, False])
+        # Missing rates and scores are written as null (JSON has no NaN)
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        return {
+            group: rows.drop(columns='group').to_dict('records')
+            for group, rows in frame.groupby('group', sort=False)
+        }
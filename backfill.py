@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from folder_watch import week_from_filename
+from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+
+CHECKPOINT_FILE = 'backfill_checkpoint.json'
+
+# Incremental state rebuilt from scratch by a --fresh backfill
+DERIVED_STATE = ['risk_state.json', 'cohort_state.json']
+DERIVED_ROOT_FILES = ['weeks_feed.json', 'search_index.json']
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_workbooks(folder):
+    """Weekly workbooks in `folder`, oldest week first, as (week, path) pairs"""
+    workbooks = []
+    for name in os.listdir(folder):
+        week = week_from_filename(name)
+        if week is not None:
+            workbooks.append((week, os.path.join(folder, name)))
+    workbooks.sort(key=lambda item: item[0]['start'])
+    return workbooks
+
+
+class BackfillCheckpoint:
+    """
+    Progress of a backfill, stored next to the weeks it produced
+
+    Every week is marked 'started' before its analysis and 'done' (with the
+    SHA-1 of its workbook) after its outputs and the weeks index are saved.
+    The file is replaced atomically, so an interrupted run leaves either the
+    previous or the new state behind, never a half-written file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.weeks = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.weeks = json.load(f)['weeks']
+        return self
+
+    def save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'weeks': self.weeks}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def is_done(self, week_id, source_sha1):
+        entry = self.weeks.get(week_id)
+        return entry is not None and entry['status'] == 'done' and entry['source_sha1'] == source_sha1
+
+    def mark(self, week_id, status, source_sha1, path):
+        self.weeks[week_id] = {
+            'status': status,
+            'source': path,
+            'source_sha1': source_sha1,
+            'updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.save()
+
+
+def plan_backfill(analyzer, folder, checkpoint):
+    """
+    Decide which weeks need work
+
+    A week is skipped when the checkpoint has it done for a workbook with
+    the same content and its saved data is still there.
+
+    Returns:
+        list: (week, path, source_sha1, action) with action 'analyze' or 'skip'
+    """
+    plan = []
+    for week, path in find_workbooks(folder):
+        source_sha1 = file_sha1(path)
+        week_dir = os.path.join(analyzer.base_dir, week['week_id'])
+        data_file = os.path.join(week_dir, f"data_{week['week_id']}.json")
+        done = checkpoint.is_done(week['week_id'], source_sha1) and os.path.exists(data_file)
+        plan.append((week, path, source_sha1, 'skip' if done else 'analyze'))
+    return plan
+
+
+def reset_derived_state(analyzer, plan):
+    """Remove incremental state and sheet caches so a fresh backfill recomputes everything"""
+    paths = [os.path.join(analyzer.base_dir, name) for name in DERIVED_STATE + [CHECKPOINT_FILE]]
+    paths += DERIVED_ROOT_FILES
+    paths += [os.path.join(analyzer.base_dir, week['week_id'], 'sheet_cache.json') for week, _, _, _ in plan]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed {path}")
+
+
+def run_backfill(folder="Attendance sheets", base_dir="weeks", fresh=False, dry_run=False, print_metrics=False, profile=False):
+    """
+    Rebuild the weeks/ tree and weeks index from every workbook in `folder`
+
+    Weeks are analyzed oldest first so the incremental trackers (risk,
+    cohorts) see them in order. Progress is checkpointed after every week;
+    running the command again resumes after the last completed week and
+    skips weeks whose workbook has not changed.
+    """
+    analyzer = MultiWeekAttendanceAnalyzer(base_dir, print_metrics=print_metrics, profile=profile)
+    analyzer.load_weeks_index()
+    checkpoint_path = os.path.join(base_dir, CHECKPOINT_FILE)
+
+    checkpoint = BackfillCheckpoint(checkpoint_path).load()
+    plan = plan_backfill(analyzer, folder, checkpoint)
+    if fresh and not dry_run:
+        reset_derived_state(analyzer, plan)
+        checkpoint.weeks = {}
+        plan = [(week, path, source_sha1, 'analyze') for week, path, source_sha1, _ in plan]
+
+    todo = [item for item in plan if item[3] == 'analyze']
+    print(f"Backfill plan: {len(plan)} workbooks, {len(todo)} to analyze, {len(plan) - len(todo)} up to date")
+    for week, path, _, action in plan:
+        print(f"  {'analyze' if action == 'analyze' else 'skip   '} {week['week_id']:<20} {os.path.basename(path)}")
+    if dry_run or not todo:
+        return plan
+
+    # A week analyzed again before a later one makes the risk and cohort trackers replay the saved weeks
+    first_redo = min(plan.index(item) for item in todo)
+    if any(action == 'skip' for _, _, _, action in plan[first_redo:]):
+        print("Note: later weeks are replayed from their saved student records to rebuild the risk and cohort state")
+
+    for done_count, (week, path, source_sha1, _) in enumerate(todo, 1):
+        print(f"\n[{done_count}/{len(todo)}] {week['week_id']}")
+        checkpoint.mark(week['week_id'], 'started', source_sha1, path)
+
+        week_info = analyzer.add_week(
+            week_id=week['week_id'],
+            start_date=week['start_date'],
+            end_date=week['end_date'],
+            excel_file_path=path,
+            description=f"Backfilled from {os.path.basename(path)}"
+        )
+        week_info['year'] = week['year']
+        stat = os.stat(path)
+        week_info['source'] = {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+        summary = analyzer.analyze_week(week['week_id'], path)
+        if not summary:
+            print(f"Backfill stopped: {week['week_id']} could not be analyzed")
+            return plan
+        analyzer.save_weeks_index(compact=False)
+        checkpoint.mark(week['week_id'], 'done', source_sha1, path)
+
+    analyzer.create_master_dashboard()
+    # Fold the index journal into weeks_index.json once the batch is done
+    analyzer.save_weeks_index()
+    print(f"\nBackfill complete: {len(todo)} weeks analyzed")
+    return plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze every weekly workbook and rebuild weeks/ and the weeks index")
+    parser.add_argument('--folder', default="Attendance sheets", help="folder with the weekly workbooks")
+    parser.add_argument('--base-dir', default="weeks")
+    parser.add_argument('--fresh', action='store_true',
+                        help="discard checkpoints, tracker state and sheet caches and re-analyze every week")
+    parser.add_argument('--dry-run', action='store_true', help="only print the plan")
+    parser.add_argument('--print-metrics', action='store_true', help="print stage timings and counters after each week")
+    parser.add_argument('--profile', action='store_true', help="write per-stage profiles to weeks/<week_id>/profile")
+    args = parser.parse_args()
+    run_backfill(args.folder, args.base_dir, args.fresh, args.dry_run, args.print_metrics, args.profile)
@@ -0,0 +1,146 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+# Bump when stages, scales or the file layout change; older baselines must be re-recorded
+BASELINE_VERSION = 1
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+# A stage regresses when its median is slower than the baseline by more than all of:
+#   THRESHOLD (relative), MIN_DELTA seconds, and NOISE_SIGMAS × the combined run-to-run spread
+THRESHOLD = 0.15
+MIN_DELTA = 0.02
+NOISE_SIGMAS = 3.0
+
+
+def stage_statistics(runs):
+    """Median, minimum and robust spread (1.4826 × median absolute deviation) of repeated timings"""
+    median = statistics.median(runs)
+    spread = 1.4826 * statistics.median(abs(run - median) for run in runs) if len(runs) > 1 else 0.0
+    return {'median': median, 'min': min(runs), 'spread': spread, 'runs': runs}
+
+
+def code_revision():
+    """Short git commit of the working tree, or None outside a git checkout"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return revision.stdout.strip() or None
+
+
+def make_baseline(results):
+    """
+    Baseline document from benchmark_suite results
+
+    Returns:
+        dict: version, environment and {scale: {parameters, stages: {stage: statistics}}}
+    """
+    return {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'revision': code_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scales': {
+            result['scale']: {
+                'groups': result['groups'],
+                'students_per_group': result['students_per_group'],
+                'weeks': result['weeks'],
+                'students': result['students'],
+                'stages': {stage: stage_statistics(runs) for stage, runs in result['runs'].items()},
+            }
+            for result in results
+        },
+    }
+
+
+def save_baseline(baseline, path=DEFAULT_BASELINE):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    if not os.path.exists(path):
+        raise ValueError(f"No benchmark baseline at {path}. Record one with --save-baseline first.")
+    with open(path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Baseline {path} has version {baseline.get('version')}, expected {BASELINE_VERSION}. "
+                         "Record a new one with --save-baseline.")
+    return baseline
+
+
+def compare_to_baseline(baseline, current, threshold=THRESHOLD, min_delta=MIN_DELTA, noise_sigmas=NOISE_SIGMAS):
+    """
+    Compare a new baseline document with a recorded one, stage by stage
+
+    Medians are compared. A difference counts only if it is larger than the
+    relative threshold, the absolute minimum and the noise band of both
+    runs, so millisecond stages and jittery runs do not fail the check.
+
+    Returns:
+        list: One row per scale and stage with 'status' 'ok', 'slower' (a
+            regression), 'faster', 'new' or 'missing', or 'mismatch' when a
+            scale was run with different parameters
+    """
+    rows = []
+    for scale, now in current['scales'].items():
+        before = baseline['scales'].get(scale)
+        if before is None:
+            rows.extend({'scale': scale, 'stage': stage, 'status': 'new', 'current': stats['median']}
+                        for stage, stats in now['stages'].items())
+            continue
+        parameters = ('groups', 'students_per_group', 'weeks')
+        if any(before[key] != now[key] for key in parameters):
+            rows.append({'scale': scale, 'stage': '*', 'status': 'mismatch'})
+            continue
+        for stage in list(before['stages']) + [stage for stage in now['stages'] if stage not in before['stages']]:
+            old, new = before['stages'].get(stage), now['stages'].get(stage)
+            if old is None or new is None:
+                rows.append({'scale': scale, 'stage': stage, 'status': 'new' if old is None else 'missing',
+                             'baseline': old and old['median'], 'current': new and new['median']})
+                continue
+            delta = new['median'] - old['median']
+            limit = max(old['median'] * threshold, min_delta, noise_sigmas * (old['spread'] + new['spread']))
+            if delta > limit:
+                status = 'slower'
+            elif delta < -limit:
+                status = 'faster'
+            else:
+                status = 'ok'
+            rows.append({
+                'scale': scale, 'stage': stage, 'status': status,
+                'baseline': old['median'], 'current': new['median'],
+                'change': delta / old['median'] if old['median'] else None, 'limit': limit,
+            })
+    return rows
+
+
+def print_comparison(rows, baseline):
+    """Print the comparison and return True if no stage regressed"""
+    print(f"Baseline: {baseline['created']}, revision {baseline.get('revision') or 'unknown'}, "
+          f"Python {baseline['python']}")
+    print(f"{'scale':<8}{'stage':<14}{'baseline':>10}{'current':>10}{'change':>9}  status")
+    for row in rows:
+        baseline_text = f"{row['baseline']:.3f}s" if row.get('baseline') is not None else '-'
+        current_text = f"{row['current']:.3f}s" if row.get('current') is not None else '-'
+        change_text = f"{row['change'] * 100:+.1f}%" if row.get('change') is not None else ''
+        status = row['status'].upper() if row['status'] in ('slower', 'mismatch') else row['status']
+        print(f"{row['scale']:<8}{row['stage']:<14}{baseline_text:>10}{current_text:>10}{change_text:>9}  {status}")
+
+    failed = [row for row in rows if row['status'] in ('slower', 'mismatch')]
+    if failed:
+        print(f"\nFAIL: {len(failed)} regression(s): "
+              + ', '.join(f"{row['scale']}/{row['stage']}" for row in failed))
+        return False
+    print("\nPASS: no stage is slower than the baseline beyond its noise band")
+    return True
@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark_baseline import (DEFAULT_BASELINE, MIN_DELTA, THRESHOLD, compare_to_baseline, load_baseline,
+                                make_baseline, print_comparison, save_baseline)
+from folder_watch import week_from_filename
+from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+from sheet_cache import average_attendance
+from synthetic_workbooks import write_synthetic_weeks
+
+# groups × students per group, and weeks of history behind the measured week
+SCALES = {
+    'small': {'groups': 10, 'students_per_group': 40, 'weeks': 4},
+    'medium': {'groups': 25, 'students_per_group': 80, 'weeks': 12},
+    'large': {'groups': 50, 'students_per_group': 100, 'weeks': 52},
+}
+
+STAGES = ['parse', 'aggregate', 'charts', 'excel', 'group_reports', 'html', 'search_index', 'master']
+
+FIRST_WEEK = datetime(2025, 8, 31)
+
+
+def add_week(analyzer, path):
+    week = week_from_filename(path)
+    week_info = analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path,
+                                  description="Synthetic benchmark week")
+    week_info['year'] = week['year']
+    return week_info
+
+
+def week_summary(group_stats, all_students, overall):
+    return {
+        'total_students': len(all_students),
+        'full_week': overall['full_week'],
+        'partial': overall['partial'],
+        'never': overall['never'],
+        'average_attendance': average_attendance(overall),
+        'groups': len(group_stats),
+    }
+
+
+def seed_history(analyzer, paths):
+    """
+    Add the earlier weeks with just what the master dashboard and search read
+
+    Their data, student records and feed entries are saved, but charts and
+    reports are not created, so a year of history takes seconds to set up.
+    """
+    for path in paths:
+        week_info = add_week(analyzer, path)
+        sheets, sheet_cache = analyzer.parse_week_sheets(week_info['directory'], path)
+        group_stats, all_students, overall = analyzer.aggregate_week(sheets, sheet_cache)
+        week_info['summary'] = week_summary(group_stats, all_students, overall)
+        analyzer.save_week_data(week_info['week_id'], group_stats, all_students)
+        analyzer.update_weeks_feed(week_info['week_id'], group_stats)
+
+
+def time_week_stages(analyzer, week_info, path):
+    """Run the analysis of one week stage by stage and return {stage: seconds}"""
+    week_id = week_info['week_id']
+    timings = {}
+
+    @contextlib.contextmanager
+    def stage(name):
+        started = time.perf_counter()
+        yield
+        timings[name] = time.perf_counter() - started
+
+    sheet_cache_path = os.path.join(week_info['directory'], 'sheet_cache.json')
+    if os.path.exists(sheet_cache_path):
+        os.remove(sheet_cache_path)
+
+    with stage('parse'):
+        sheets, sheet_cache = analyzer.parse_week_sheets(week_info['directory'], path)
+    with stage('aggregate'):
+        group_stats, all_students, overall = analyzer.aggregate_week(sheets, sheet_cache)
+    week_info['summary'] = week_summary(group_stats, all_students, overall)
+    counts = (overall['full_week'], overall['partial'], overall['never'])
+    cohorts = analyzer.update_cohorts(week_id, all_students)
+
+    with stage('charts'):
+        analyzer.create_week_visualizations(week_id, group_stats, all_students, *counts)
+    with stage('excel'):
+        analyzer.create_week_excel_report(week_id, group_stats, all_students, cohorts)
+    with stage('group_reports'):
+        analyzer.create_group_reports(week_id, group_stats)
+    with stage('html'):
+        analyzer.create_week_html_dashboard(week_id, group_stats, all_students, *counts, cohorts)
+    analyzer.save_week_data(week_id, group_stats, all_students)
+    analyzer.update_weeks_feed(week_id, group_stats)
+    with stage('search_index'):
+        analyzer.update_search_index()
+    with stage('master'):
+        analyzer.create_master_dashboard()
+    return timings
+
+
+def run_scale(name, scale, work_dir, repeat=1, verbose=False):
+    """
+    Benchmark one scale in `work_dir`
+
+    Writes `weeks` synthetic workbooks, adds all but the last one as history
+    and times every stage of the last week's analysis. With `repeat` > 1
+    the stages run again; every run is kept and the median is reported.
+
+    Returns:
+        dict: Scale parameters, student count, {stage: median seconds} and
+            {stage: [seconds of every run]}
+    """
+    folder = os.path.join(work_dir, 'Attendance sheets')
+    started = time.perf_counter()
+    paths = write_synthetic_weeks(folder, scale['weeks'], FIRST_WEEK, scale['groups'],
+                                  scale['students_per_group'])
+    generate_seconds = time.perf_counter() - started
+
+    # The analyzer writes the feed, search index and master dashboard to the working directory
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    output = None if verbose else io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+            analyzer = MultiWeekAttendanceAnalyzer('weeks')
+            seed_history(analyzer, paths[:-1])
+            week_info = add_week(analyzer, paths[-1])
+            runs = {}
+            for _ in range(repeat):
+                for stage, seconds in time_week_stages(analyzer, week_info, paths[-1]).items():
+                    runs.setdefault(stage, []).append(seconds)
+    finally:
+        os.chdir(previous_dir)
+
+    return {
+        'scale': name,
+        'groups': scale['groups'],
+        'students_per_group': scale['students_per_group'],
+        'weeks': scale['weeks'],
+        'students': week_info['summary']['total_students'],
+        'generate_seconds': generate_seconds,
+        'stages': {stage: statistics.median(seconds) for stage, seconds in runs.items()},
+        'runs': runs,
+    }
+
+
+def print_results(results):
+    header = f"{'stage':<14}" + ''.join(f"{result['scale']:>12}" for result in results)
+    print(header)
+    print('-' * len(header))
+    print(f"{'students':<14}" + ''.join(f"{result['students']:>12}" for result in results))
+    print(f"{'weeks':<14}" + ''.join(f"{result['weeks']:>12}" for result in results))
+    for stage in STAGES:
+        print(f"{stage:<14}" + ''.join(f"{result['stages'][stage]:>11.3f}s" for result in results))
+    print(f"{'total':<14}" + ''.join(f"{sum(result['stages'].values()):>11.3f}s" for result in results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each analysis stage on synthetic workbooks at several scales")
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=sorted(SCALES),
+                        help="scales to run (default: small medium)")
+    parser.add_argument('--repeat', type=int,
+                        help="runs per scale, the median is reported (default: 1, or 5 with a baseline)")
+    parser.add_argument('--output', help="also write the results as JSON")
+    parser.add_argument('--keep', action='store_true', help="keep the generated workbooks and outputs")
+    parser.add_argument('--verbose', action='store_true', help="show the analyzer output")
+    parser.add_argument('--save-baseline', action='store_true', help="record the results as the new baseline")
+    parser.add_argument('--compare', action='store_true',
+                        help="compare with the baseline; exits with status 1 if a stage regressed")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f"baseline file (default: {DEFAULT_BASELINE})")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f"relative slowdown tolerated per stage (default: {THRESHOLD})")
+    parser.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                        help=f"absolute slowdown in seconds tolerated per stage (default: {MIN_DELTA})")
+    args = parser.parse_args()
+
+    # Load the baseline first so a missing or outdated one fails before the long run
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_baseline(args.baseline)
+        except ValueError as e:
+            parser.error(str(e))
+    repeat = args.repeat or (5 if args.compare or args.save_baseline else 1)
+
+    results = []
+    for name in args.scales:
+        work_dir = tempfile.mkdtemp(prefix=f"attendance_bench_{name}_")
+        print(f"Running {name} scale in {work_dir}")
+        try:
+            results.append(run_scale(name, SCALES[name], work_dir, repeat, args.verbose))
+        finally:
+            if not args.keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'results': results}, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+    passed = True
+    if baseline is not None:
+        print()
+        rows = compare_to_baseline(baseline, make_baseline(results), args.threshold, args.min_delta)
+        passed = print_comparison(rows, baseline)
+    if args.save_baseline:
+        save_baseline(make_baseline(results), args.baseline)
+        print(f"\nBaseline saved: {args.baseline}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,170 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from sheet_cache import DAYS_PER_WEEK, FIRST_STUDENT_ROW, ROSTER_COLUMNS, SESSIONS_PER_DAY
+
+# Cell classes
+PRESENT, ABSENT, BLANK, SUSPICIOUS = 0, 1, 2, 3
+CLASS_NAMES = ['present', 'absent', 'blank', 'suspicious']
+
+SESSION_COLUMNS = DAYS_PER_WEEK * SESSIONS_PER_DAY
+
+
+def _is_number(value):
+    """bool or numeric cell value (NaN included; blanks are masked separately)"""
+    return isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating))
+
+
+_is_number_cell = np.frompyfunc(_is_number, 1, 1)
+_is_blank_text = np.frompyfunc(lambda value: isinstance(value, str) and not value.strip(), 1, 1)
+
+
+def column_letter(index):
+    """0-based column index -> Excel column letters (3 -> "D")"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def student_rows(df):
+    """
+    Row indexes of the student rows of a sheet (read with header=None)
+
+    Same rule as the parser: rows from row 4 with a name of at least 3
+    characters, until an invalid name is followed by another invalid one
+    within the next 3 rows (the end of the list).
+    """
+    names = df.iloc[FIRST_STUDENT_ROW - 1:, 1].to_numpy(dtype=object)
+    if len(names) == 0:
+        return np.array([], dtype=int)
+    valid = np.array([isinstance(name, str) and len(name.strip()) >= 3 for name in names])
+    invalid = (~valid).astype(int)
+    # Invalid names among each row and the two following ones
+    padded = np.concatenate([invalid, [0, 0]])
+    window = padded[:-2] + padded[1:-1] + padded[2:]
+    ends = np.flatnonzero(invalid.astype(bool) & (window >= 2))
+    end = ends[0] if len(ends) else len(names)
+    return np.flatnonzero(valid[:end]) + FIRST_STUDENT_ROW - 1
+
+
+def session_block(df, rows):
+    """Students × 20 object array of the session cells of the given rows (missing columns are blank)"""
+    block = df.iloc[rows, ROSTER_COLUMNS:ROSTER_COLUMNS + SESSION_COLUMNS].to_numpy(dtype=object)
+    if block.shape[1] < SESSION_COLUMNS:
+        block = np.hstack([block, np.full((len(rows), SESSION_COLUMNS - block.shape[1]), None, dtype=object)])
+    return block
+
+
+def classify_cells(values):
+    """
+    Classify a 2-D object array of session cells in one sweep
+
+    present: True or the number 1; absent: False or the number 0; blank:
+    empty or whitespace-only; suspicious: anything else (text such as 'x'
+    or '1', other numbers, dates), which the parser counts as an absence.
+
+    Returns:
+        numpy.ndarray: int8 array of PRESENT, ABSENT, BLANK or SUSPICIOUS
+    """
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=np.int8)
+    blank = pd.isna(values) | _is_blank_text(values).astype(bool)
+
+    numbers = np.full(values.shape, np.nan)
+    known = _is_number_cell(values).astype(bool) & ~blank
+    numbers[known] = values[known].astype(float)
+
+    classes = np.full(values.shape, SUSPICIOUS, dtype=np.int8)
+    classes[known & (numbers == 1)] = PRESENT
+    classes[known & (numbers == 0)] = ABSENT
+    classes[blank] = BLANK
+    return classes
+
+
+def validate_sheet(df, sheet_name):
+    """
+    Cell counts and suspicious cells of one group sheet
+
+    A session left blank for every student of the sheet was not filled in
+    (a forgotten entry, or a day that has not happened yet) and is listed
+    under 'not_recorded' instead of counting as everyone's absence.
+
+    Returns:
+        dict: {'sheet', 'counts': {class: n}, 'suspicious': [{'cell',
+            'value', 'student', 'day', 'session'}], 'not_recorded': [[day,
+            session]]} with Excel cell references and 1-based days and sessions
+    """
+    rows = student_rows(df) if not df.empty else np.array([], dtype=int)
+    block = session_block(df, rows)
+    classes = classify_cells(block)
+
+    counts = np.bincount(classes.ravel(), minlength=len(CLASS_NAMES))
+    suspicious = []
+    for r, c in zip(*np.nonzero(classes == SUSPICIOUS)):
+        row = rows[r]
+        value = block[r, c]
+        suspicious.append({
+            'cell': f"{column_letter(ROSTER_COLUMNS + c)}{row + 1}",
+            'value': value if isinstance(value, (str, bool, int, float)) else str(value),
+            'student': str(df.iloc[row, 1]).strip(),
+            'day': int(c // SESSIONS_PER_DAY) + 1,
+            'session': int(c % SESSIONS_PER_DAY) + 1,
+        })
+    return {
+        'sheet': sheet_name,
+        'counts': {name: int(count) for name, count in zip(CLASS_NAMES, counts)},
+        'suspicious': suspicious,
+        'not_recorded': not_recorded_slots(classes),
+    }
+
+
+def not_recorded_slots(classes):
+    """
+    Sessions that are blank in every student row of a classified block
+
+    Returns:
+        list: [day, session] pairs (1-based), empty when the block has no rows
+    """
+    if len(classes) == 0:
+        return []
+    blank = (classes == BLANK).all(axis=0).reshape(DAYS_PER_WEEK, SESSIONS_PER_DAY)
+    return [[int(day) + 1, int(session) + 1] for day, session in zip(*np.nonzero(blank))]
+
+
+def build_anomaly_report(week_id, sheets):
+    """
+    Per-group anomaly report of a week
+
+    Args:
+        sheets (list): (group_name, validation) for every sheet; sheets of
+            the same group are combined, and a session is not recorded for the
+            group only when it is not recorded in all of its sheets
+
+    Returns:
+        dict: Week totals and, per group, cell counts, suspicious cells and
+            not-recorded sessions
+    """
+    totals = dict.fromkeys(CLASS_NAMES, 0)
+    groups = {}
+    for group_name, validation in sheets:
+        if validation is None:
+            continue
+        slots = [list(slot) for slot in validation.get('not_recorded', [])]
+        group = groups.setdefault(group_name, {'counts': dict.fromkeys(CLASS_NAMES, 0), 'suspicious': [], 'not_recorded': slots})
+        for name, count in validation['counts'].items():
+            group['counts'][name] += count
+            totals[name] += count
+        group['suspicious'].extend(dict(cell, sheet=validation['sheet']) for cell in validation['suspicious'])
+        group['not_recorded'] = [slot for slot in group['not_recorded'] if slot in slots]
+    totals['not_recorded'] = sum(len(group['not_recorded']) for group in groups.values())
+    return {'week_id': week_id, 'totals': totals, 'groups': groups}
+
+
+def save_anomaly_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from group_registry import normalize_group_name
+
 def check_new_week_structure(excel_file_path):
     """
     Check the structure of the new week's Excel file to compare with previous week
@@ -86,10 +88,12 @@ def check_new_week_structure(excel_file_path):
             'SAM 6', 'SAM 3', 'SAM 4', 'SAM 5', 'Diang', 'Dabal', 'Aman+Elc+Fahss'
         }
         
-        current_groups = set(group_details.keys())
+        # Compare canonical names so trailing spaces or case changes don't count as new groups
+        current_by_key = {normalize_group_name(g): g for g in group_details}
+        previous_by_key = {normalize_group_name(g): g for g in previous_groups}
         
-        new_groups = current_groups - previous_groups
-        missing_groups = previous_groups - current_groups
+        new_groups = {current_by_key[k] for k in current_by_key.keys() - previous_by_key.keys()}
+        missing_groups = {previous_by_key[k] for k in previous_by_key.keys() - current_by_key.keys()}
         
         if new_groups:
             print(f"\\n🆕 NEW GROUPS ({len(new_groups)}):")
@@ -117,5 +121,5 @@ def check_new_week_structure(excel_file_path):
         return None
 
 # Check the new week's structure
-new_week_file = r'Attendance sheets\كشوفات الغياب الاسبوعي 07-09-2025(drive).xlsx'
+new_week_file = os.path.join('Attendance sheets', 'كشوفات الغياب الاسبوعي 07-09-2025(drive).xlsx')
 structure_info = check_new_week_structure(new_week_file)
\ No newline at end of file
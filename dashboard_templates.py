@@ -0,0 +1,57 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(PROJECT_DIR, 'templates')
+STATIC_DIR = os.path.join(PROJECT_DIR, 'static')
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """
+    HTML template with {{ name }} placeholders, split once into literal chunks
+
+    Rendering only joins the precomputed chunks with the context values, so
+    no parsing happens per page.
+    """
+
+    def __init__(self, source):
+        parts = PLACEHOLDER.split(source)
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+
+    def render(self, **context):
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(str(context[name]))
+            out.append(literal)
+        return ''.join(out)
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Load and compile a template from templates/ (cached for the process)"""
+    with open(os.path.join(TEMPLATES_DIR, name), 'r', encoding='utf-8') as f:
+        return CompiledTemplate(f.read())
+
+
+def static_url(output_dir):
+    """Relative URL from a page written in output_dir to the shared static/ directory"""
+    return os.path.relpath(STATIC_DIR, os.path.abspath(output_dir)).replace(os.sep, '/')
+
+
+def script_json(data):
+    """JSON for embedding inside a <script> block"""
+    return json.dumps(data, ensure_ascii=False).replace('</', '<\\/')
+
+
+def render_page(template_name, output_path, **context):
+    """Render a template to output_path, pointing it at the shared static assets"""
+    output_dir = os.path.dirname(output_path) or '.'
+    html_content = get_template(template_name).render(static=static_url(output_dir), **context)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return output_path
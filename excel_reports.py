@@ -0,0 +1,101 @@
+import numpy as np
+from openpyxl import Workbook
+
+SUMMARY_HEADERS = ('Group', 'Total Students', 'Full Week', 'Partial', 'Never', 'Avg Attendance %')
+STUDENT_HEADERS = ('Group', 'Student Number', 'Student Name', 'Student ID')
+
+
+def _cell(value):
+    """Excel-friendly cell value (numpy scalars are written as plain Python numbers)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_attendance_report(filepath, group_stats, students, day_labels,
+                            session_labels=None, summary_headers=SUMMARY_HEADERS, extra_sheets=None,
+                            days_elapsed=5):
+    """
+    Write the attendance workbook in constant memory
+
+    The workbook is opened in openpyxl write-only mode, so rows are streamed
+    to disk instead of building a DataFrame or a workbook model. The student
+    table's columns are read directly, and a single pass over them fills the
+    All Students, Full Week Students and Never Attended sheets.
+
+    Args:
+        filepath (str): Output .xlsx path
+        group_stats (dict): Group statistics from the analysis
+        students (StudentTable): Students of the week
+        day_labels (list): Headers of the 5 daily ✓/✗ columns
+        session_labels (list): Optional headers of 5 "sessions attended" columns
+        summary_headers (tuple): Headers of the Summary sheet
+        extra_sheets (dict): Optional sheet name -> list of row dicts appended at the end
+        days_elapsed (int): Days recorded so far for a provisional (partial) week;
+            rates and "full week" are taken over these days only, minus the
+            days a student's sheet did not record
+    """
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet('Summary')
+    students_sheet = workbook.create_sheet('All Students')
+    full_week_sheet = workbook.create_sheet('Full Week Students')
+    never_sheet = workbook.create_sheet('Never Attended')
+
+    summary_sheet.append(list(summary_headers))
+    for group, stats in group_stats.items():
+        summary_sheet.append([
+            group,
+            stats['total_students'],
+            stats['full_week_count'],
+            stats['partial_count'],
+            stats['never_attended_count'],
+            round(stats['average_attendance'], 1),
+        ])
+
+    students_sheet.append(
+        list(STUDENT_HEADERS) + ['Days Attended', 'Attendance %', 'Total Sessions']
+        + list(day_labels) + list(session_labels or [])
+    )
+    full_week_sheet.append(list(STUDENT_HEADERS))
+    never_sheet.append(list(STUDENT_HEADERS))
+
+    # Columns of the student table: students × days × sessions and per-day arrays
+    day_counts = students.sessions.sum(axis=2)
+    days_attended = students.days_attended
+    total_sessions = day_counts.sum(axis=1)
+    # Rates are over the elapsed days that were recorded for each student's sheet
+    rated_days = students.rated_days(days_elapsed)
+    possible_sessions = np.minimum(students.possible_sessions, days_elapsed * 4)
+    rates = students.rates(days_elapsed)
+    marks = np.where(students.daily.astype(bool), '✓', '✗')
+    session_marks = np.char.add(day_counts.astype(str), '/4') if session_labels else None
+
+    identities = zip(students.group_names, students.number_values(), students.names, students.id_values())
+    for i, identity in enumerate(identities):
+        identity = list(identity)
+        row = identity + [
+            int(days_attended[i]),
+            round(float(rates[i]), 1),
+            f"{total_sessions[i]}/{possible_sessions[i]}",
+        ] + marks[i].tolist()
+        if session_marks is not None:
+            row += session_marks[i].tolist()
+        students_sheet.append(row)
+
+        if not rated_days[i]:
+            continue
+        if days_attended[i] == rated_days[i]:
+            full_week_sheet.append(identity)
+        elif days_attended[i] == 0:
+            never_sheet.append(identity)
+
+    for sheet_name, rows in (extra_sheets or {}).items():
+        if not rows:
+            continue
+        sheet = workbook.create_sheet(sheet_name)
+        headers = list(rows[0].keys())
+        sheet.append(headers)
+        for row in rows:
+            sheet.append([_cell(row[h]) for h in headers])
+
+    workbook.save(filepath)
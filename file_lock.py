@@ -0,0 +1,62 @@
+import contextlib
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _acquire(f, blocking):
+    """Exclusive lock on an open file; returns False if blocking is off and another process holds it"""
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.05)
+
+
+def _release(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def file_lock(path, blocking=True):
+    """
+    Hold an exclusive inter-process lock for a shared file (on path + '.lock')
+
+    Wrap every read-modify-write of a file that parallel analyses update, so
+    one process does not overwrite another's changes. The lock is not
+    re-entrant: do not take the lock of the same file twice in one process.
+    Locks of different files are always taken in the same order (state file
+    first, then the weeks index).
+
+    Yields:
+        bool: False (without the lock) if blocking is off and it is taken
+    """
+    lock_path = path + '.lock'
+    directory = os.path.dirname(os.path.abspath(lock_path))
+    os.makedirs(directory, exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        acquired = _acquire(f, blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _release(f)
@@ -0,0 +1,177 @@
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+# "كشوفات الغياب الاسبوعي DD-MM-YYYY(drive).xlsx", day and month may have one digit
+WORKBOOK_PATTERN = re.compile(r'^كشوفات الغياب الاسبوعي (\d{1,2})-(\d{1,2})-(\d{4})\s*\(drive\)\.xlsx$')
+
+# Sunday to Thursday
+WEEK_LENGTH_DAYS = 5
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+def week_from_filename(filename):
+    """
+    Week details from a weekly workbook file name
+
+    Returns a dict with week_id, start_date, end_date (both "DD-Mon") and
+    year, or None if the name does not follow the workbook pattern. The
+    date in the file name is the first day (Sunday) of the week.
+    """
+    match = WORKBOOK_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    try:
+        start = datetime(year, month, day)
+    except ValueError:
+        return None
+    end = start + timedelta(days=WEEK_LENGTH_DAYS - 1)
+    return {
+        'week_id': f"week_{start.day}{start:%b}-{end.day}{end:%b}",
+        'start_date': f"{start.day}-{start:%b}",
+        'end_date': f"{end.day}-{end:%b}",
+        'year': start.year,
+        'start': start,
+    }
+
+
+def is_complete_workbook(path):
+    """An xlsx is a zip archive; a partial upload fails the central directory check"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return 'xl/workbook.xml' in archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class FolderWatcher:
+    """
+    Watch a folder for new or changed weekly workbooks
+
+    On Linux inotify (through ctypes) wakes the watcher as soon as a file is
+    written; elsewhere, or if inotify is unavailable, the folder is polled.
+    Either way a file is only handed over once its size and modification
+    time have not changed for `settle_seconds` and it opens as a complete
+    xlsx, so uploads that are still being copied are not picked up.
+    """
+
+    def __init__(self, folder, pattern=WORKBOOK_PATTERN, settle_seconds=5.0, poll_interval=2.0):
+        self.folder = folder
+        self.pattern = pattern
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}
+        self.delivered = {}
+        self.inotify_fd = self._open_inotify()
+
+    def _open_inotify(self):
+        if not hasattr(os, 'uname') or os.uname().sysname != 'Linux':
+            return None
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return None
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+            if libc.inotify_add_watch(fd, os.fsencode(self.folder), mask) < 0:
+                os.close(fd)
+                return None
+        except (AttributeError, OSError):
+            return None
+        return fd
+
+    @property
+    def mode(self):
+        return 'inotify' if self.inotify_fd is not None else 'polling'
+
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+    def _wait(self):
+        """Block until something in the folder changes (inotify) or the poll interval passes"""
+        if self.inotify_fd is None:
+            time.sleep(self.poll_interval)
+            return
+
+        # With files settling we only need to wake up to re-check them
+        timeout = min(self.poll_interval, self.settle_seconds) if self.pending else None
+        readable, _, _ = select.select([self.inotify_fd], [], [], timeout)
+        if readable:
+            # Events only wake the watcher up; the folder scan decides what changed
+            try:
+                while os.read(self.inotify_fd, 64 * 1024):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def _scan(self):
+        """Return {path: (size, mtime)} for the matching files in the folder"""
+        files = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file() and self.pattern.match(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Deleted since the directory was listed
+                        continue
+                    files[entry.path] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def ready_files(self):
+        """
+        Files that are new or changed since they were last delivered and have settled
+
+        Call repeatedly; the first call returns nothing until the settle time
+        has passed.
+        """
+        now = time.monotonic()
+        ready = []
+        for path, signature in self._scan().items():
+            if self.delivered.get(path) == signature:
+                continue
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != signature:
+                self.pending[path] = (signature, now)
+                continue
+            if now - previous[1] >= self.settle_seconds and is_complete_workbook(path):
+                ready.append(path)
+                self.delivered[path] = signature
+                del self.pending[path]
+        # Oldest week first, so incremental trackers see weeks in order
+        return sorted(ready, key=lambda path: (week_from_filename(path) or {}).get('start', datetime.min))
+
+    def run(self, callback, stop=None):
+        """
+        Call `callback(path)` for every workbook that appears or changes
+
+        Runs until interrupted, or until `stop()` returns True. Files present
+        at start-up are delivered too; the callback decides whether they
+        still need work.
+        """
+        print(f"Watching {self.folder} ({self.mode})")
+        try:
+            while stop is None or not stop():
+                for path in self.ready_files():
+                    callback(path)
+                self._wait()
+        finally:
+            self.close()
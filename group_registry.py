@@ -0,0 +1,176 @@
+import json
+import os
+import re
+
+import pandas as pd
+
+from file_lock import file_lock
+
+# Manual aliases: canonical group name -> other spellings seen in the sheets
+DEFAULT_ALIASES = {
+    'Aman+Elc+Fahss': ['Aman Elc Fahss', 'Aman+Elc+Fahs', 'Aman & Elc & Fahss', 'Aman-Elc-Fahss'],
+}
+
+
+def normalize_group_name(name):
+    """
+    Normalization key for a sheet name
+
+    Trailing/duplicate spaces and case are ignored, spaces around "+" are
+    dropped, and a space is put between a name and its number so that
+    "SAIPEM 7 ", "saipem7" and "SAIPEM  7" all give "saipem 7".
+    """
+    text = ' '.join(str(name).split()).casefold()
+    text = re.sub(r'\s*\+\s*', '+', text)
+    text = re.sub(r'(?<=[^\W\d_])(?=\d)', ' ', text)
+    return text
+
+
+class GroupRegistry:
+    """
+    Canonical group index mapping every sheet name to a stable integer id
+
+    Ids are assigned the first time a group is seen and never change, so
+    group-level data from different weeks can be joined on integer keys.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.groups = {}
+        self.aliases = {}
+        self._keys = {}
+        for canonical, spellings in DEFAULT_ALIASES.items():
+            for spelling in spellings:
+                self.aliases[normalize_group_name(spelling)] = normalize_group_name(canonical)
+
+    def _read(self):
+        """Groups and aliases saved on disk ({} and {} if the file does not exist)"""
+        if not os.path.exists(self.path):
+            return {}, {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {int(group_id): info for group_id, info in data['groups'].items()}, data.get('aliases', {})
+
+    def _merge_saved(self):
+        """Take in the groups other processes saved; the saved id wins for a group known both ways"""
+        groups, aliases = self._read()
+        self.aliases.update(aliases)
+        saved_keys = {info['key'] for info in groups.values()}
+        for group_id, info in self.groups.items():
+            if info['key'] in saved_keys:
+                continue
+            if group_id in groups:
+                print(f"Group id {group_id} of '{info['name']}' was taken by another process, re-register it")
+                continue
+            groups[group_id] = info
+        self.groups = groups
+        self._keys = {info['key']: group_id for group_id, info in self.groups.items()}
+
+    def load(self):
+        """Load the registry from disk if it exists"""
+        if os.path.exists(self.path):
+            self.groups, aliases = self._read()
+            self.aliases.update(aliases)
+        self._keys = {info['key']: group_id for group_id, info in self.groups.items()}
+        return self
+
+    def save(self):
+        """Persist the registry, merged with the groups other processes saved meanwhile"""
+        with file_lock(self.path):
+            self._merge_saved()
+            self._write()
+
+    def _write(self):
+        data = {
+            'groups': {str(group_id): info for group_id, info in sorted(self.groups.items())},
+            'aliases': self.aliases,
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def register(self, sheet_names):
+        """
+        Resolve sheet names, assigning and saving ids for new groups under the registry lock
+
+        Parallel analyses register their sheets through here, so two new
+        groups never get the same id.
+
+        Returns:
+            list: Group id of every sheet name
+        """
+        with file_lock(self.path):
+            self._merge_saved()
+            group_ids = [self.resolve(name) for name in sheet_names]
+            self._write()
+        return group_ids
+
+    def _key(self, name):
+        key = normalize_group_name(name)
+        return self.aliases.get(key, key)
+
+    def add_alias(self, alias, canonical):
+        """Declare that sheet name `alias` refers to the group `canonical`"""
+        self.aliases[normalize_group_name(alias)] = self._key(canonical)
+
+    def resolve(self, sheet_name):
+        """Return the group id for a sheet name, registering new groups"""
+        key = self._key(sheet_name)
+        group_id = self._keys.get(key)
+        if group_id is None:
+            group_id = max(self.groups, default=0) + 1
+            self.groups[group_id] = {'name': ' '.join(str(sheet_name).split()), 'key': key}
+            self._keys[key] = group_id
+        return group_id
+
+    def lookup(self, sheet_name):
+        """Return the group id for a sheet name, or None if the group is unknown"""
+        return self._keys.get(self._key(sheet_name))
+
+    def name(self, group_id):
+        """Display name of a group id"""
+        return self.groups[group_id]['name']
+
+    def canonical_name(self, sheet_name):
+        """Display name for a sheet name"""
+        return self.name(self.resolve(sheet_name))
+
+
+def load_week_group_stats(week_info):
+    """Load the saved group statistics of a week (None if not analyzed)"""
+    week_dir = week_info["directory"].replace('\\', os.sep)
+    path = os.path.join(week_dir, f"data_{week_info['week_id']}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['group_stats']
+
+
+def group_week_matrix(weeks_data, registry, metric='average_attendance'):
+    """
+    Groups × weeks matrix of one group statistic
+
+    Every week's group statistics are keyed by group id before the join, so
+    renamed or inconsistently spaced sheets line up in the same row.
+    """
+    frames = []
+    for week_id, week_info in weeks_data.items():
+        group_stats = load_week_group_stats(week_info)
+        if not group_stats:
+            continue
+        frames.append(pd.DataFrame({
+            'group_id': [stats.get('group_id') or registry.resolve(group) for group, stats in group_stats.items()],
+            'week_id': week_id,
+            'value': [stats[metric] for stats in group_stats.values()],
+        }))
+
+    if not frames:
+        return pd.DataFrame()
+
+    matrix = pd.concat(frames, ignore_index=True).pivot_table(
+        index='group_id', columns='week_id', values='value', aggfunc='mean'
+    )
+    matrix = matrix.reindex(columns=[w for w in weeks_data if w in matrix.columns])
+    matrix.insert(0, 'group', [registry.name(group_id) for group_id in matrix.index])
+    return matrix
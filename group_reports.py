@@ -0,0 +1,138 @@
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+
+DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu']
+
+
+def group_slug(group):
+    """File-name-safe version of a group name (e.g. "Aman+Elc+Fahss" -> "aman_elc_fahss")"""
+    return re.sub(r'[^0-9a-z]+', '_', group.casefold()).strip('_') or 'group'
+
+
+def group_file_stem(group, group_id=None):
+    """
+    Report file name (without extension) of a group, e.g. "20_aman_elc_fahss"
+
+    The canonical group id keeps the names of groups apart whose slugs are
+    the same, such as two Arabic-named groups (both slug to "group").
+    """
+    slug = group_slug(group)
+    return slug if group_id is None else f"{group_id}_{slug}"
+
+
+def _rows(students):
+    """(number, name, ID, days attended, %, sessions, daily, recorded days) per student of a StudentTable"""
+    return zip(
+        students.number_values(), students.names, students.id_values(), students.days_attended.tolist(),
+        students.percentage.tolist(), students.sessions.tolist(), students.daily.tolist(), students.recorded_days.tolist(),
+    )
+
+
+def _write_group_xlsx(path, group, title, students):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(group[:31])
+    sheet.append([title])
+    sheet.append(
+        ['Student Number', 'Student Name', 'Student ID', 'Days Attended', 'Attendance %']
+        + [f"{day} S{session + 1}" for day in DAY_NAMES for session in range(4)]
+        + [f"{day} Day" for day in DAY_NAMES]
+    )
+    for number, name, student_id, days_attended, percentage, sessions, daily, recorded in _rows(students):
+        sheet.append(
+            [number, name, student_id, days_attended, round(percentage, 1)]
+            + [v for day in sessions for v in day]
+            + [('✓' if d else '✗') if r else '–' for d, r in zip(daily, recorded)]
+        )
+    workbook.save(path)
+
+
+def _write_group_html(path, group, title, students):
+    day_headers = ''.join(f'<th colspan="4">{day}</th>' for day in DAY_NAMES)
+    session_headers = ''.join(f'<th>{n}</th>' for _ in DAY_NAMES for n in range(1, 5))
+
+    rows = ''
+    for number, name, student_id, days_attended, _, sessions, daily, recorded in _rows(students):
+        cells = ''
+        for day_sessions, present, day_recorded in zip(sessions, daily, recorded):
+            day_class = '' if present else (' absent-day' if day_recorded else ' unrecorded')
+            for i, value in enumerate(day_sessions):
+                classes = ('on' if value else 'off') + (' day-start' if i == 0 else '') + day_class
+                cells += f'<td class="{classes}">{"●" if value else ""}</td>'
+        rows += (
+            f'<tr><td>{html.escape(str(number))}</td>'
+            f'<td class="name">{html.escape(name)}</td>'
+            f'<td>{html.escape(str(student_id))}</td>'
+            f'{cells}'
+            f'<td>{days_attended}/{sum(recorded)}</td></tr>'
+        )
+
+    content = f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 20px; color: #2c3e50; }}
+        h1 {{ font-size: 1.4rem; }}
+        table {{ border-collapse: collapse; font-size: 0.85rem; }}
+        th, td {{ border: 1px solid #dee2e6; padding: 4px 6px; text-align: center; }}
+        th {{ background: #3498db; color: white; }}
+        td.name {{ text-align: right; direction: rtl; white-space: nowrap; }}
+        td.on {{ background: #d4edda; color: #2ca02c; }}
+        td.off {{ background: #fff; }}
+        td.absent-day {{ background: #f8d7da; }}
+        td.unrecorded {{ background: #e9ecef; }}
+        td.day-start {{ border-left: 2px solid #2c3e50; }}
+    </style>
+</head>
+<body>
+    <h1>{html.escape(title)}</h1>
+    <p>{len(students)} students &middot; ● = session attended &middot; red = day not counted (fewer than 3/4 sessions) &middot; grey = day not recorded</p>
+    <table>
+        <thead>
+            <tr><th rowspan="2">#</th><th rowspan="2">Name</th><th rowspan="2">ID</th>{day_headers}<th rowspan="2">Days</th></tr>
+            <tr>{session_headers}</tr>
+        </thead>
+        <tbody>{rows}</tbody>
+    </table>
+</body>
+</html>'''
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def write_group_report(job):
+    """Write the xlsx and HTML report of one group (runs in a worker process)"""
+    output_dir, group, group_id, title, students = job
+    base = os.path.join(output_dir, group_file_stem(group, group_id))
+    _write_group_xlsx(base + '.xlsx', group, title, students)
+    _write_group_html(base + '.html', group, title, students)
+    return group
+
+
+def create_group_reports(output_dir, group_stats, period_label, max_workers=None):
+    """
+    Write one supervisor report per group using a process pool
+
+    Args:
+        output_dir (str): Directory receiving <group id>_<group>.xlsx and .html
+        group_stats (dict): Group statistics including each group's StudentTable
+        period_label (str): Week label used in the report titles
+        max_workers (int): Worker processes (defaults to the CPU count)
+
+    Returns the list of groups written.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    jobs = [
+        (output_dir, group, stats.get('group_id'), f"{group} - Attendance {period_label}", stats['students'])
+        for group, stats in group_stats.items()
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(write_group_report, jobs))
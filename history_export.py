@@ -0,0 +1,208 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from attendance_history import DAYS_PER_WEEK, load_recorded_days, load_week_students, week_start_datetime
+from group_registry import load_week_group_stats
+from weeks_index import load_weeks_index
+
+SESSIONS_PER_DAY = 4
+SLOTS = DAYS_PER_WEEK * SESSIONS_PER_DAY
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _pyarrow():
+    """pyarrow, imported on first use so the rest of the system runs without it"""
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow export needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def history_weeks(weeks_data):
+    """(week start, week_id, week_info, student records) of every week with saved records, oldest first"""
+    weeks = []
+    for week_id, week_info in weeks_data.items():
+        records = load_week_students(week_info)
+        if records is None:
+            print(f"No student records for {week_id}, re-run analyze_week to include it in the export")
+            continue
+        weeks.append((week_start_datetime(week_info), week_id, week_info, records))
+    weeks.sort(key=lambda item: item[0])
+    return weeks
+
+
+def session_columns(week_id, week_start, records):
+    """
+    One row per student × day × session of a week, as numpy columns
+
+    Text columns are dictionary encoded: `person_codes` index `person_keys`
+    and `names`, `group_codes` index `groups`. Every column is produced by
+    repeating or reshaping the stored arrays, never row by row.
+
+    Returns:
+        dict: numpy arrays (person_codes, group_codes, group_id, date, day,
+            session, present, recorded) plus the dictionaries
+    """
+    count = len(records['person_key'])
+    sessions = np.array(records['session_data'], dtype=np.int8).reshape(count, SLOTS)
+    recorded = np.repeat(load_recorded_days(records).astype(bool), SESSIONS_PER_DAY, axis=1)
+    group_codes, groups = pd.factorize(pd.Series(records['group'], dtype=object))
+    group_ids = records.get('group_id') or [None] * count
+
+    day = np.tile(np.repeat(np.arange(1, DAYS_PER_WEEK + 1, dtype=np.int8), SESSIONS_PER_DAY), count)
+    dates = np.datetime64(week_start.date(), 'D') + np.arange(DAYS_PER_WEEK)
+    return {
+        'week_id': week_id,
+        'person_keys': records['person_key'],
+        'names': records['name'],
+        'groups': list(groups),
+        'person_codes': np.repeat(np.arange(count, dtype=np.int32), SLOTS),
+        'group_codes': np.repeat(group_codes.astype(np.int32), SLOTS),
+        'group_id': np.repeat(np.array([-1 if g is None else g for g in group_ids], dtype=np.int32), SLOTS),
+        'date': dates[day - 1],
+        'day': day,
+        'session': np.tile(np.arange(1, SESSIONS_PER_DAY + 1, dtype=np.int8), count * DAYS_PER_WEEK),
+        'present': sessions.ravel().astype(bool),
+        'recorded': recorded.ravel(),
+    }
+
+
+def session_table(columns):
+    """Arrow table of session_columns; numeric columns wrap the numpy buffers without copying"""
+    pa = _pyarrow()
+
+    def dictionary(codes, values):
+        return pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(values, type=pa.string()))
+
+    # week_id comes from the partition folder name
+    return pa.table({
+        'person_key': dictionary(columns['person_codes'], columns['person_keys']),
+        'name': dictionary(columns['person_codes'], columns['names']),
+        'group': dictionary(columns['group_codes'], columns['groups']),
+        'group_id': pa.array(columns['group_id']),
+        'date': pa.array(columns['date']),
+        'day': pa.array(columns['day']),
+        'session': pa.array(columns['session']),
+        'present': pa.array(columns['present']),
+        'recorded': pa.array(columns['recorded']),
+    })
+
+
+def week_aggregates(weeks):
+    """Rows of the per-week summary table"""
+    rows = []
+    for start, week_id, week_info, _ in weeks:
+        summary = week_info.get('summary', {})
+        rows.append({
+            'week_id': week_id,
+            'week_start': start.date(),
+            'description': week_info.get('description', ''),
+            'total_students': summary.get('total_students', 0),
+            'full_week': summary.get('full_week', 0),
+            'partial': summary.get('partial', 0),
+            'never': summary.get('never', 0),
+            'average_attendance': float(summary.get('average_attendance', 0.0)),
+            'groups': summary.get('groups', 0),
+            'days_elapsed': week_info.get('days_elapsed', DAYS_PER_WEEK),
+            'not_recorded_sessions': summary.get('not_recorded_sessions', 0),
+        })
+    return rows
+
+
+def group_aggregates(weeks):
+    """Rows of the per-week, per-group statistics table"""
+    rows = []
+    for start, week_id, week_info, _ in weeks:
+        for group, stats in (load_week_group_stats(week_info) or {}).items():
+            rows.append({
+                'week_id': week_id,
+                'week_start': start.date(),
+                'group_id': stats.get('group_id'),
+                'group': group,
+                'total_students': stats['total_students'],
+                'average_attendance': float(stats['average_attendance']),
+                'full_week_count': stats['full_week_count'],
+                'partial_count': stats['partial_count'],
+                'never_attended_count': stats['never_attended_count'],
+                'not_recorded_sessions': len(stats.get('not_recorded', [])),
+            })
+    return rows
+
+
+def _write(table, path, file_format):
+    pa = _pyarrow()
+    if file_format == 'parquet':
+        pa.parquet.write_table(table, path, compression='zstd')
+    else:
+        pa.feather.write_feather(table, path, compression='zstd')
+
+
+def export_history(weeks_data, output_dir='exports', file_format='parquet'):
+    """
+    Export the whole attendance history for BI tools
+
+    Writes to `output_dir`:
+      sessions/week_id=<week>/part-0.<ext>  person, group, date, day, session,
+                                             present and recorded, one file per
+                                             week (hive partitioning)
+      weeks.<ext>                            week summaries
+      groups.<ext>                           group statistics per week
+
+    The sessions folder is rebuilt on every export.
+
+    Returns:
+        dict: Weeks and session rows exported, files written and seconds taken
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format {file_format!r}, expected one of {', '.join(FORMATS)}")
+    pa = _pyarrow()
+    started = time.perf_counter()
+    extension = FORMATS[file_format]
+
+    sessions_dir = os.path.join(output_dir, 'sessions')
+    if os.path.isdir(sessions_dir):
+        shutil.rmtree(sessions_dir)
+
+    weeks = history_weeks(weeks_data)
+    rows = 0
+    files = []
+    for start, week_id, _, records in weeks:
+        table = session_table(session_columns(week_id, start, records))
+        partition = os.path.join(sessions_dir, f"week_id={week_id}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-0{extension}")
+        _write(table, path, file_format)
+        rows += table.num_rows
+        files.append(path)
+
+    for name, aggregate in (('weeks', week_aggregates(weeks)), ('groups', group_aggregates(weeks))):
+        path = os.path.join(output_dir, name + extension)
+        _write(pa.Table.from_pylist(aggregate), path, file_format)
+        files.append(path)
+
+    return {'weeks': len(weeks), 'rows': rows, 'files': files, 'seconds': time.perf_counter() - started}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the attendance history as partitioned Parquet or Arrow files")
+    parser.add_argument('--index', default='weeks_index.json', help="weeks index written by the analyzer")
+    parser.add_argument('--output', default='exports', help="output folder (default: exports)")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+    args = parser.parse_args()
+
+    weeks_data = load_weeks_index(args.index)
+    try:
+        result = export_history(weeks_data, args.output, args.format)
+    except ImportError as e:
+        raise SystemExit(str(e))
+    print(f"Exported {result['rows']} session rows from {result['weeks']} weeks "
+          f"to {args.output} ({len(result['files'])} files, {result['seconds']:.2f}s)")
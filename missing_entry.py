@@ -0,0 +1,138 @@
+import html
+import json
+import os
+
+import numpy as np
+
+from group_reports import DAY_NAMES
+from sheet_cache import DAYS_PER_WEEK, SESSIONS_PER_DAY
+
+
+def slot_mask(slots):
+    """Days × sessions bool mask of [day, session] pairs (1-based)"""
+    mask = np.zeros((DAYS_PER_WEEK, SESSIONS_PER_DAY), dtype=bool)
+    for day, session in slots:
+        mask[day - 1, session - 1] = True
+    return mask
+
+
+def slot_labels(slots):
+    """Readable not-recorded sessions, whole days collapsed ("Mon", "Tue S3, S4")"""
+    mask = slot_mask(slots)
+    labels = []
+    for day, sessions in enumerate(mask):
+        if sessions.all():
+            labels.append(DAY_NAMES[day])
+        elif sessions.any():
+            labels.append(f"{DAY_NAMES[day]} " + ', '.join(f"S{s + 1}" for s in np.flatnonzero(sessions)))
+    return labels
+
+
+def load_week_anomalies(week_info):
+    """Load the cell validation report of a week (None if it was never saved)"""
+    week_dir = week_info["directory"].replace('\\', os.sep)
+    path = os.path.join(week_dir, f"anomalies_{week_info['week_id']}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def not_recorded_cube(weeks_data, registry):
+    """
+    Weeks × groups × days × sessions mask of the sessions nobody filled in
+
+    Built from every week's anomaly report, with groups keyed by canonical
+    group id so renamed sheets line up across weeks.
+
+    Returns:
+        tuple: (week_ids, group_ids, cube, seen) where cube is a bool array
+            of shape (weeks, groups, 5, 4) and seen (weeks × groups) marks the
+            groups that had a sheet that week
+    """
+    weeks = []
+    for week_id, week_info in weeks_data.items():
+        report = load_week_anomalies(week_info)
+        if report is None:
+            print(f"No anomaly report for {week_id}, re-run analyze_week to include it")
+            continue
+        weeks.append((week_id, {registry.resolve(group): stats.get('not_recorded', [])
+                                for group, stats in report['groups'].items()}))
+
+    week_ids = [week_id for week_id, _ in weeks]
+    group_ids = sorted({group_id for _, groups in weeks for group_id in groups})
+    positions = {group_id: i for i, group_id in enumerate(group_ids)}
+    cube = np.zeros((len(week_ids), len(group_ids), DAYS_PER_WEEK, SESSIONS_PER_DAY), dtype=bool)
+    seen = np.zeros((len(week_ids), len(group_ids)), dtype=bool)
+    for w, (_, groups) in enumerate(weeks):
+        for group_id, slots in groups.items():
+            seen[w, positions[group_id]] = True
+            cube[w, positions[group_id]] = slot_mask(slots)
+    return week_ids, group_ids, cube, seen
+
+
+def not_recorded_report(weeks_data, registry):
+    """
+    Archive-wide summary of missing data entry
+
+    Whole days are days whose 4 sessions are all blank. Days still ahead
+    in a provisional week are not counted as missing.
+
+    Returns:
+        dict: Totals, per group (sessions and days missing, weeks affected)
+            and per week (groups with their not-recorded sessions)
+    """
+    week_ids, group_ids, cube, seen = not_recorded_cube(weeks_data, registry)
+
+    # Days after the last elapsed day of a provisional week are not missing entries
+    elapsed = np.array([weeks_data[week_id].get('days_elapsed', DAYS_PER_WEEK) for week_id in week_ids], dtype=int)
+    upcoming = np.arange(DAYS_PER_WEEK)[None, :] >= elapsed[:, None]
+    cube = cube & ~upcoming[:, None, :, None]
+
+    sessions = cube.sum(axis=(2, 3))
+    days = cube.all(axis=3).sum(axis=2)
+    affected = sessions > 0
+
+    groups = {}
+    for g in np.flatnonzero(affected.any(axis=0)):
+        groups[registry.name(group_ids[g])] = {
+            'group_id': group_ids[g],
+            'sessions': int(sessions[:, g].sum()),
+            'days': int(days[:, g].sum()),
+            'weeks': [week_ids[w] for w in np.flatnonzero(affected[:, g])],
+            'share': float(sessions[:, g].sum() / (seen[:, g].sum() * DAYS_PER_WEEK * SESSIONS_PER_DAY)),
+        }
+
+    weeks = {}
+    for w, week_id in enumerate(week_ids):
+        weeks[week_id] = {
+            registry.name(group_ids[g]): [[int(day) + 1, int(session) + 1] for day, session in zip(*np.nonzero(cube[w, g]))]
+            for g in np.flatnonzero(affected[w])
+        }
+
+    return {
+        'weeks_checked': len(week_ids),
+        'totals': {'sessions': int(sessions.sum()), 'days': int(days.sum()), 'group_weeks': int(affected.sum())},
+        'groups': dict(sorted(groups.items(), key=lambda item: item[1]['sessions'], reverse=True)),
+        'weeks': weeks,
+    }
+
+
+def save_not_recorded_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def not_recorded_note(group_stats):
+    """Week dashboard note listing the groups with sessions nobody filled in (empty when there are none)"""
+    items = [
+        f"<li>{html.escape(group)}: {html.escape(', '.join(slot_labels(stats['not_recorded'])))}</li>"
+        for group, stats in group_stats.items() if stats.get('not_recorded')
+    ]
+    if not items:
+        return ''
+    return (
+        "<p><strong>Not recorded:</strong> these sessions were left blank for the whole group "
+        "and are excluded from the attendance rates</p>"
+        f"<ul class=\"not-recorded\">{''.join(items)}</ul>"
+    )
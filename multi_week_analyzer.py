@@ -4,22 +4,69 @@ import seaborn as sns
 from collections import defaultdict
 import os
 import json
+import argparse
+import contextlib
 from datetime import datetime, timedelta
 import numpy as np
 
+from attendance_risk import AttendanceRiskTracker
+from attendance_history import AttendanceHistory, save_week_students, load_week_students, week_start_datetime, week_student_table
+from attendance_cohorts import CohortTracker, cohort_table_html
+from roster_diff import diff_rosters, roster_from_records
+from group_registry import GroupRegistry, group_week_matrix, load_week_group_stats
+from excel_reports import write_attendance_report
+from group_reports import create_group_reports
+from dashboard_templates import render_page, script_json
+from weeks_feed import load_feed, save_feed, upsert_week
+from student_search import build_search_index, save_search_index
+from folder_watch import FolderWatcher, week_from_filename
+from sheet_cache import SheetCache, average_attendance, elapsed_days, merge_partials, recorded_days, workbook_sheet_hashes
+from run_metrics import NULL_METRICS, RunMetrics
+from stage_profiler import StageProfiler
+from cell_validation import PRESENT, build_anomaly_report, classify_cells, save_anomaly_report, session_block, student_rows, validate_sheet
+from missing_entry import not_recorded_note, not_recorded_report, save_not_recorded_report, slot_mask
+from student_table import StudentTable
+from artifact_store import ArtifactStore
+from weeks_index import WeeksIndex
+from file_lock import file_lock
+
 class MultiWeekAttendanceAnalyzer:
     """
     Multi-week attendance analysis system that organizes data by weeks
     and provides a unified interface for week selection and analysis
     """
     
-    def __init__(self, base_dir="weeks"):
+    def __init__(self, base_dir="weeks", metrics=True, print_metrics=False, profile=False, profile_dir=None):
+        """
+        Args:
+            base_dir (str): Folder of the per-week outputs
+            metrics (bool): Time every stage of analyze_week and save the
+                timings and counters to weeks/<week_id>/metrics_<week_id>.json
+            print_metrics (bool): Also print them as a table after each run
+            profile (bool): Profile every stage of analyze_week (see profiling)
+            profile_dir (str): Where profiles go, one folder per week;
+                defaults to weeks/<week_id>/profile
+        """
         self.base_dir = base_dir
         self.weeks_data = {}
+        self.weeks_index = WeeksIndex('weeks_index.json')
+        # Week infos as last loaded from or saved to the index, to tell which ones this run changed
+        self._indexed = {}
+        self.metrics_enabled = metrics
+        self.print_metrics = print_metrics
+        self.profile_enabled = profile
+        self.profile_dir = profile_dir
+        self.metrics = NULL_METRICS
         
         # Ensure weeks directory exists
         if not os.path.exists(self.base_dir):
             os.makedirs(self.base_dir)
+        
+        # Canonical group ids shared by all weeks
+        self.group_registry = GroupRegistry(os.path.join(self.base_dir, 'group_registry.json')).load()
+        
+        # Charts and reports are stored once by content hash, week folders link to them
+        self.artifacts = ArtifactStore(os.path.join(self.base_dir, 'assets'))
     
     def add_week(self, week_id, start_date, end_date, excel_file_path, description=""):
         """
@@ -52,9 +99,16 @@ class MultiWeekAttendanceAnalyzer:
         
         return week_info
     
-    def analyze_week(self, week_id, excel_file_path):
+    def analyze_week(self, week_id, excel_file_path, partial_week=False):
         """
         Analyze attendance for a specific week
+        
+        Args:
+            week_id (str): Week added with add_week
+            excel_file_path (str): The week's workbook
+            partial_week (bool): Mid-week mode. Only the days recorded so far
+                count, so rates are provisional instead of treating the
+                empty remaining days as absences
         """
         if week_id not in self.weeks_data:
             raise ValueError(f"Week {week_id} not found. Please add it first.")
@@ -64,125 +118,53 @@ class MultiWeekAttendanceAnalyzer:
         
         print(f"\\n=== Analyzing Week: {week_id} ({week_info['start_date']} - {week_info['end_date']} 2025) ===")
         
-        # Initialize statistics containers
-        all_students = []
-        group_stats = {}
+        # Stage timings and counters of this run (no-ops when metrics are disabled)
+        profiling = self.profile_enabled
+        metrics = self.metrics = RunMetrics(week_id) if self.metrics_enabled or profiling else NULL_METRICS
+        metrics.watch_outputs([week_dir, 'weeks_feed.json', 'search_index.json', self.base_dir])
+        if profiling:
+            profile_dir = os.path.join(self.profile_dir, week_id) if self.profile_dir else os.path.join(week_dir, 'profile')
+            metrics.profiler = StageProfiler(profile_dir).start()
         
         try:
-            # Read Excel file and get all sheets
-            excel_data = pd.ExcelFile(excel_file_path)
-            sheet_names = [sheet for sheet in excel_data.sheet_names if sheet != 'الورقة1']
+            # Outputs about to be rewritten must not be written through links into the store
+            self.artifacts.release(week_dir)
             
-            print(f"Found {len(sheet_names)} group sheets")
+            with metrics.stage('parse'):
+                sheets, sheet_cache = self.parse_week_sheets(week_dir, excel_file_path)
             
-            for sheet_name in sheet_names:
-                print(f"Processing sheet: {sheet_name}")
-                
-                try:
-                    # Read the sheet
-                    df = pd.read_excel(excel_file_path, sheet_name=sheet_name, header=None)
-                    
-                    if df.empty:
-                        continue
-                    
-                    # Find where student data starts
-                    student_data_start = 3
-                    students_in_group = []
-                    
-                    for row_idx in range(student_data_start, len(df)):
-                        student_number = df.iloc[row_idx, 0]  # Column A
-                        student_name = df.iloc[row_idx, 1]    # Column B  
-                        student_id = df.iloc[row_idx, 2]      # Column C
-                        
-                        # Skip if no student name
-                        if pd.isna(student_name) or not isinstance(student_name, str) or len(str(student_name).strip()) < 3:
-                            # Check if we've hit the end of student data
-                            empty_count = 0
-                            for check_idx in range(row_idx, min(row_idx + 3, len(df))):
-                                check_name = df.iloc[check_idx, 1]
-                                if pd.isna(check_name) or not isinstance(check_name, str) or len(str(check_name).strip()) < 3:
-                                    empty_count += 1
-                            if empty_count >= 2:
-                                break
-                            else:
-                                continue
-                        
-                        # Extract attendance data for all sessions across the week
-                        attendance_data = []
-                        
-                        # Days are in columns starting from D (index 3)
-                        # 5 days, each with 4 sessions
-                        for day_offset in range(5):
-                            day_sessions = []
-                            for session in range(4):
-                                col_idx = 3 + (day_offset * 4) + session
-                                if col_idx < len(df.columns):
-                                    session_value = df.iloc[row_idx, col_idx]
-                                    if pd.notna(session_value):
-                                        if session_value == 1.0 or session_value == 1 or session_value == True:
-                                            day_sessions.append(1)
-                                        else:
-                                            day_sessions.append(0)
-                                    else:
-                                        day_sessions.append(0)
-                                else:
-                                    day_sessions.append(0)
-                            attendance_data.append(day_sessions)
-                        
-                        # Calculate daily attendance (present if attended 3/4 or 4/4 sessions)
-                        daily_attendance = []
-                        for day_sessions in attendance_data:
-                            sessions_attended = sum(day_sessions)
-                            daily_attendance.append(1 if sessions_attended >= 3 else 0)
-                        
-                        total_days_attended = sum(daily_attendance)
-                        attendance_percentage = (total_days_attended / 5) * 100
-                        
-                        student_info = {
-                            'group': sheet_name,
-                            'student_number': student_number if pd.notna(student_number) else 'N/A',
-                            'name': str(student_name).strip(),
-                            'student_id': student_id if pd.notna(student_id) else 'N/A',
-                            'days_attended': total_days_attended,
-                            'attendance_percentage': attendance_percentage,
-                            'daily_attendance': daily_attendance,
-                            'session_data': attendance_data,
-                            'total_sessions': sum(sum(day) for day in attendance_data),
-                            'possible_sessions': 20
-                        }
-                        
-                        all_students.append(student_info)
-                        students_in_group.append(student_info)
-                    
-                    # Calculate group statistics
-                    if students_in_group:
-                        group_attendance_rates = [s['attendance_percentage'] for s in students_in_group]
-                        full_week_students = [s for s in students_in_group if s['days_attended'] == 5]
-                        partial_students = [s for s in students_in_group if 0 < s['days_attended'] < 5]
-                        never_attended = [s for s in students_in_group if s['days_attended'] == 0]
-                        
-                        group_stats[sheet_name] = {
-                            'total_students': len(students_in_group),
-                            'average_attendance': sum(group_attendance_rates) / len(group_attendance_rates),
-                            'full_week_count': len(full_week_students),
-                            'partial_count': len(partial_students),
-                            'never_attended_count': len(never_attended),
-                            'students': students_in_group
-                        }
-                        
-                        print(f"  - Students found: {len(students_in_group)}")
-                        print(f"  - Full week: {len(full_week_students)}, Partial: {len(partial_students)}, Never: {len(never_attended)}")
-                
-                except Exception as e:
-                    print(f"  - Error processing sheet {sheet_name}: {str(e)}")
-                    continue
+            # Partial-week mode rates students over the days recorded so far
+            days_elapsed = 5
+            if partial_week:
+                days_elapsed = elapsed_days(entry['recorded'] for _, _, entry in sheets)
+                print(f"Partial week: {days_elapsed} of 5 days recorded, statistics are provisional")
+                if days_elapsed == 0:
+                    print("No attendance recorded yet")
+                    return None
             
-            # Generate overall statistics
+            with metrics.stage('aggregate'):
+                group_stats, all_students, overall = self.aggregate_week(sheets, sheet_cache, days_elapsed)
+            with metrics.stage('sheet_cache'):
+                sheet_cache.save()
+                self.group_registry.save()
+            
+            if partial_week:
+                week_info['days_elapsed'] = days_elapsed
+            else:
+                week_info.pop('days_elapsed', None)
+            
+            # Session cells that are neither present, absent nor blank, and
+            # sessions left blank for a whole group across all weeks
+            with metrics.stage('anomalies'):
+                self.create_anomaly_report(week_id, sheets)
+                self.update_not_recorded_report()
+            
+            # Overall statistics come from merging the group partials
             if all_students:
-                overall_full_week = sum(1 for s in all_students if s['days_attended'] == 5)
-                overall_partial = sum(1 for s in all_students if 0 < s['days_attended'] < 5)
-                overall_never = sum(1 for s in all_students if s['days_attended'] == 0)
-                overall_avg = sum(s['attendance_percentage'] for s in all_students) / len(all_students)
+                overall_full_week = overall['full_week']
+                overall_partial = overall['partial']
+                overall_never = overall['never']
+                overall_avg = average_attendance(overall)
                 
                 week_summary = {
                     'total_students': len(all_students),
@@ -192,6 +174,11 @@ class MultiWeekAttendanceAnalyzer:
                     'average_attendance': overall_avg,
                     'groups': len(group_stats)
                 }
+                if partial_week:
+                    week_summary['days_elapsed'] = days_elapsed
+                not_recorded = sum(len(stats['not_recorded']) for stats in group_stats.values())
+                if not_recorded:
+                    week_summary['not_recorded_sessions'] = not_recorded
                 
                 # Save week summary
                 self.weeks_data[week_id]['summary'] = week_summary
@@ -202,24 +189,248 @@ class MultiWeekAttendanceAnalyzer:
                 print(f"Partial attendance: {overall_partial} ({overall_partial/len(all_students)*100:.1f}%)")
                 print(f"Never attended: {overall_never} ({overall_never/len(all_students)*100:.1f}%)")
                 print(f"Overall average: {overall_avg:.1f}%")
+                if not_recorded:
+                    print(f"Not recorded: {not_recorded} group sessions left blank, excluded from the rates")
+                
+                # Update cohort retention matrix with this week
+                with metrics.stage('cohorts'):
+                    cohorts = self.update_cohorts(week_id, all_students)
                 
                 # Create visualizations for this week
-                self.create_week_visualizations(week_id, group_stats, all_students, overall_full_week, overall_partial, overall_never)
+                with metrics.stage('charts'):
+                    self.create_week_visualizations(week_id, group_stats, all_students, overall_full_week, overall_partial, overall_never)
                 
                 # Create Excel report for this week
-                self.create_week_excel_report(week_id, group_stats, all_students)
+                with metrics.stage('excel'):
+                    self.create_week_excel_report(week_id, group_stats, all_students, cohorts)
+                
+                # Create per-group supervisor reports
+                with metrics.stage('group_reports'):
+                    self.create_group_reports(week_id, group_stats)
                 
                 # Create individual HTML dashboard for this week
-                self.create_week_html_dashboard(week_id, group_stats, all_students, overall_full_week, overall_partial, overall_never)
+                with metrics.stage('html'):
+                    self.create_week_html_dashboard(week_id, group_stats, all_students, overall_full_week, overall_partial, overall_never, cohorts)
                 
                 # Save analysis data
-                self.save_week_data(week_id, group_stats, all_students)
+                with metrics.stage('save_data'):
+                    self.save_week_data(week_id, group_stats, all_students)
+                
+                # Add the week to the master dashboard feed
+                with metrics.stage('feed'):
+                    self.update_weeks_feed(week_id, group_stats)
+                
+                # Rebuild the student search index used by the dashboards
+                with metrics.stage('search_index'):
+                    self.update_search_index()
+                
+                # Compare the roster with the previous analyzed week
+                with metrics.stage('roster_diff'):
+                    self.create_roster_diff(week_id)
+                
+                # Update early-warning risk state with this week (once it is complete)
+                if days_elapsed == 5:
+                    with metrics.stage('risk'):
+                        self.update_risk_state(week_id, all_students)
+                else:
+                    print("Risk state not updated for a provisional week")
+                
+                # Move charts and reports into the content-addressed store
+                with metrics.stage('artifacts'):
+                    self.publish_week_artifacts(week_id)
+                
+                # Save the run metrics next to the week's outputs
+                metrics.finish()
+                if metrics.enabled:
+                    metrics.save(os.path.join(week_dir, f"metrics_{week_id}.json"))
+                    if self.print_metrics:
+                        metrics.print_summary()
                 
                 return week_summary
             
         except Exception as e:
             print(f"Error analyzing week {week_id}: {str(e)}")
             return None
+        
+        finally:
+            if profiling:
+                metrics.profiler.stop()
+                metrics.profiler.print_summary()
+                print(f"Stage profiles saved: {metrics.profiler.output_dir}")
+                metrics.profiler = None
+    
+    @contextlib.contextmanager
+    def profiling(self, profile_dir=None):
+        """
+        Profile every analyze_week run inside the block
+        
+        Each top-level stage (parse, charts, excel, ...) gets a cProfile dump
+        (<stage>.prof) and a collapsed-stack file for flamegraphs
+        (<stage>.collapsed); summary.json has every stage's time, memory
+        high-water mark (tracemalloc) and top functions.
+        
+            with analyzer.profiling():
+                analyzer.analyze_week(week_id, excel_file_path)
+        
+        Args:
+            profile_dir (str): Folder for the profiles, one subfolder per
+                week; defaults to weeks/<week_id>/profile
+        """
+        previous = self.profile_enabled, self.profile_dir
+        self.profile_enabled, self.profile_dir = True, profile_dir
+        try:
+            yield self
+        finally:
+            self.profile_enabled, self.profile_dir = previous
+    
+    def parse_week_sheets(self, week_dir, excel_file_path):
+        """
+        Read the group sheets of a week's workbook
+        
+        Sheets whose content hash is unchanged come from the week's sheet
+        cache; changed sheets are parsed again in full.
+        
+        Returns:
+            tuple: ([(group_name, group_id, cache entry)], SheetCache)
+        """
+        metrics = self.metrics
+        
+        # Content hash per sheet; unchanged sheets come from the sheet cache
+        try:
+            with metrics.stage('parse/hash'):
+                sheet_hashes = workbook_sheet_hashes(excel_file_path)
+        except Exception as e:
+            print(f"Could not hash sheets, parsing all of them: {str(e)}")
+            sheet_hashes = {}
+        sheet_cache = SheetCache(os.path.join(week_dir, 'sheet_cache.json')).load()
+        
+        # Read Excel file and get all sheets
+        excel_data = None
+        if sheet_hashes:
+            sheet_names = [sheet for sheet in sheet_hashes if sheet != 'الورقة1']
+        else:
+            excel_data = pd.ExcelFile(excel_file_path)
+            sheet_names = [sheet for sheet in excel_data.sheet_names if sheet != 'الورقة1']
+        
+        print(f"Found {len(sheet_names)} group sheets")
+        # New groups get their ids under the registry lock, so parallel runs cannot assign the same id
+        self.group_registry.register(sheet_names)
+        
+        # Parse changed sheets and reuse the rest
+        sheets = []
+        parsed_sheets = 0
+        for sheet_name in sheet_names:
+            # Map the sheet name to its canonical group
+            group_id = self.group_registry.resolve(sheet_name)
+            group_name = self.group_registry.name(group_id)
+            
+            digest = sheet_hashes.get(sheet_name)
+            entry = sheet_cache.get(sheet_name, digest)
+            if entry is not None:
+                print(f"Sheet unchanged, using cached results: {sheet_name}")
+                entry['students'].set_group(group_name, group_id)
+                metrics.count('sheets_cached')
+            else:
+                print(f"Processing sheet: {sheet_name}")
+                try:
+                    if excel_data is None:
+                        with metrics.stage('parse/open'):
+                            excel_data = pd.ExcelFile(excel_file_path)
+                    with metrics.sheet(sheet_name):
+                        df = excel_data.parse(sheet_name, header=None)
+                        # Validation first: sessions nobody filled in are left out of the daily rule
+                        with metrics.stage('parse/validate'):
+                            validation = validate_sheet(df, sheet_name)
+                        students_in_group = StudentTable.empty(group_name, group_id) if df.empty else self.read_sheet_students(
+                            df, group_name, group_id, validation['not_recorded'])
+                        recorded = digest['recorded'] if digest else recorded_days(df)
+                except Exception as e:
+                    print(f"  - Error processing sheet {sheet_name}: {str(e)}")
+                    continue
+                entry = sheet_cache.put(sheet_name, digest, students_in_group, recorded, validation)
+                parsed_sheets += 1
+                metrics.count('sheets_parsed')
+                metrics.count_sheet(sheet_name, 'rows', len(df))
+                metrics.count_sheet(sheet_name, 'students', len(students_in_group))
+            metrics.count('students_found', len(entry['students']))
+            sheets.append((group_name, group_id, entry))
+        
+        sheet_cache.retain(sheet_names)
+        print(f"Parsed {parsed_sheets} sheets, {len(sheet_names) - parsed_sheets} unchanged")
+        return sheets, sheet_cache
+    
+    def aggregate_week(self, sheets, sheet_cache, days_elapsed=5):
+        """
+        Group and overall statistics from the parsed sheets
+        
+        Returns:
+            tuple: (group_stats, all_students as a StudentTable, overall partial statistics)
+        """
+        tables = []
+        group_stats = {}
+        group_partials = {}
+        for group_name, group_id, entry in sheets:
+            students_in_group = entry['students']
+            if not len(students_in_group):
+                continue
+            students_in_group.percentage = students_in_group.rates(days_elapsed)
+            tables.append(students_in_group)
+            
+            # Sheets that map to the same group are counted together
+            partial = sheet_cache.partial(entry, days_elapsed)
+            not_recorded = [slot for slot in (entry.get('validation') or {}).get('not_recorded', []) if slot[0] <= days_elapsed]
+            if group_name in group_stats:
+                students_in_group = StudentTable.concat([group_stats[group_name]['students'], students_in_group])
+                partial = merge_partials([group_partials[group_name], partial])
+                not_recorded = [slot for slot in group_stats[group_name]['not_recorded'] if slot in not_recorded]
+            group_partials[group_name] = partial
+            
+            # Group statistics come from the mergeable per-sheet partials
+            group_stats[group_name] = {
+                'group_id': group_id,
+                'total_students': partial['students'],
+                'average_attendance': average_attendance(partial),
+                'full_week_count': partial['full_week'],
+                'partial_count': partial['partial'],
+                'never_attended_count': partial['never'],
+                'not_recorded': not_recorded,
+                'students': students_in_group
+            }
+            
+            print(f"  - {group_name}: {partial['students']} students")
+            print(f"  - Full week: {partial['full_week']}, Partial: {partial['partial']}, Never: {partial['never']}")
+        
+        return group_stats, StudentTable.concat(tables), merge_partials(group_partials.values())
+    
+    def read_sheet_students(self, df, group_name, group_id, not_recorded=()):
+        """
+        Parse the student rows of one group sheet (read with header=None)
+        
+        Student rows start at row 4 and end where an invalid name is followed
+        by another within the next 3 rows; a session counts as attended when
+        its cell is True or 1.
+        
+        Args:
+            not_recorded (list): [day, session] pairs (1-based) left blank for
+                the whole sheet; they do not count as absences
+        
+        Returns:
+            StudentTable: The sheet's students with their session attendance
+        """
+        rows = student_rows(df)
+        block = session_block(df, rows)
+        sessions = (classify_cells(block) == PRESENT).astype(np.int8).reshape(len(rows), 5, 4)
+        
+        # Sessions filled in per day; a day with none is not recorded for this sheet
+        recorded = 4 - slot_mask(not_recorded).sum(axis=1)
+        
+        self.metrics.count('rows_scanned', int(rows[-1]) - 2 if len(rows) else 0)
+        self.metrics.count('cells_coerced', int(pd.notna(block).sum()))
+        return StudentTable.build(
+            group_name, group_id,
+            df.iloc[rows, 0].tolist(), df.iloc[rows, 1].tolist(), df.iloc[rows, 2].tolist(),
+            sessions, np.tile(recorded, (len(rows), 1)),
+        )
     
     def create_week_visualizations(self, week_id, group_stats, all_students, full_week, partial, never):
         """Create visualizations for a specific week"""
@@ -282,7 +493,7 @@ class MultiWeekAttendanceAnalyzer:
         
         print(f"Visualizations saved for {week_id}")
     
-    def create_week_excel_report(self, week_id, group_stats, all_students):
+    def create_week_excel_report(self, week_id, group_stats, all_students, cohorts=None):
         """Create Excel report for a specific week"""
         week_info = self.weeks_data[week_id]
         week_dir = week_info["directory"]
@@ -290,51 +501,29 @@ class MultiWeekAttendanceAnalyzer:
         filename = f"attendance_report_{week_id}.xlsx"
         filepath = os.path.join(week_dir, filename)
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Summary sheet
-            summary_data = []
-            for group, stats in group_stats.items():
-                summary_data.append({
-                    'Group': group,
-                    'Total Students': stats['total_students'],
-                    'Full Week': stats['full_week_count'],
-                    'Partial': stats['partial_count'],
-                    'Never': stats['never_attended_count'],
-                    'Avg Attendance %': round(stats['average_attendance'], 1)
-                })
-            
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Detailed students data
-            students_data = []
-            for student in all_students:
-                day_details = []
-                for day_idx, day_sessions in enumerate(student['session_data']):
-                    sessions_count = sum(day_sessions)
-                    day_details.append(f"{sessions_count}/4")
-                
-                students_data.append({
-                    'Group': student['group'],
-                    'Student Number': student['student_number'],
-                    'Student Name': student['name'],
-                    'Student ID': student['student_id'],
-                    'Days Attended': student['days_attended'],
-                    'Attendance %': round(student['attendance_percentage'], 1),
-                    'Total Sessions': f"{student['total_sessions']}/20",
-                    f'{week_info["start_date"].split("-")[1]} {week_info["start_date"].split("-")[0]}': '✓' if student['daily_attendance'][0] else '✗',
-                    'Day 2': '✓' if student['daily_attendance'][1] else '✗',
-                    'Day 3': '✓' if student['daily_attendance'][2] else '✗',
-                    'Day 4': '✓' if student['daily_attendance'][3] else '✗',
-                    'Day 5': '✓' if student['daily_attendance'][4] else '✗',
-                })
-            
-            students_df = pd.DataFrame(students_data)
-            students_df.to_excel(writer, sheet_name='All Students', index=False)
+        day_labels = [f'{week_info["start_date"].split("-")[1]} {week_info["start_date"].split("-")[0]}',
+                      'Day 2', 'Day 3', 'Day 4', 'Day 5']
+        
+        # Cohort retention matrix (average attendance by first-seen week)
+        write_attendance_report(filepath, group_stats, all_students, day_labels,
+                                extra_sheets={'Cohorts': cohorts},
+                                days_elapsed=week_info.get('days_elapsed', 5))
         
         print(f"Excel report saved: {filename}")
     
-    def create_week_html_dashboard(self, week_id, group_stats, all_students, full_week, partial, never):
+    def create_group_reports(self, week_id, group_stats, max_workers=None):
+        """Create one xlsx and HTML report per group in weeks/<week_id>/groups/ in parallel"""
+        week_info = self.weeks_data[week_id]
+        output_dir = os.path.join(week_info["directory"], 'groups')
+        period = f"{week_info['start_date']} - {week_info['end_date']} {week_info.get('year', 2025)}"
+        if 'days_elapsed' in week_info:
+            period += f" (provisional, {week_info['days_elapsed']} of 5 days)"
+        
+        groups = create_group_reports(output_dir, group_stats, period, max_workers)
+        print(f"Group reports saved: {len(groups)} groups in {output_dir}")
+        return groups
+    
+    def create_week_html_dashboard(self, week_id, group_stats, all_students, full_week, partial, never, cohorts=None):
         """Create individual HTML dashboard for a specific week"""
         week_info = self.weeks_data[week_id]
         week_dir = week_info["directory"]
@@ -346,183 +535,105 @@ class MultiWeekAttendanceAnalyzer:
         never_counts = [group_stats[g]['never_attended_count'] for g in groups]
         avg_attendance = [group_stats[g]['average_attendance'] for g in groups]
         
-        html_content = f'''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Attendance Dashboard - {week_info["start_date"]} to {week_info["end_date"]} 2025</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }}
-        .header {{
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        .header h1 {{
-            color: #2c3e50;
-            margin: 0;
-        }}
-        .week-info {{
-            background: #3498db;
-            color: white;
-            padding: 15px;
-            border-radius: 10px;
-            margin: 20px 0;
-            text-align: center;
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .stat-card {{
-            background: linear-gradient(135deg, #3498db, #2980b9);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            text-align: center;
-        }}
-        .stat-number {{
-            font-size: 2rem;
-            font-weight: bold;
-        }}
-        .charts-container {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin-top: 30px;
-        }}
-        .chart-card {{
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 10px;
-            border: 1px solid #dee2e6;
-        }}
-        .chart-title {{
-            text-align: center;
-            font-weight: bold;
-            margin-bottom: 15px;
-            color: #2c3e50;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Weekly Attendance Dashboard</h1>
-            <div class="week-info">
-                <h2>Week of {week_info["start_date"]} - {week_info["end_date"]}, 2025</h2>
-                <p>Analysis completed on {week_info.get("analysis_date", "N/A")}</p>
-            </div>
-        </div>
-        
-        <div class="stats-grid">
-            <div class="stat-card">
-                <div class="stat-number">{len(all_students)}</div>
-                <div>Total Students</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{full_week}</div>
-                <div>Full Week Attendance</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{partial}</div>
-                <div>Partial Attendance</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{never}</div>
-                <div>Never Attended</div>
-            </div>
-        </div>
-        
-        <div class="charts-container">
-            <div class="chart-card">
-                <div class="chart-title">Group Distribution</div>
-                <canvas id="groupChart"></canvas>
-            </div>
-            <div class="chart-card">
-                <div class="chart-title">Overall Distribution</div>
-                <canvas id="pieChart"></canvas>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        // Group Chart
-        const groupCtx = document.getElementById('groupChart').getContext('2d');
-        new Chart(groupCtx, {{
-            type: 'bar',
-            data: {{
-                labels: {groups},
-                datasets: [
-                    {{
-                        label: 'Full Week',
-                        data: {full_counts},
-                        backgroundColor: '#2ca02c'
-                    }},
-                    {{
-                        label: 'Partial',
-                        data: {partial_counts},
-                        backgroundColor: '#ff7f0e'
-                    }},
-                    {{
-                        label: 'Never',
-                        data: {never_counts},
-                        backgroundColor: '#d62728'
-                    }}
-                ]
-            }},
-            options: {{
-                responsive: true,
-                scales: {{
-                    x: {{ stacked: true }},
-                    y: {{ stacked: true }}
-                }}
-            }}
-        }});
-
-        // Pie Chart
-        const pieCtx = document.getElementById('pieChart').getContext('2d');
-        new Chart(pieCtx, {{
-            type: 'pie',
-            data: {{
-                labels: ['Full Week', 'Partial', 'Never'],
-                datasets: [{{
-                    data: [{full_week}, {partial}, {never}],
-                    backgroundColor: ['#2ca02c', '#ff7f0e', '#d62728']
-                }}]
-            }},
-            options: {{
-                responsive: true
-            }}
-        }});
-    </script>
-</body>
-</html>'''
+        cohorts_html = ''
+        if cohorts:
+            cohorts_html = f'''
+        <div class="chart-card cohorts">
+            <div class="chart-title">Cohort Retention (average attendance by first-seen week)</div>
+            {cohort_table_html(cohorts)}
+        </div>'''
+        
+        chart_data = {
+            'groups': groups,
+            'full_counts': full_counts,
+            'partial_counts': partial_counts,
+            'never_counts': never_counts,
+            'avg_attendance': avg_attendance,
+            'full_week': full_week,
+            'partial': partial,
+            'never': never,
+        }
         
         filename = f"dashboard_{week_id}.html"
-        with open(os.path.join(week_dir, filename), 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        render_page(
+            'week_dashboard.html', os.path.join(week_dir, filename),
+            start_date=week_info["start_date"],
+            end_date=week_info["end_date"],
+            year=week_info.get("year", 2025),
+            analysis_date=week_info.get("analysis_date", "N/A"),
+            total_students=len(all_students),
+            full_week=full_week,
+            partial=partial,
+            never=never,
+            cohorts_html=cohorts_html,
+            provisional_note=(
+                f"<p><strong>Provisional:</strong> {week_info['days_elapsed']} of 5 days recorded so far</p>"
+                if 'days_elapsed' in week_info else ''
+            ),
+            not_recorded_note=not_recorded_note(group_stats),
+            chart_data=script_json(chart_data),
+            search_url=os.path.relpath('search_index.json', week_dir).replace(os.sep, '/'),
+        )
         
         print(f"Individual HTML dashboard saved: {filename}")
     
+    def create_anomaly_report(self, week_id, sheets):
+        """
+        Save the per-group cell validation of a week as anomalies_<week_id>.json
+        
+        Counts present, absent, blank and suspicious session cells per group
+        and lists the suspicious ones ('x', '1' as text, 2, stray notes...)
+        with their cell reference, since the parser counts them as absences.
+        """
+        week_dir = self.weeks_data[week_id]["directory"]
+        report = build_anomaly_report(week_id, [(group_name, entry.get('validation')) for group_name, _, entry in sheets])
+        filename = f"anomalies_{week_id}.json"
+        save_anomaly_report(report, os.path.join(week_dir, filename))
+        
+        suspicious = report['totals']['suspicious']
+        self.metrics.count('cells_suspicious', suspicious)
+        groups = [group for group, stats in report['groups'].items() if stats['counts']['suspicious']]
+        if suspicious:
+            print(f"Cell validation: {suspicious} suspicious cells in {len(groups)} groups ({', '.join(groups)}), see {filename}")
+        else:
+            print(f"Cell validation: no suspicious cells ({filename})")
+        return report
+    
+    def update_not_recorded_report(self):
+        """
+        Save weeks/not_recorded.json, the sessions left blank for a whole group in every analyzed week
+        
+        A supervisor who forgets to fill in a session makes the whole group
+        look absent; these sessions are excluded from the rates and listed
+        here per group and per week.
+        """
+        path = os.path.join(self.base_dir, 'not_recorded.json')
+        with file_lock(path):
+            report = not_recorded_report(self._all_weeks(), self.group_registry)
+            save_not_recorded_report(report, path)
+        
+        totals = report['totals']
+        self.metrics.count('sessions_not_recorded', totals['sessions'])
+        if totals['sessions']:
+            print(f"Missing data entry: {totals['sessions']} sessions ({totals['days']} whole days) not recorded "
+                  f"in {totals['group_weeks']} group-weeks, see not_recorded.json")
+        return report
+    
+    def publish_week_artifacts(self, week_id):
+        """
+        Store a week's charts and Excel/HTML reports in weeks/assets
+        
+        Every file is kept once under its content hash (charts re-encoded as
+        palette PNGs), the week folder lists them in assets.json and keeps
+        its files as hard links, so an unchanged week adds no new bytes.
+        """
+        stats = self.artifacts.publish(self.weeks_data[week_id]["directory"])
+        self.metrics.count('artifacts_new_objects', stats['new_objects'])
+        self.metrics.count('artifacts_new_bytes', stats['new_bytes'])
+        print(f"Artifacts: {stats['files']} files, {stats['source_bytes'] / 1e6:.2f} MB stored as "
+              f"{stats['stored_bytes'] / 1e6:.2f} MB, {stats['new_objects']} new objects ({stats['new_bytes'] / 1e6:.2f} MB)")
+        return stats
+    
     def save_week_data(self, week_id, group_stats, all_students):
         """Save week analysis data as JSON"""
         week_info = self.weeks_data[week_id]
@@ -533,11 +644,13 @@ class MultiWeekAttendanceAnalyzer:
             'week_info': week_info,
             'group_stats': {
                 group: {
+                    'group_id': stats['group_id'],
                     'total_students': stats['total_students'],
                     'average_attendance': stats['average_attendance'],
                     'full_week_count': stats['full_week_count'],
                     'partial_count': stats['partial_count'],
-                    'never_attended_count': stats['never_attended_count']
+                    'never_attended_count': stats['never_attended_count'],
+                    **({'not_recorded': stats['not_recorded']} if stats.get('not_recorded') else {})
                 }
                 for group, stats in group_stats.items()
             },
@@ -547,226 +660,363 @@ class MultiWeekAttendanceAnalyzer:
         filename = f"data_{week_id}.json"
         with open(os.path.join(week_dir, filename), 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        
+        # Per-student records feed the cross-week history queries
+        save_week_students(week_info, all_students)
+    
+    def diff_weeks(self, from_week_id, to_week_id):
+        """
+        Roster differences between any two analyzed weeks
+        
+        Returns joiners, leavers and transfers per group, matched on hashed
+        person keys from the stored student records.
+        """
+        rosters = []
+        for week_id in (from_week_id, to_week_id):
+            records = load_week_students(self.weeks_data[week_id])
+            if records is None:
+                raise ValueError(f"No student records for {week_id}. Please analyze it first.")
+            rosters.append(roster_from_records(records, self.group_registry))
+        
+        diff = diff_rosters(*rosters)
+        diff['from_week'] = from_week_id
+        diff['to_week'] = to_week_id
+        return diff
+    
+    def create_roster_diff(self, week_id):
+        """Save the roster diff between this week and the previous analyzed week"""
+        week_info = self.weeks_data[week_id]
+        start = week_start_datetime(week_info)
+        
+        earlier = [
+            (week_start_datetime(info), other_id)
+            for other_id, info in self.weeks_data.items()
+            if other_id != week_id and week_start_datetime(info) < start
+            and load_week_students(info) is not None
+        ]
+        if not earlier:
+            return None
+        
+        previous_week_id = max(earlier)[1]
+        diff = self.diff_weeks(previous_week_id, week_id)
+        
+        filename = f"roster_diff_{week_id}.json"
+        with open(os.path.join(week_info["directory"], filename), 'w', encoding='utf-8') as f:
+            json.dump(diff, f, indent=2, ensure_ascii=False)
+        
+        summary = diff['summary']
+        print(f"Roster diff vs {previous_week_id} saved: {filename} "
+              f"(+{summary['joiners']} joined, -{summary['leavers']} left, {summary['transfers']} transferred)")
+        return diff
+    
+    def update_risk_state(self, week_id, all_students):
+        """Fold this week into the persistent risk state and save the ranked at-risk list"""
+        week_dir = self.weeks_data[week_id]["directory"]
+        
+        state_path = os.path.join(self.base_dir, 'risk_state.json')
+        with file_lock(state_path):
+            tracker = AttendanceRiskTracker(state_path).load()
+            week_start = week_start_datetime(self.weeks_data[week_id])
+            self._fill_week_starts(tracker)
+            if tracker.is_out_of_order(week_id, week_start):
+                # An older week (or a re-analyzed one with later weeks tracked): replay every week in date order
+                print(f"Rebuilding the risk state in date order for {week_id}")
+                tracker = AttendanceRiskTracker(tracker.state_path, tracker.window_weeks, tracker.alpha)
+                for other_id, other_start, students in self._weeks_in_date_order(week_id, all_students, complete_only=True):
+                    tracker.update_week(other_id, students, other_start)
+                    # The list is as of this week, before later weeks are folded in
+                    if other_id == week_id:
+                        at_risk = tracker.at_risk_by_group(week_id)
+            elif tracker.update_week(week_id, all_students, week_start):
+                at_risk = tracker.at_risk_by_group(week_id)
+            else:
+                return None
+            tracker.save()
+        
+        filename = f"at_risk_{week_id}.json"
+        with open(os.path.join(week_dir, filename), 'w', encoding='utf-8') as f:
+            json.dump(at_risk, f, indent=2, ensure_ascii=False)
+        
+        print(f"At-risk list saved: {filename} ({sum(len(rows) for rows in at_risk.values())} students)")
+        return at_risk
+    
+    def _fill_week_starts(self, tracker):
+        """Fill in the start dates a tracker state saved without them, from the weeks index"""
+        weeks_data = self._all_weeks()
+        tracker.week_starts = [
+            start or (week_start_datetime(weeks_data[other_id]).date().isoformat()
+                      if other_id in weeks_data else None)
+            for other_id, start in zip(tracker.weeks, tracker.week_starts)
+        ]
+    
+    def _weeks_in_date_order(self, week_id, all_students, complete_only=False):
+        """
+        (week_id, week start, StudentTable) of every analyzed week, oldest first
+        
+        This week's students come from memory, the other weeks from their
+        saved student records; weeks without records are left out.
+        
+        Args:
+            complete_only (bool): Leave out provisional (partial) weeks
+        """
+        weeks = []
+        for other_id, week_info in self._all_weeks().items():
+            if other_id == week_id:
+                students = all_students
+            else:
+                records = load_week_students(week_info)
+                if records is None:
+                    print(f"No student records for {other_id}, left out of the rebuild")
+                    continue
+                if complete_only and records.get('days_elapsed', 5) < 5:
+                    continue
+                students = week_student_table(records)
+            weeks.append((other_id, week_start_datetime(week_info), students))
+        weeks.sort(key=lambda item: item[1])
+        return weeks
+    
+    def create_group_matrix(self, metric='average_attendance'):
+        """
+        Groups × weeks matrix of a group statistic joined on canonical group ids
+        
+        Args:
+            metric (str): Any group statistic saved per week, e.g.
+                'average_attendance', 'total_students' or 'never_attended_count'
+        """
+        return group_week_matrix(self.weeks_data, self.group_registry, metric)
+    
+    def update_cohorts(self, week_id, all_students):
+        """Add this week to the persistent cohort matrix and return it as records"""
+        state_path = os.path.join(self.base_dir, 'cohort_state.json')
+        with file_lock(state_path):
+            tracker = CohortTracker(state_path).load()
+            week_start = week_start_datetime(self.weeks_data[week_id])
+            self._fill_week_starts(tracker)
+            if tracker.is_out_of_order(week_id, week_start):
+                # An older week (or a re-analyzed one with later weeks tracked): replay every week in date order
+                print(f"Rebuilding the cohort matrix in date order for {week_id}")
+                tracker = CohortTracker(tracker.state_path)
+                for other_id, other_start, students in self._weeks_in_date_order(week_id, all_students):
+                    tracker.update_week(other_id, students, other_start)
+                tracker.save()
+            elif tracker.update_week(week_id, all_students, week_start):
+                tracker.save()
+            
+            cohorts = tracker.to_records()
+            with open(os.path.join(self.base_dir, 'cohorts.json'), 'w', encoding='utf-8') as f:
+                json.dump(cohorts, f, indent=2, ensure_ascii=False)
+        
+        return cohorts
+    
+    def load_attendance_history(self):
+        """
+        Build the rolling-window attendance history over all analyzed weeks
+        
+        Returns an AttendanceHistory answering student and group window
+        queries (last N weeks or a date range) in constant time.
+        """
+        return AttendanceHistory(self.weeks_data, self.group_registry)
+    
+    def update_weeks_feed(self, week_id, group_stats):
+        """Append (or replace) this week in weeks_feed.json, the data source of the master dashboard"""
+        with file_lock('weeks_feed.json'):
+            feed = load_feed('weeks_feed.json')
+            feed['base'] = self.base_dir.replace('\\', '/')
+            upsert_week(feed, self.weeks_data[week_id], group_stats)
+            save_feed(feed, 'weeks_feed.json')
+    
+    def update_search_index(self):
+        """Rebuild search_index.json, the type-ahead student search of the dashboards"""
+        with file_lock('search_index.json'):
+            index = build_search_index(self._all_weeks())
+            save_search_index(index, 'search_index.json')
+        print(f"Search index updated: {len(index['docs'])} students, {len(index['postings'])} trigrams")
     
     def create_master_dashboard(self):
-        """Create the master HTML dashboard with week selection"""
-        
-        # Load all weeks data
-        weeks_list = []
-        for week_id, week_info in self.weeks_data.items():
-            if 'summary' in week_info:
-                weeks_list.append({
-                    'id': week_id,
-                    'display_name': f"{week_info['start_date']} - {week_info['end_date']}, 2025",
-                    'students': week_info['summary']['total_students'],
-                    'attendance_rate': f"{week_info['summary']['average_attendance']:.1f}%",
-                    'dashboard_url': f"weeks/{week_id}/dashboard_{week_id}.html"
-                })
-        
-        # Build the weeks cards HTML
-        weeks_cards_html = ""
-        if weeks_list:
-            weeks_cards_html = '<div class="weeks-grid">'
-            for week in weeks_list:
-                weeks_cards_html += f'''
-            <a href="{week['dashboard_url']}" class="week-card">
-                <div class="week-title">Week: {week['display_name']}</div>
-                <div class="week-stats">
-                    <div class="stat-item">
-                        <div class="stat-number">{week['students']}</div>
-                        <div class="stat-label">Total Students</div>
-                    </div>
-                    <div class="stat-item">
-                        <div class="stat-number">{week['attendance_rate']}</div>
-                        <div class="stat-label">Average Attendance</div>
-                    </div>
-                </div>
-            </a>'''
-            weeks_cards_html += '</div>'
-        else:
-            weeks_cards_html = '''
-        <div class="no-weeks">
-            <h3>No weeks analyzed yet</h3>
-            <p>Use the MultiWeekAttendanceAnalyzer to add and analyze attendance data for different weeks.</p>
-        </div>'''
-
-        html_content = f'''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Multi-Week Attendance Analysis System</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }}
-        
-        .header {{
-            background: rgba(255,255,255,0.1);
-            backdrop-filter: blur(10px);
-            padding: 30px;
-            text-align: center;
-            color: white;
-        }}
-        
-        .header h1 {{
-            margin: 0;
-            font-size: 2.5rem;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 30px;
-        }}
-        
-        .weeks-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-            gap: 25px;
-            margin-top: 30px;
-        }}
-        
-        .week-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-            transition: all 0.3s ease;
-            cursor: pointer;
-            text-decoration: none;
-            color: inherit;
-        }}
-        
-        .week-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(0,0,0,0.25);
-        }}
-        
-        .week-title {{
-            font-size: 1.4rem;
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 15px;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        
-        .week-stats {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 15px;
-            margin-top: 15px;
-        }}
-        
-        .stat-item {{
-            text-align: center;
-            padding: 10px;
-            background: #f8f9fa;
-            border-radius: 8px;
-        }}
-        
-        .stat-number {{
-            font-size: 1.8rem;
-            font-weight: bold;
-            color: #3498db;
-        }}
-        
-        .stat-label {{
-            font-size: 0.9rem;
-            color: #7f8c8d;
-            margin-top: 5px;
-        }}
-        
-        .no-weeks {{
-            text-align: center;
-            background: white;
-            padding: 50px;
-            border-radius: 15px;
-            color: #7f8c8d;
-            font-size: 1.2rem;
-        }}
-        
-        .add-week-btn {{
-            background: #3498db;
-            color: white;
-            padding: 15px 30px;
-            border: none;
-            border-radius: 25px;
-            font-size: 1.1rem;
-            cursor: pointer;
-            margin-top: 20px;
-            transition: background 0.3s ease;
-        }}
-        
-        .add-week-btn:hover {{
-            background: #2980b9;
-        }}
-        
-        .footer {{
-            text-align: center;
-            color: rgba(255,255,255,0.8);
-            padding: 30px;
-            margin-top: 50px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Multi-Week Attendance Analysis System</h1>
-        <p>Select a week to view detailed attendance statistics and reports</p>
-    </div>
-    
-    <div class="container">
-        {weeks_cards_html}
-    </div>
-    
-    <div class="footer">
-        <p>Multi-Week Attendance Analysis System - Total Weeks: {len(weeks_list)}</p>
-    </div>
-</body>
-</html>'''
-        
-        with open('master_dashboard.html', 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"Master dashboard created with {len(weeks_list)} weeks")
+        """
+        Create the master HTML dashboard with week selection
+        
+        The page is a static shell: week cards, trends and cohorts are loaded
+        in the browser from weeks_feed.json and weeks/cohorts.json, and a
+        week's group details are fetched only when requested. Weeks analyzed
+        before the feed existed are added to it from their saved data.
+        """
+        with file_lock('weeks_feed.json'):
+            feed = load_feed('weeks_feed.json')
+            feed['base'] = self.base_dir.replace('\\', '/')
+            for week_id, week_info in self._all_weeks().items():
+                if 'summary' in week_info and week_id not in feed['weeks']['id']:
+                    # Saved statistics are keyed by sheet name as typed; the feed uses canonical names
+                    group_stats = {}
+                    for group, stats in (load_week_group_stats(week_info) or {}).items():
+                        stats.setdefault('group_id', self.group_registry.resolve(group))
+                        group_stats.setdefault(self.group_registry.name(stats['group_id']), stats)
+                    upsert_week(feed, week_info, group_stats)
+            save_feed(feed, 'weeks_feed.json')
+        self.group_registry.save()
+        if not os.path.exists('search_index.json'):
+            self.update_search_index()
+        
+        render_page(
+            'master_dashboard.html', 'master_dashboard.html',
+            feed_url='weeks_feed.json',
+            cohorts_url=f"{feed['base']}/cohorts.json",
+            search_url='search_index.json',
+        )
+        
+        print(f"Master dashboard created with {len(feed['weeks']['id'])} weeks")
         return 'master_dashboard.html'
     
-    def save_weeks_index(self):
-        """Save weeks index as JSON for persistence"""
-        with open('weeks_index.json', 'w', encoding='utf-8') as f:
-            json.dump(self.weeks_data, f, indent=2, ensure_ascii=False)
+    def ingest_workbook(self, excel_file_path, partial_week=None):
+        """
+        Add and analyze a weekly workbook, then publish it to the master dashboard
+        
+        The week is taken from the file name ("كشوفات الغياب الاسبوعي DD-MM-YYYY(drive).xlsx").
+        A workbook that was already analyzed and has not changed since is skipped.
+        Weeks analyzed before ingestion recorded the workbook's size and
+        modification time are taken as up to date; the file's current ones
+        are recorded so later changes are picked up. By default a week that has not ended yet is analyzed in partial-week
+        mode (see analyze_week).
+        
+        Returns:
+            dict: The week summary, or None if nothing was analyzed
+        """
+        week = week_from_filename(excel_file_path)
+        if week is None:
+            print(f"Skipping {os.path.basename(excel_file_path)}: file name does not contain the week start date")
+            return None
+        
+        stat = os.stat(excel_file_path)
+        source = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        existing = self.weeks_data.get(week['week_id'])
+        if existing and 'summary' in existing and existing.get('source', source) == source:
+            print(f"{week['week_id']} is up to date")
+            if 'source' not in existing:
+                existing['source'] = source
+                self.save_weeks_index()
+            return None
+        
+        week_info = self.add_week(
+            week_id=week['week_id'],
+            start_date=week['start_date'],
+            end_date=week['end_date'],
+            excel_file_path=excel_file_path,
+            description=f"Ingested from {os.path.basename(excel_file_path)}"
+        )
+        week_info['year'] = week['year']
+        week_info['source'] = source
+        
+        if partial_week is None:
+            week_end = week['start'] + timedelta(days=4)
+            partial_week = datetime.now().date() <= week_end.date()
+        
+        summary = self.analyze_week(week['week_id'], excel_file_path, partial_week=partial_week)
+        if summary:
+            self.create_master_dashboard()
+            self.save_weeks_index()
+        return summary
+    
+    def watch(self, folder="Attendance sheets", settle_seconds=5.0, poll_interval=2.0, stop=None):
+        """
+        Daemon mode: ingest every new or updated weekly workbook dropped into `folder`
+        
+        Uses inotify where available and polls otherwise. A file is only
+        ingested once it has stopped changing for `settle_seconds`, so
+        partially copied uploads are not analyzed. A workbook that fails is
+        reported and retried once it changes; the watcher keeps running
+        until interrupted (or until `stop()` returns True).
+        """
+        self.load_weeks_index()
+        
+        def ingest(path):
+            try:
+                self.ingest_workbook(path)
+            except Exception as e:
+                print(f"  - Error ingesting {os.path.basename(path)}: {str(e)}")
+        
+        watcher = FolderWatcher(folder, settle_seconds=settle_seconds, poll_interval=poll_interval)
+        try:
+            watcher.run(ingest, stop)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+    
+    def _all_weeks(self):
+        """
+        Weeks of this analyzer merged with those other processes saved to the index
+        
+        Shared outputs (search index, trackers, feed, not-recorded report)
+        are built from this, so a parallel run's weeks are not dropped.
+        """
+        weeks_data = self.weeks_index.load()
+        weeks_data.update(self.weeks_data)
+        return weeks_data
+    
+    def save_weeks_index(self, compact=True):
+        """
+        Save the weeks this analyzer added or changed to weeks_index.json
+        
+        Only changed weeks are appended to the index journal, so runs in
+        other processes keep their entries; the weeks they saved meanwhile
+        are merged into weeks_data. The journal is then folded into
+        weeks_index.json unless another process is using the index (or
+        compact is off, e.g. between the weeks of a batch).
+        """
+        changed = {
+            week_id: week_info for week_id, week_info in self.weeks_data.items()
+            if self._indexed.get(week_id) != _index_key(week_info)
+        }
+        self.weeks_index.append(changed)
+        for week_id, week_info in self.weeks_index.load().items():
+            if week_id not in changed:
+                self.weeks_data[week_id] = week_info
+        self._indexed = {week_id: _index_key(week_info) for week_id, week_info in self.weeks_data.items()}
+        if compact:
+            self.weeks_index.compact(blocking=False)
     
     def load_weeks_index(self):
         """Load weeks index from JSON"""
-        if os.path.exists('weeks_index.json'):
-            with open('weeks_index.json', 'r', encoding='utf-8') as f:
-                self.weeks_data = json.load(f)
+        self.weeks_data = self.weeks_index.load()
+        self._indexed = {week_id: _index_key(week_info) for week_id, week_info in self.weeks_data.items()}
+
+
+def _index_key(week_info):
+    return json.dumps(week_info, sort_keys=True, ensure_ascii=False)
 
 
 # Usage example and main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze a weekly workbook and update the master dashboard")
+    parser.add_argument('workbook', nargs='?',
+                        default=os.path.join('Attendance sheets', 'كشوفات الغياب الاسبوعي 31-8-2025(drive).xlsx'),
+                        help="weekly workbook named like the Drive downloads (default: the 31 Aug - 4 Sep week)")
+    parser.add_argument('--partial-week', action='store_true', help="mid-week mode, see analyze_week")
+    parser.add_argument('--print-metrics', action='store_true', help="print stage timings and counters")
+    parser.add_argument('--profile', action='store_true',
+                        help="write per-stage cProfile dumps, collapsed stacks and memory peaks")
+    parser.add_argument('--profile-dir', help="folder for the profiles (default: weeks/<week_id>/profile)")
+    args = parser.parse_args()
+    
     # Initialize the multi-week system
-    analyzer = MultiWeekAttendanceAnalyzer()
-    
-    # Add the current week (31 Aug - 4 Sep)
-    week1_info = analyzer.add_week(
-        week_id="week_31Aug-4Sep",
-        start_date="31-Aug",
-        end_date="4-Sep", 
-        excel_file_path=r'Attendance sheets\كشوفات الغياب الاسبوعي 31-8-2025(drive).xlsx',
-        description="First week of September 2025"
+    analyzer = MultiWeekAttendanceAnalyzer(print_metrics=args.print_metrics,
+                                           profile=args.profile, profile_dir=args.profile_dir)
+    analyzer.load_weeks_index()
+    
+    # Add the week named by the workbook (31 Aug - 4 Sep by default)
+    week = week_from_filename(args.workbook)
+    if week is None:
+        parser.error(f"cannot tell the week from the file name: {args.workbook}")
+    week_info = analyzer.add_week(
+        week_id=week['week_id'],
+        start_date=week['start_date'],
+        end_date=week['end_date'],
+        excel_file_path=args.workbook,
+        description=analyzer.weeks_data.get(week['week_id'], {}).get(
+            'description', f"Analyzed from {os.path.basename(args.workbook)}")
     )
+    week_info['year'] = week['year']
     
     # Analyze the week
-    summary = analyzer.analyze_week("week_31Aug-4Sep", week1_info["excel_file"])
+    summary = analyzer.analyze_week(week['week_id'], week_info["excel_file"], partial_week=args.partial_week)
     
     # Create master dashboard
     analyzer.create_master_dashboard()
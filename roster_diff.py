@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+
+def roster_from_records(records, group_registry):
+    """
+    Map person key -> (name, group) from a week's columnar student records
+
+    Groups are reported by their canonical name so that sheet renames are
+    not mistaken for transfers. The first occurrence wins if a person
+    appears in more than one sheet.
+    """
+    roster = {}
+    for key, name, group in zip(records['person_key'], records['name'], records['group']):
+        if key not in roster:
+            roster[key] = (name, group_registry.canonical_name(group))
+    return roster
+
+
+def diff_rosters(previous, current):
+    """
+    Compare two rosters and list joiners, leavers and transfers per group
+
+    Args:
+        previous (dict): person key -> (name, group) for the earlier week
+        current (dict): person key -> (name, group) for the later week
+
+    Runs in linear time: the key sets are hashed once and compared with set
+    operations, then each person is bucketed into their group.
+    """
+    previous_keys = previous.keys()
+    current_keys = current.keys()
+
+    groups = defaultdict(lambda: {'joiners': [], 'leavers': [], 'transfers_in': [], 'transfers_out': []})
+
+    for key in current_keys - previous_keys:
+        name, group = current[key]
+        groups[group]['joiners'].append({'person_key': key, 'name': name})
+
+    for key in previous_keys - current_keys:
+        name, group = previous[key]
+        groups[group]['leavers'].append({'person_key': key, 'name': name})
+
+    transfers = 0
+    for key in current_keys & previous_keys:
+        name, new_group = current[key]
+        old_group = previous[key][1]
+        if new_group != old_group:
+            transfers += 1
+            groups[new_group]['transfers_in'].append({'person_key': key, 'name': name, 'from_group': old_group})
+            groups[old_group]['transfers_out'].append({'person_key': key, 'name': name, 'to_group': new_group})
+
+    summary = {
+        'joiners': sum(len(g['joiners']) for g in groups.values()),
+        'leavers': sum(len(g['leavers']) for g in groups.values()),
+        'transfers': transfers,
+        'previous_total': len(previous),
+        'current_total': len(current),
+    }
+    return {'summary': summary, 'groups': dict(sorted(groups.items()))}
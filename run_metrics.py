@@ -0,0 +1,157 @@
+import contextlib
+import json
+import os
+import time
+from datetime import datetime
+
+
+def _file_signatures(paths):
+    """{file: (size, mtime_ns)} for the given files and every file below the given directories"""
+    signatures = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    stat = os.stat(file_path)
+                    signatures[file_path] = (stat.st_size, stat.st_mtime_ns)
+        elif os.path.isfile(path):
+            stat = os.stat(path)
+            signatures[path] = (stat.st_size, stat.st_mtime_ns)
+    return signatures
+
+
+class RunMetrics:
+    """
+    Wall and CPU time per stage and per sheet, plus counters, for one analysis run
+
+    Stages and sheets are timed with context managers; a stage entered
+    more than once accumulates. Sub-stages are named "<stage>/<part>" and
+    are included in their stage's time. CPU time is this process only, so work done
+    in the group report process pool shows as wall time.
+    """
+
+    enabled = True
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.started = datetime.now()
+        self.stages = {}
+        self.sheets = {}
+        self.counters = {}
+        self.outputs = []
+        self.output_signatures = {}
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.total = None
+        # Optional StageProfiler that also profiles every stage
+        self.profiler = None
+
+    def _timed(self, table, name):
+        # Entries are created on entry, so stages are listed in the order they started
+        entry = table.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry['wall_seconds'] += time.perf_counter() - wall
+            entry['cpu_seconds'] += time.process_time() - cpu
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.profiler is None:
+            yield from self._timed(self.stages, name)
+        else:
+            with self.profiler.stage(name):
+                yield from self._timed(self.stages, name)
+
+    @contextlib.contextmanager
+    def sheet(self, name):
+        yield from self._timed(self.sheets, name)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_sheet(self, sheet_name, name, value):
+        entry = self.sheets.setdefault(sheet_name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+        entry[name] = entry.get(name, 0) + value
+
+    def watch_outputs(self, paths):
+        """Files and directories whose new or changed files count as written by this run"""
+        self.outputs = list(paths)
+        self.output_signatures = _file_signatures(self.outputs)
+
+    def finish(self):
+        self.total = {
+            'wall_seconds': time.perf_counter() - self.wall_start,
+            'cpu_seconds': time.process_time() - self.cpu_start,
+        }
+        if self.outputs:
+            written = [
+                (path, signature) for path, signature in _file_signatures(self.outputs).items()
+                if self.output_signatures.get(path) != signature
+            ]
+            self.counters['files_written'] = len(written)
+            self.counters['bytes_written'] = sum(signature[0] for _, signature in written)
+        return self
+
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'started': self.started.strftime('%Y-%m-%d %H:%M:%S'),
+            'total': self.total,
+            'stages': self.stages,
+            'sheets': self.sheets,
+            'counters': self.counters,
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def print_summary(self, slowest_sheets=5):
+        total_wall = self.total['wall_seconds'] if self.total else sum(s['wall_seconds'] for s in self.stages.values())
+        print(f"\n=== Run Metrics: {self.run_id} ===")
+        print(f"{'stage':<16}{'wall':>10}{'cpu':>10}{'share':>8}")
+        for name, entry in self.stages.items():
+            share = entry['wall_seconds'] / total_wall * 100 if total_wall else 0.0
+            label = '  ' + name.split('/', 1)[1] if '/' in name else name
+            print(f"{label:<16}{entry['wall_seconds']:>9.3f}s{entry['cpu_seconds']:>9.3f}s{share:>7.1f}%")
+        if self.total:
+            print(f"{'total':<16}{self.total['wall_seconds']:>9.3f}s{self.total['cpu_seconds']:>9.3f}s")
+        if self.sheets:
+            print("Slowest sheets:")
+            ranked = sorted(self.sheets.items(), key=lambda item: item[1]['wall_seconds'], reverse=True)
+            for name, entry in ranked[:slowest_sheets]:
+                print(f"  {name:<22}{entry['wall_seconds']:>9.3f}s  {entry.get('rows', 0)} rows")
+        for name, value in self.counters.items():
+            print(f"{name:<16}{value:>10}")
+
+
+class NullMetrics:
+    """Stand-in when metrics are disabled: every call is a no-op"""
+
+    enabled = False
+
+    _context = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def sheet(self, name):
+        return self._context
+
+    def count(self, name, value=1):
+        pass
+
+    def count_sheet(self, sheet_name, name, value):
+        pass
+
+    def watch_outputs(self, paths):
+        pass
+
+    def finish(self):
+        return self
+
+
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+from student_table import StudentTable
+
+# Bump when the parsed student records change shape, so old caches are ignored
+CACHE_VERSION = 7
+
+# Sheet layout: number, name and ID in columns A-C, then 5 days of 4 session columns
+ROSTER_COLUMNS = 3
+SESSIONS_PER_DAY = 4
+DAYS_PER_WEEK = 5
+FIRST_STUDENT_ROW = 4
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _shared_strings(archive):
+    """The workbook's shared string table as a list"""
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f'{MAIN_NS}si':
+                strings.append(''.join(t.text or '' for t in elem.iter(f'{MAIN_NS}t')))
+                elem.clear()
+    return strings
+
+
+def _sheet_parts(archive):
+    """Sheet name -> worksheet XML part, in workbook order"""
+    with archive.open('xl/_rels/workbook.xml.rels') as f:
+        targets = {
+            rel.get('Id'): rel.get('Target')
+            for rel in ET.parse(f).getroot().iter(f'{PKG_REL_NS}Relationship')
+        }
+    with archive.open('xl/workbook.xml') as f:
+        sheets = ET.parse(f).getroot().iter(f'{MAIN_NS}sheet')
+        parts = {}
+        for sheet in sheets:
+            target = targets[sheet.get(f'{REL_NS}id')]
+            parts[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+    return parts
+
+
+def _split_reference(reference):
+    """"AB12" -> (28, 12): 1-based column index and row number"""
+    column = 0
+    for i, char in enumerate(reference):
+        if char.isdigit():
+            return column, int(reference[i:])
+        column = column * 26 + ord(char) - ord('A') + 1
+    return column, 0
+
+
+def workbook_sheet_hashes(excel_file_path):
+    """
+    Content hashes of every sheet of an xlsx workbook
+
+    Hashes the cell references and values read straight from the worksheet
+    XML, with shared-string indexes replaced by the strings themselves, so
+    the hash only changes when a sheet's values change. Formatting changes
+    and a reshuffled shared string table (Excel rewrites it on every save)
+    do not affect it.
+
+    The days that have any value in a student row are flagged as recorded.
+
+    Returns:
+        dict: Sheet name -> {'hash', 'recorded'}, in workbook order
+    """
+    hashes = {}
+    with zipfile.ZipFile(excel_file_path) as archive:
+        strings = _shared_strings(archive)
+        for name, part in _sheet_parts(archive).items():
+            sheet_digest = hashlib.sha1()
+            recorded = [False] * DAYS_PER_WEEK
+            with archive.open(part) as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == f'{MAIN_NS}c':
+                        kind = elem.get('t')
+                        if kind == 'inlineStr':
+                            value = ''.join(t.text or '' for t in elem.iter(f'{MAIN_NS}t'))
+                        else:
+                            v = elem.find(f'{MAIN_NS}v')
+                            value = v.text if v is not None else None
+                            if kind == 's' and value is not None:
+                                value = strings[int(value)]
+                        if value is None:
+                            continue
+                        reference = elem.get('r')
+                        sheet_digest.update(f"{reference}\x1f{value}\x1e".encode('utf-8'))
+
+                        column, row = _split_reference(reference)
+                        day = (column - ROSTER_COLUMNS - 1) // SESSIONS_PER_DAY
+                        if column > ROSTER_COLUMNS and day < DAYS_PER_WEEK and row >= FIRST_STUDENT_ROW and value != '':
+                            recorded[day] = True
+                    elif elem.tag == f'{MAIN_NS}row':
+                        elem.clear()
+            hashes[name] = {
+                'hash': sheet_digest.hexdigest(),
+                'recorded': recorded,
+            }
+    return hashes
+
+
+def recorded_days(df):
+    """Days of a sheet (read with header=None) that have any session value in a student row"""
+    return [
+        bool(df.iloc[FIRST_STUDENT_ROW - 1:, start:start + SESSIONS_PER_DAY].notna().any().any())
+        for start in range(ROSTER_COLUMNS, ROSTER_COLUMNS + DAYS_PER_WEEK * SESSIONS_PER_DAY, SESSIONS_PER_DAY)
+    ]
+
+
+def elapsed_days(recorded_by_sheet):
+    """
+    Number of elapsed days in a week: up to the last day recorded in any sheet
+
+    Days before that count as elapsed even where a group has no entries
+    (e.g. a group that did not meet that day).
+    """
+    last = 0
+    for recorded in recorded_by_sheet:
+        for day, has_data in enumerate(recorded):
+            if has_data:
+                last = max(last, day + 1)
+    return last
+
+
+def partial_stats(students, days_elapsed=DAYS_PER_WEEK):
+    """
+    Mergeable statistics of a StudentTable
+
+    Only counts and sums are kept, so the statistics of several sheets or
+    groups are combined by adding them up (see merge_partials). "Full week"
+    means present on every elapsed and recorded day. Students whose sheet
+    has no recorded day are counted under 'not_recorded' and left out of
+    the categories and the average.
+    """
+    rated = students.rated_days(days_elapsed)
+    attended = students.days_attended
+    counted = rated > 0
+    return {
+        'students': len(students),
+        'full_week': int((counted & (attended == rated)).sum()),
+        'partial': int(((attended > 0) & (attended < rated)).sum()),
+        'never': int((counted & (attended == 0)).sum()),
+        'not_recorded': int((~counted).sum()),
+        # Summed in row order, like the per-student rates are averaged elsewhere
+        'percentage_sum': sum(students.percentage[counted].tolist()),
+    }
+
+
+def merge_partials(partials):
+    """Add up partial statistics"""
+    merged = {'students': 0, 'full_week': 0, 'partial': 0, 'never': 0, 'not_recorded': 0, 'percentage_sum': 0.0}
+    for partial in partials:
+        for key in merged:
+            merged[key] += partial.get(key, 0)
+    return merged
+
+
+def average_attendance(partial):
+    rated = partial['students'] - partial.get('not_recorded', 0)
+    return partial['percentage_sum'] / rated if rated else 0.0
+
+
+def _json_default(value):
+    # numpy scalars read from the sheets (student numbers and IDs)
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class SheetCache:
+    """
+    Parsed students, cell validation and partial statistics of every sheet of a week's workbook
+
+    Entries are keyed by sheet name and hold the sheet's content hash, so a
+    re-downloaded workbook only needs its changed sheets parsed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sheets = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                # Students are stored as columns; the group is set when the sheet is used
+                self.sheets = {
+                    name: dict(entry, students=StudentTable.from_columns(entry['students']))
+                    for name, entry in data['sheets'].items()
+                }
+        return self
+
+    def save(self):
+        sheets = {name: dict(entry, students=entry['students'].to_columns()) for name, entry in self.sheets.items()}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'sheets': sheets}, f, ensure_ascii=False, default=_json_default)
+
+    def get(self, sheet_name, digest):
+        """Cached entry for a sheet if its content hash still matches"""
+        entry = self.sheets.get(sheet_name)
+        if entry is not None and digest is not None and entry['hash'] == digest['hash']:
+            return entry
+        return None
+
+    def put(self, sheet_name, digest, students, recorded, validation=None):
+        entry = {'students': students, 'recorded': recorded, 'validation': validation}
+        if digest is not None:
+            entry['hash'] = digest['hash']
+            self.sheets[sheet_name] = entry
+        return entry
+
+    def partial(self, entry, days_elapsed):
+        """Partial statistics of a sheet, reused while the number of elapsed days is the same"""
+        if entry.get('days_elapsed') != days_elapsed:
+            entry['partial'] = partial_stats(entry['students'], days_elapsed)
+            entry['days_elapsed'] = days_elapsed
+        return entry['partial']
+
+    def retain(self, sheet_names):
+        """Forget sheets that are no longer in the workbook"""
+        self.sheets = {name: entry for name, entry in self.sheets.items() if name in sheet_names}
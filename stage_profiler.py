@@ -0,0 +1,148 @@
+import cProfile
+import contextlib
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    # ';' separates frames and ' ' the count in collapsed-stack lines
+    return label.replace(';', ':')
+
+
+class StackSampler:
+    """
+    Sample the call stack of one thread from a background thread
+
+    Counts identical stacks, which is the collapsed-stack format read by
+    flamegraph.pl, speedscope and similar tools ("outer;inner;leaf count").
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                stack = ';'.join(reversed(labels))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """
+    Per-stage profiles of an analysis run
+
+    For every top-level stage it writes to `output_dir`:
+      <stage>.prof       cProfile stats (open with `python -m pstats` or snakeviz)
+      <stage>.collapsed  sampled stacks for flamegraphs
+    and records the stage's memory high-water mark from tracemalloc. Nested
+    stages run inside their parent's profile. Work in child processes (the
+    group report pool) is not profiled.
+    """
+
+    def __init__(self, output_dir, sample_interval=0.005, top_functions=15):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_functions = top_functions
+        self.stages = {}
+        self.active = None
+        self.started_tracemalloc = False
+        # Run-wide high-water mark, carried over each per-stage reset_peak()
+        self.peak_memory = 0
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        return self
+
+    def stop(self):
+        """Stop memory tracing and write summary.json with every stage's time, peak memory and top functions"""
+        peak = max(self.peak_memory, tracemalloc.get_traced_memory()[1]) if tracemalloc.is_tracing() else None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        summary = {'peak_memory_bytes': peak, 'stages': self.stages}
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        return summary
+
+    def _file_stem(self, name):
+        return re.sub(r'[^\w.-]+', '_', name)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # One profiler can be active at a time; nested stages belong to the outer one
+        if self.active is not None:
+            yield
+            return
+
+        self.active = name
+        if hasattr(tracemalloc, 'reset_peak') and tracemalloc.is_tracing():
+            self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        sampler = StackSampler(threading.get_ident(), self.sample_interval).start()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall = time.perf_counter() - started
+            sampler.stop()
+            self.active = None
+
+            stem = os.path.join(self.output_dir, self._file_stem(name))
+            profile.dump_stats(stem + '.prof')
+            sampler.write_collapsed(stem + '.collapsed')
+
+            # Top functions by cumulative time, kept in the summary for a quick look
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(self.top_functions)
+            entry = self.stages.setdefault(name, {'wall_seconds': 0.0, 'samples': 0})
+            entry['wall_seconds'] += wall
+            entry['samples'] += sum(sampler.stacks.values())
+            entry['peak_memory_bytes'] = max(
+                entry.get('peak_memory_bytes') or 0,
+                tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0,
+            )
+            entry['top_functions'] = text.getvalue().strip().splitlines()[-self.top_functions:]
+
+    def print_summary(self):
+        print(f"\n=== Profile: {self.output_dir} ===")
+        print(f"{'stage':<16}{'wall':>10}{'peak memory':>14}")
+        for name, entry in self.stages.items():
+            print(f"{name:<16}{entry['wall_seconds']:>9.3f}s{entry['peak_memory_bytes'] / 1e6:>11.1f} MB")
@@ -0,0 +1,476 @@
+/*
+ * Shared chart code for the attendance dashboards.
+ *
+ * Each page names its renderer in <body data-page="...">. Week pages embed their
+ * numbers in <script type="application/json" id="dashboard-data">; the master page
+ * loads them from weeks_feed.json. Chart.js is loaded from
+ * static/vendor so the pages also work offline. Pages with a data-search
+ * attribute get the student type-ahead search.
+ */
+(function () {
+    'use strict';
+
+    var COLORS = {
+        full: '#2ca02c',
+        partial: '#ff7f0e',
+        never: '#d62728'
+    };
+
+    function chart(id, config) {
+        var canvas = document.getElementById(id);
+        if (!canvas || typeof Chart === 'undefined') {
+            return null;
+        }
+        return new Chart(canvas.getContext('2d'), config);
+    }
+
+    function escapeHtml(text) {
+        return String(text).replace(/[&<>"']/g, function (c) {
+            return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c];
+        });
+    }
+
+    function fetchJson(url) {
+        return fetch(url, { cache: 'no-cache' }).then(function (response) {
+            if (!response.ok) {
+                throw new Error(url + ': ' + response.status);
+            }
+            return response.json();
+        });
+    }
+
+    function cohortTable(records) {
+        var columns = Object.keys(records[0]).filter(function (c) { return c !== 'cohort'; });
+        var head = '<th>Cohort</th>' + columns.map(function (c) { return '<th>' + escapeHtml(c) + '</th>'; }).join('');
+        var body = records.map(function (record) {
+            return '<tr><td>' + escapeHtml(record.cohort) + '</td>' + columns.map(function (c) {
+                var value = record[c];
+                if (value === null) {
+                    return '<td>-</td>';
+                }
+                return '<td>' + (c === 'Cohort Size' ? value : value.toFixed(1) + '%') + '</td>';
+            }).join('') + '</tr>';
+        }).join('');
+        return '<table class="cohort-table"><thead><tr>' + head + '</tr></thead><tbody>' + body + '</tbody></table>';
+    }
+
+    /*
+     * Student search: type-ahead over search_index.json. Names are normalized
+     * with the same rules as student_search.normalize_arabic, and candidates
+     * are ranked by the number of query trigrams they share. The search box
+     * stays hidden unless the index exists (it is generated, not committed).
+     */
+    var ARABIC_DIACRITICS = /[ؐ-ًؚ-ٰٟۖ-ۭـ]/g;
+    var ARABIC_LETTER_FORMS = {
+        'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+        'ى': 'ي', 'ی': 'ي', 'ئ': 'ي',
+        'ؤ': 'و',
+        'ة': 'ه',
+        'ک': 'ك'
+    };
+
+    function normalizeArabic(text) {
+        return String(text)
+            .replace(ARABIC_DIACRITICS, '')
+            .replace(/[أإآٱىیئؤةک]/g, function (c) { return ARABIC_LETTER_FORMS[c]; })
+            .toLowerCase()
+            .split(/\s+/).filter(Boolean).join(' ');
+    }
+
+    function trigrams(normalized) {
+        var padded = ' ' + normalized + ' ';
+        var grams = {};
+        for (var i = 0; i + 3 <= padded.length; i++) {
+            grams[padded.substr(i, 3)] = true;
+        }
+        return Object.keys(grams);
+    }
+
+    function StudentSearch(index) {
+        this.weeks = index.weeks;
+        this.docs = index.docs;
+        this.names = index.docs.map(function (doc) { return normalizeArabic(doc.n); });
+        this.postings = {};
+        for (var gram in index.postings) {
+            var ids = [];
+            var id = 0;
+            index.postings[gram].forEach(function (delta) {
+                id += delta;
+                ids.push(id);
+            });
+            this.postings[gram] = ids;
+        }
+    }
+
+    StudentSearch.prototype.query = function (text, limit) {
+        var normalized = normalizeArabic(text);
+        var scores = {};
+        var self = this;
+        if (!normalized) {
+            return [];
+        }
+        trigrams(normalized).forEach(function (gram) {
+            (self.postings[gram] || []).forEach(function (id) {
+                scores[id] = (scores[id] || 0) + 1;
+            });
+        });
+        return Object.keys(scores).map(Number).sort(function (a, b) {
+            var exactA = self.names[a].indexOf(normalized) !== -1;
+            var exactB = self.names[b].indexOf(normalized) !== -1;
+            if (exactA !== exactB) {
+                return exactA ? -1 : 1;
+            }
+            return scores[b] - scores[a];
+        }).slice(0, limit).map(function (id) { return self.docs[id]; });
+    };
+
+    function bindSearch(url) {
+        var input = document.getElementById('student-search');
+        var results = document.getElementById('search-results');
+        var panel = input && input.parentNode;
+        var loading = null;
+        if (!input || !results) {
+            return;
+        }
+
+        // A HEAD request only checks the index is there; it is downloaded once the user types
+        fetch(url, { method: 'HEAD', cache: 'no-cache' }).then(function (response) {
+            panel.hidden = !response.ok;
+        }).catch(function () {});
+
+        function render(search) {
+            var matches = search.query(input.value, 10);
+            if (!input.value.trim()) {
+                results.innerHTML = '';
+                return;
+            }
+            if (!matches.length) {
+                results.innerHTML = '<li class="search-empty">No students found</li>';
+                return;
+            }
+            results.innerHTML = matches.map(function (doc) {
+                var weeks = doc.w.map(function (week, i) {
+                    return '<span class="search-week" title="' + escapeHtml(search.weeks[week].label) + '">' +
+                        escapeHtml(search.weeks[week].label.split(',')[0]) + ': ' + doc.a[i] + '%</span>';
+                }).join('');
+                return '<li><strong>' + escapeHtml(doc.n) + '</strong> <span class="search-group">' +
+                    escapeHtml(doc.g) + '</span><div>' + weeks + '</div></li>';
+            }).join('');
+        }
+
+        input.addEventListener('input', function () {
+            loading = loading || fetchJson(url).then(function (index) { return new StudentSearch(index); });
+            loading.then(render).catch(function () {
+                results.innerHTML = '';
+                panel.hidden = true;
+            });
+        });
+    }
+
+    /*
+     * Master dashboard: everything comes from the compact weeks feed. Only one
+     * page of week cards is in the DOM at a time, and a week's group table is
+     * fetched from its data_<week>.json when the user asks for it.
+     */
+    function MasterDashboard(feed, pageSize) {
+        var weeks = feed.weeks;
+        this.feed = feed;
+        this.base = feed.base || 'weeks';
+        this.pageSize = pageSize;
+        this.page = 0;
+        this.details = {};
+        // Newest week first
+        this.order = weeks.id.map(function (_, i) { return i; }).sort(function (a, b) {
+            return weeks.start[b] < weeks.start[a] ? -1 : weeks.start[b] > weeks.start[a] ? 1 : 0;
+        });
+    }
+
+    MasterDashboard.prototype.url = function (id, prefix, extension) {
+        return this.base + '/' + id + '/' + prefix + '_' + id + '.' + extension;
+    };
+
+    MasterDashboard.prototype.renderPage = function () {
+        var self = this;
+        var weeks = this.feed.weeks;
+        var pages = Math.max(1, Math.ceil(this.order.length / this.pageSize));
+        this.page = Math.min(Math.max(0, this.page), pages - 1);
+
+        var slice = this.order.slice(this.page * this.pageSize, (this.page + 1) * this.pageSize);
+        document.getElementById('weeks-grid').innerHTML = slice.map(function (i) {
+            var id = weeks.id[i];
+            return '<div class="week-card">' +
+                '<a class="week-title" href="' + self.url(id, 'dashboard', 'html') + '">Week: ' + escapeHtml(weeks.label[i]) + '</a>' +
+                '<div class="week-stats">' +
+                    '<div class="stat-item"><div class="stat-number">' + weeks.students[i] + '</div><div class="stat-label">Total Students</div></div>' +
+                    '<div class="stat-item"><div class="stat-number">' + weeks.average[i].toFixed(1) + '%</div><div class="stat-label">Average Attendance</div></div>' +
+                '</div>' +
+                '<button class="details-btn" data-index="' + i + '">Group details</button>' +
+            '</div>';
+        }).join('');
+
+        var pager = document.getElementById('weeks-pager');
+        pager.innerHTML = pages > 1
+            ? '<button data-step="-1"' + (this.page === 0 ? ' disabled' : '') + '>&larr; Newer</button>' +
+              '<span>Page ' + (this.page + 1) + ' of ' + pages + '</span>' +
+              '<button data-step="1"' + (this.page === pages - 1 ? ' disabled' : '') + '>Older &rarr;</button>'
+            : '';
+    };
+
+    MasterDashboard.prototype.showDetails = function (index) {
+        var self = this;
+        var weeks = this.feed.weeks;
+        var id = weeks.id[index];
+        var panel = document.getElementById('week-details');
+        panel.hidden = false;
+        panel.innerHTML = '<h2>' + escapeHtml(weeks.label[index]) + '</h2><p>Loading…</p>';
+
+        if (!this.details[id]) {
+            this.details[id] = fetchJson(this.url(id, 'data', 'json'));
+        }
+        this.details[id].then(function (data) {
+            var rows = Object.keys(data.group_stats).map(function (group) {
+                var stats = data.group_stats[group];
+                return '<tr><td>' + escapeHtml(group) + '</td><td>' + stats.total_students + '</td><td>' +
+                    stats.full_week_count + '</td><td>' + stats.partial_count + '</td><td>' +
+                    stats.never_attended_count + '</td><td>' + stats.average_attendance.toFixed(1) + '%</td></tr>';
+            }).join('');
+            panel.innerHTML = '<h2>' + escapeHtml(weeks.label[index]) + '</h2>' +
+                '<p><a href="' + self.url(id, 'dashboard', 'html') + '">Open full dashboard</a></p>' +
+                '<table class="cohort-table"><thead><tr><th>Group</th><th>Students</th><th>Full Week</th>' +
+                '<th>Partial</th><th>Never</th><th>Avg Attendance</th></tr></thead><tbody>' + rows + '</tbody></table>';
+        }).catch(function () {
+            panel.innerHTML = '<h2>' + escapeHtml(weeks.label[index]) + '</h2><p>Week details could not be loaded.</p>';
+        });
+    };
+
+    MasterDashboard.prototype.renderTrends = function () {
+        var feed = this.feed;
+        if (typeof Chart === 'undefined' || !feed.weeks.id.length) {
+            return;
+        }
+        var chronological = this.order.slice().reverse();
+        var labels = chronological.map(function (i) { return feed.weeks.label[i]; });
+        var overall = chronological.map(function (i) { return feed.weeks.average[i]; });
+
+        var select = document.getElementById('trend-group');
+        Object.keys(feed.groups).forEach(function (groupId) {
+            var option = document.createElement('option');
+            option.value = groupId;
+            option.textContent = feed.groups[groupId].name;
+            select.appendChild(option);
+        });
+
+        var trend = chart('trendChart', {
+            type: 'line',
+            data: {
+                labels: labels,
+                datasets: [
+                    { label: 'All groups', data: overall, borderColor: '#3498db', tension: 0.3 },
+                    { label: '', data: [], borderColor: '#ff7f0e', tension: 0.3, hidden: true }
+                ]
+            },
+            options: {
+                responsive: true,
+                spanGaps: true,
+                scales: { y: { beginAtZero: true, max: 100 } }
+            }
+        });
+
+        select.addEventListener('change', function () {
+            var series = feed.groups[select.value];
+            var dataset = trend.data.datasets[1];
+            dataset.hidden = !series;
+            dataset.label = series ? series.name : '';
+            dataset.data = series ? chronological.map(function (i) { return series.average[i]; }) : [];
+            trend.update();
+        });
+        document.getElementById('trends').hidden = false;
+    };
+
+    MasterDashboard.prototype.bind = function () {
+        var self = this;
+        document.getElementById('weeks-pager').addEventListener('click', function (event) {
+            var step = event.target.getAttribute('data-step');
+            if (step) {
+                self.page += parseInt(step, 10);
+                self.renderPage();
+            }
+        });
+        document.getElementById('weeks-grid').addEventListener('click', function (event) {
+            var index = event.target.getAttribute('data-index');
+            if (index !== null) {
+                self.showDetails(parseInt(index, 10));
+            }
+        });
+    };
+
+    var renderers = {
+        master: function () {
+            var body = document.body;
+            var status = document.getElementById('weeks-status');
+
+            fetchJson(body.getAttribute('data-feed')).then(function (feed) {
+                document.getElementById('total-weeks').textContent = feed.weeks.id.length;
+                if (!feed.weeks.id.length) {
+                    status.innerHTML = '<h3>No weeks analyzed yet</h3>' +
+                        '<p>Use the MultiWeekAttendanceAnalyzer to add and analyze attendance data for different weeks.</p>';
+                    return;
+                }
+                status.hidden = true;
+                var dashboard = new MasterDashboard(feed, 12);
+                dashboard.bind();
+                dashboard.renderPage();
+                dashboard.renderTrends();
+            }).catch(function () {
+                status.innerHTML = '<h3>Weeks could not be loaded</h3>' +
+                    '<p>Open this page through a web server (for example <code>python -m http.server</code>) so it can read weeks_feed.json.</p>';
+            });
+
+            fetchJson(body.getAttribute('data-cohorts')).then(function (records) {
+                if (records.length) {
+                    document.getElementById('cohorts-table').innerHTML = cohortTable(records);
+                    document.getElementById('cohorts').hidden = false;
+                }
+            }).catch(function () {});
+        },
+
+        week: function (data) {
+            chart('groupChart', {
+                type: 'bar',
+                data: {
+                    labels: data.groups,
+                    datasets: [
+                        { label: 'Full Week', data: data.full_counts, backgroundColor: COLORS.full },
+                        { label: 'Partial', data: data.partial_counts, backgroundColor: COLORS.partial },
+                        { label: 'Never', data: data.never_counts, backgroundColor: COLORS.never }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    scales: { x: { stacked: true }, y: { stacked: true } }
+                }
+            });
+
+            chart('pieChart', {
+                type: 'pie',
+                data: {
+                    labels: ['Full Week', 'Partial', 'Never'],
+                    datasets: [{
+                        data: [data.full_week, data.partial, data.never],
+                        backgroundColor: [COLORS.full, COLORS.partial, COLORS.never]
+                    }]
+                },
+                options: { responsive: true }
+            });
+        },
+
+        bi: function (data) {
+            chart('groupChart', {
+                type: 'bar',
+                data: {
+                    labels: data.groups,
+                    datasets: [
+                        { label: 'Full Week (5/5)', data: data.full_counts, backgroundColor: '#27ae60', borderColor: '#229954', borderWidth: 1 },
+                        { label: 'Partial (1-4)', data: data.partial_counts, backgroundColor: '#f39c12', borderColor: '#e67e22', borderWidth: 1 },
+                        { label: 'Never Attended', data: data.never_counts, backgroundColor: '#e74c3c', borderColor: '#c0392b', borderWidth: 1 }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    scales: {
+                        x: { stacked: true, ticks: { maxRotation: 45 } },
+                        y: { stacked: true, beginAtZero: true }
+                    },
+                    plugins: { legend: { position: 'top' } }
+                }
+            });
+
+            chart('pieChart', {
+                type: 'pie',
+                data: {
+                    labels: ['Full Week', 'Partial', 'Never Attended'],
+                    datasets: [{
+                        data: [data.full_week, data.partial, data.never],
+                        backgroundColor: ['#27ae60', '#f39c12', '#e74c3c'],
+                        borderColor: ['#229954', '#e67e22', '#c0392b'],
+                        borderWidth: 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: { legend: { position: 'bottom' } }
+                }
+            });
+
+            chart('avgChart', {
+                type: 'bar',
+                data: {
+                    labels: data.groups,
+                    datasets: [{
+                        label: 'Average Attendance %',
+                        data: data.avg_attendance,
+                        backgroundColor: '#3498db',
+                        borderColor: '#2980b9',
+                        borderWidth: 1
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    scales: {
+                        x: { ticks: { maxRotation: 45 } },
+                        y: {
+                            beginAtZero: true,
+                            max: 100,
+                            ticks: { callback: function (value) { return value + '%'; } }
+                        }
+                    },
+                    plugins: { legend: { display: false } }
+                }
+            });
+
+            chart('dailyChart', {
+                type: 'line',
+                data: {
+                    labels: data.days,
+                    datasets: [{
+                        label: 'Students Present',
+                        data: data.daily_counts,
+                        borderColor: '#9b59b6',
+                        backgroundColor: 'rgba(155, 89, 182, 0.2)',
+                        borderWidth: 3,
+                        fill: true,
+                        tension: 0.4,
+                        pointRadius: 6,
+                        pointHoverRadius: 8
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    scales: { y: { beginAtZero: true } },
+                    plugins: { legend: { display: false } }
+                }
+            });
+        }
+    };
+
+    window.AttendanceDashboards = {
+        renderers: renderers, chart: chart, escapeHtml: escapeHtml, fetchJson: fetchJson,
+        normalizeArabic: normalizeArabic, StudentSearch: StudentSearch
+    };
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var page = document.body.getAttribute('data-page');
+        var source = document.getElementById('dashboard-data');
+        if (document.body.hasAttribute('data-search')) {
+            bindSearch(document.body.getAttribute('data-search'));
+        }
+        if (!renderers[page]) {
+            return;
+        }
+        renderers[page](source ? JSON.parse(source.textContent) : null);
+    });
+})();
@@ -0,0 +1,41 @@
+import hashlib
+import re
+
+import pandas as pd
+
+
+def normalize_student_id(student_id):
+    """
+    Return the national ID of a student as a clean digit string
+
+    Excel stores the IDs as floats (e.g. 1105924000.0), so they are converted
+    to integers before being turned into text. Returns None for missing IDs.
+    """
+    if student_id is None or student_id == 'N/A':
+        return None
+    if isinstance(student_id, float):
+        if pd.isna(student_id) or not student_id.is_integer():
+            return None
+        return str(int(student_id))
+    text = re.sub(r'\D', '', str(student_id))
+    return text or None
+
+
+def normalize_name(name):
+    """Collapse whitespace in a student name so the same person always compares equal"""
+    return ' '.join(str(name).split())
+
+
+def person_key(student):
+    """
+    Stable hashed key identifying a person across weeks
+
+    The national ID is used when available, otherwise the normalized name.
+    The key is a short SHA-1 digest so it can be stored and compared cheaply.
+    """
+    student_id = normalize_student_id(student.get('student_id'))
+    if student_id:
+        source = f"id:{student_id}"
+    else:
+        source = f"name:{normalize_name(student['name'])}"
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,121 @@
+import json
+import re
+from collections import defaultdict
+
+from attendance_history import load_recorded_days, load_week_students, week_start_datetime
+
+# Harakat, Quranic marks, superscript alef and tatweel
+ARABIC_DIACRITICS = re.compile('[ؐ-ًؚ-ٰٟۖ-ۭـ]')
+
+ARABIC_LETTER_FORMS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',  # أ إ آ ٱ -> ا
+    'ى': 'ي', 'ی': 'ي', 'ئ': 'ي',  # ى ی ئ -> ي
+    'ؤ': 'و',  # ؤ -> و
+    'ة': 'ه',  # ة -> ه
+    'ک': 'ك',  # ک -> ك
+})
+
+
+def normalize_arabic(text):
+    """
+    Search normalization for Arabic names
+
+    Strips diacritics and tatweel, unifies alef, ya, ta marbuta (ة -> ه) and
+    hamza-seat forms, lowercases Latin letters and collapses whitespace.
+    static/dashboard.js applies the same rules to the query.
+    """
+    text = ARABIC_DIACRITICS.sub('', str(text))
+    text = text.translate(ARABIC_LETTER_FORMS).casefold()
+    return ' '.join(text.split())
+
+
+def trigrams(normalized):
+    """Character trigrams of a normalized name, padded with spaces at both ends"""
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_search_index(weeks_data):
+    """
+    Build the student search index over all analyzed weeks
+
+    Every person gets one document (person key, name, latest group, and the
+    weeks and attendance rates they appear with). Trigram postings map each
+    trigram to the sorted document numbers containing it, delta-encoded to
+    keep the JSON small.
+    """
+    weeks = []
+    for week_id, week_info in weeks_data.items():
+        records = load_week_students(week_info)
+        if records is not None:
+            weeks.append((week_start_datetime(week_info), week_id, week_info, records))
+    weeks.sort(key=lambda item: item[0])
+
+    documents = {}
+    for week_pos, (_, week_id, week_info, records) in enumerate(weeks):
+        rated_days = load_recorded_days(records).sum(axis=1).tolist()
+        for key, name, group, daily, days in zip(records['person_key'], records['name'], records['group'],
+                                                 records['daily_attendance'], rated_days):
+            document = documents.setdefault(key, {'k': key, 'n': name, 'g': group, 'w': [], 'a': []})
+            if document['w'] and document['w'][-1] == week_pos:
+                continue
+            document['n'] = name
+            document['g'] = group
+            document['w'].append(week_pos)
+            document['a'].append(round(sum(daily) / days * 100) if days else 0)
+
+    docs = list(documents.values())
+    postings = defaultdict(list)
+    for doc_id, document in enumerate(docs):
+        for gram in trigrams(normalize_arabic(document['n'])):
+            postings[gram].append(doc_id)
+
+    encoded = {}
+    for gram, doc_ids in postings.items():
+        previous = 0
+        deltas = []
+        for doc_id in doc_ids:
+            deltas.append(doc_id - previous)
+            previous = doc_id
+        encoded[gram] = deltas
+
+    return {
+        'version': 1,
+        'weeks': [
+            {'id': week_id, 'label': f"{info['start_date']} - {info['end_date']}, {info.get('year', 2025)}"}
+            for _, week_id, info, _ in weeks
+        ],
+        'docs': docs,
+        'postings': encoded,
+    }
+
+
+def save_search_index(index, path):
+    """Write the search index as compact JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def search(index, query, limit=10):
+    """
+    Look up students by (part of) their name, ranked by shared trigrams
+
+    Mirrors the type-ahead search of the dashboards; useful from Python and
+    for checking the index.
+    """
+    normalized = normalize_arabic(query)
+    if not normalized:
+        return []
+
+    scores = defaultdict(int)
+    for gram in trigrams(normalized):
+        doc_id = 0
+        for delta in index['postings'].get(gram, []):
+            doc_id += delta
+            scores[doc_id] += 1
+
+    ranked = sorted(
+        scores,
+        key=lambda d: (normalized not in normalize_arabic(index['docs'][d]['n']), -scores[d])
+    )
+    return [index['docs'][d] for d in ranked[:limit]]
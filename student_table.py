@@ -0,0 +1,292 @@
+import sys
+
+import numpy as np
+
+from student_keys import normalize_student_id, person_key
+
+DAYS_PER_WEEK = 5
+SESSIONS_PER_DAY = 4
+
+# Sentinels of the integer columns for cells left empty in the sheet
+MISSING_NUMBER = -1
+MISSING_ID = 0
+
+
+def _is_missing(value):
+    if isinstance(value, str):
+        return value == 'N/A'
+    return value is None or (isinstance(value, (float, np.floating)) and value != value)
+
+
+def _integer_column(values, dtype, missing):
+    """
+    Pack whole-number cell values into an integer array
+
+    Returns None if any value is not a whole number in the dtype's range (or
+    collides with the missing sentinel), so the caller can keep the column as
+    objects instead.
+    """
+    info = np.iinfo(dtype)
+    column = np.full(len(values), missing, dtype=dtype)
+    for i, value in enumerate(values):
+        if _is_missing(value):
+            continue
+        if isinstance(value, (bool, np.bool_)) or not isinstance(value, (int, float, np.integer, np.floating)):
+            return None
+        if not float(value).is_integer() or not info.min <= value <= info.max or value == missing:
+            return None
+        column[i] = int(value)
+    return column
+
+
+def _number_column(values):
+    """Student numbers as int32 (MISSING_NUMBER when empty), or objects ('N/A' when empty) if they are not all whole numbers"""
+    column = _integer_column(values, np.int32, MISSING_NUMBER)
+    if column is None:
+        column = np.array(['N/A' if _is_missing(value) else value for value in values], dtype=object)
+    return column
+
+
+def _id_column(values):
+    """
+    National IDs as uint32 (MISSING_ID when empty)
+
+    IDs are normalized to their digits first (see normalize_student_id).
+    10-digit national and residence IDs fit in uint32; anything longer, or
+    an ID with leading zeros (which an integer would drop, changing its
+    person key), keeps the column as digit strings (None when empty).
+    """
+    digits = [normalize_student_id(None if _is_missing(value) else value) for value in values]
+    column = None
+    if not any(d is not None and d.startswith('0') for d in digits):
+        column = _integer_column([int(d) if d is not None else None for d in digits], np.uint32, MISSING_ID)
+    if column is None:
+        column = np.array(digits, dtype=object)
+    return column
+
+
+class StudentTable:
+    """
+    Columnar student records of a sheet, a group or a whole week
+
+    One row per student, stored as arrays instead of one dict per student:
+      groups, group_ids  the group categories (names and canonical ids)
+      group_codes        int16 category of each student
+      numbers            int32 student numbers (MISSING_NUMBER when empty)
+      names              interned name strings
+      ids                uint32 national IDs (MISSING_ID when empty)
+      sessions           int8 students × 5 days × 4 sessions attendance
+      recorded           int8 students × 5 days, sessions recorded per day
+                         for the student's sheet (4 unless left blank)
+      percentage         float64 attendance rate, set by the analysis
+
+    Daily presence and days attended are derived from the sessions when the
+    table is built.
+    """
+
+    def __init__(self, groups, group_ids, group_codes, numbers, names, ids, sessions, recorded, percentage=None):
+        self.groups = list(groups)
+        self.group_ids = np.asarray(group_ids, dtype=np.int32)
+        self.group_codes = np.asarray(group_codes, dtype=np.int16)
+        self.numbers = numbers
+        self.names = names
+        self.ids = ids
+        self.sessions = np.asarray(sessions, dtype=np.int8).reshape(-1, DAYS_PER_WEEK, SESSIONS_PER_DAY)
+        self.recorded = np.asarray(recorded, dtype=np.int8).reshape(-1, DAYS_PER_WEEK)
+
+        # Present on a day with 3/4 of its recorded sessions (3 of 4 when the whole day is recorded)
+        day_counts = self.sessions.sum(axis=2, dtype=np.int16)
+        self.daily = ((self.recorded > 0) & (day_counts * 4 >= self.recorded * 3)).astype(np.int8)
+        self.days_attended = self.daily.sum(axis=1, dtype=np.int8)
+        self.percentage = self.rates() if percentage is None else np.asarray(percentage, dtype=float)
+
+    @classmethod
+    def build(cls, group_name, group_id, numbers, names, ids, sessions, recorded):
+        """
+        Table of one sheet from its raw columns
+
+        Args:
+            numbers, names, ids (list): Cell values of columns A-C
+            sessions: students × 20 (or × 5 × 4) 0/1 session attendance
+            recorded: students × 5 sessions recorded per day
+        """
+        count = len(names)
+        return cls(
+            [group_name], [group_id if group_id is not None else -1], np.zeros(count, dtype=np.int16),
+            _number_column(list(numbers)),
+            np.array([sys.intern(str(name).strip()) for name in names], dtype=object),
+            _id_column(list(ids)),
+            np.asarray(sessions, dtype=np.int8).reshape(count, DAYS_PER_WEEK, SESSIONS_PER_DAY),
+            np.asarray(recorded, dtype=np.int8).reshape(count, DAYS_PER_WEEK),
+        )
+
+    @classmethod
+    def empty(cls, group_name='', group_id=None):
+        return cls.build(group_name, group_id, [], [], [], np.zeros((0, DAYS_PER_WEEK * SESSIONS_PER_DAY)),
+                         np.zeros((0, DAYS_PER_WEEK)))
+
+    @classmethod
+    def from_records(cls, records):
+        """Table from per-student dicts ('group', 'student_number', 'name', 'student_id', 'session_data', ...)"""
+        records = list(records)
+        groups = {}
+        for record in records:
+            groups.setdefault(record['group'], record.get('group_id'))
+        positions = {group: i for i, group in enumerate(groups)}
+        return cls(
+            list(groups), [-1 if group_id is None else group_id for group_id in groups.values()],
+            np.array([positions[record['group']] for record in records], dtype=np.int16),
+            _number_column([record['student_number'] for record in records]),
+            np.array([sys.intern(str(record['name']).strip()) for record in records], dtype=object),
+            _id_column([record['student_id'] for record in records]),
+            np.array([record['session_data'] for record in records], dtype=np.int8).reshape(len(records), DAYS_PER_WEEK, SESSIONS_PER_DAY),
+            np.array([[SESSIONS_PER_DAY * day for day in record.get('recorded_days', [1] * DAYS_PER_WEEK)]
+                      for record in records], dtype=np.int8).reshape(len(records), DAYS_PER_WEEK),
+        )
+
+    @classmethod
+    def from_columns(cls, columns, group_name='', group_id=None):
+        """Rebuild a one-group table saved with to_columns (e.g. from the sheet cache)"""
+        count = len(columns['names'])
+        return cls.build(
+            group_name, group_id, columns['numbers'], columns['names'], columns['ids'],
+            np.array(columns['sessions'], dtype=np.int8).reshape(count, DAYS_PER_WEEK * SESSIONS_PER_DAY),
+            np.array(columns['recorded'], dtype=np.int8).reshape(count, DAYS_PER_WEEK),
+        )
+
+    def to_columns(self):
+        """JSON-friendly columns (group excluded): numbers and ids are None when empty"""
+        return {
+            'numbers': self.number_values(missing=None),
+            'names': self.names.tolist(),
+            'ids': self.id_strings(),
+            'sessions': self.sessions.reshape(len(self), -1).tolist(),
+            'recorded': self.recorded.tolist(),
+        }
+
+    @classmethod
+    def concat(cls, tables):
+        """Stack tables; group categories are merged by name in order of first appearance"""
+        tables = list(tables)
+        if not tables:
+            return cls.empty()
+        groups, group_ids, codes = [], [], []
+        positions = {}
+        for table in tables:
+            remap = np.empty(len(table.groups), dtype=np.int16)
+            for i, (name, group_id) in enumerate(zip(table.groups, table.group_ids)):
+                if name not in positions:
+                    positions[name] = len(groups)
+                    groups.append(name)
+                    group_ids.append(group_id)
+                remap[i] = positions[name]
+            codes.append(remap[table.group_codes])
+
+        # Integer columns stay packed unless a table had to fall back to objects
+        packed = all(table.numbers.dtype != object and table.ids.dtype != object for table in tables)
+        if packed:
+            numbers = np.concatenate([table.numbers for table in tables])
+            ids = np.concatenate([table.ids for table in tables])
+        else:
+            numbers = _number_column([value for table in tables for value in table.number_values()])
+            ids = _id_column([value for table in tables for value in table.id_values(missing=None)])
+
+        return cls(
+            groups, group_ids, np.concatenate(codes),
+            numbers,
+            np.concatenate([table.names for table in tables]),
+            ids,
+            np.concatenate([table.sessions for table in tables]),
+            np.concatenate([table.recorded for table in tables]),
+            np.concatenate([table.percentage for table in tables]),
+        )
+
+    def take(self, rows):
+        """Table of the given row indexes (or boolean mask), with the same group categories"""
+        return StudentTable(
+            self.groups, self.group_ids, self.group_codes[rows], self.numbers[rows], self.names[rows],
+            self.ids[rows], self.sessions[rows], self.recorded[rows], self.percentage[rows],
+        )
+
+    def set_group(self, group_name, group_id):
+        """Relabel a one-group table (a cached sheet whose group name may have changed)"""
+        self.groups = [group_name]
+        self.group_ids = np.array([group_id if group_id is not None else -1], dtype=np.int32)
+        self.group_codes = np.zeros(len(self), dtype=np.int16)
+        return self
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def group_names(self):
+        """Group name of every student"""
+        return np.array(self.groups, dtype=object)[self.group_codes]
+
+    @property
+    def row_group_ids(self):
+        """Canonical group id of every student"""
+        return self.group_ids[self.group_codes]
+
+    @property
+    def recorded_days(self):
+        """int8 students × 5 flags of the days recorded for each student's sheet"""
+        return (self.recorded > 0).astype(np.int8)
+
+    @property
+    def total_sessions(self):
+        return self.sessions.sum(axis=(1, 2))
+
+    @property
+    def possible_sessions(self):
+        return self.recorded.sum(axis=1)
+
+    def rated_days(self, days_elapsed=DAYS_PER_WEEK):
+        """Days each student is rated over: the elapsed days recorded for their sheet"""
+        return self.recorded_days[:, :days_elapsed].sum(axis=1)
+
+    def rates(self, days_elapsed=DAYS_PER_WEEK):
+        """Attendance % over the rated days (0 for students with none)"""
+        days = self.rated_days(days_elapsed)
+        rates = np.zeros(len(self))
+        rated = days > 0
+        rates[rated] = self.days_attended[rated] / days[rated] * 100
+        return rates
+
+    def number_values(self, missing='N/A'):
+        """Student numbers as Python values, `missing` for empty cells"""
+        if self.numbers.dtype == object:
+            return [missing if value == 'N/A' else value for value in self.numbers]
+        return [missing if value == MISSING_NUMBER else value for value in self.numbers.tolist()]
+
+    def id_values(self, missing='N/A'):
+        """National IDs as Python ints (digit strings if they did not fit), `missing` for empty cells"""
+        if self.ids.dtype == object:
+            return [missing if value is None else value for value in self.ids]
+        return [missing if value == MISSING_ID else value for value in self.ids.tolist()]
+
+    def id_strings(self):
+        """National IDs as digit strings, None for empty cells"""
+        return [None if value == 'N/A' else str(value) for value in self.id_values()]
+
+    def person_keys(self):
+        """Person key (see student_keys.person_key) of every student"""
+        return [
+            person_key({'student_id': student_id, 'name': name})
+            for student_id, name in zip(self.id_values(), self.names)
+        ]
+
+    def by_group(self):
+        """{group name: table of its students}, in category order"""
+        return {
+            group: self.take(np.flatnonzero(self.group_codes == code))
+            for code, group in enumerate(self.groups)
+            if (self.group_codes == code).any()
+        }
+
+    @property
+    def nbytes(self):
+        """Memory held by the columns (shared name strings counted once per distinct name)"""
+        arrays = (self.group_codes, self.numbers, self.names, self.ids, self.sessions, self.recorded,
+                  self.daily, self.days_attended, self.percentage)
+        return sum(array.nbytes for array in arrays) + sum(sys.getsizeof(name) for name in set(self.names))
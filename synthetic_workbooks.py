@@ -0,0 +1,234 @@
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Side
+
+from sheet_cache import DAYS_PER_WEEK, FIRST_STUDENT_ROW, ROSTER_COLUMNS, SESSIONS_PER_DAY
+
+DAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday']
+
+FIRST_NAMES = [
+    'محمد', 'أحمد', 'عبدالله', 'خالد', 'سعد', 'فهد', 'راشد', 'سالم', 'علي', 'إبراهيم',
+    'عبدالرحمن', 'ناصر', 'يوسف', 'حمد', 'ماجد', 'سلطان', 'عمر', 'مشعل', 'بندر', 'تركي',
+]
+FAMILY_NAMES = [
+    'المري', 'الدوسري', 'القحطاني', 'العتيبي', 'الشمري', 'الهاجري', 'الغامدي', 'الزهراني',
+    'العنزي', 'الحربي', 'السبيعي', 'المطيري', 'البقمي', 'الرشيدي', 'الخالدي', 'اليامي',
+]
+GROUP_PREFIXES = ['SAIPEM', 'SAM', 'Alfa', 'Sin', 'Dabal']
+
+THIN = Side(style='thin')
+CELL_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+
+
+def workbook_filename(start):
+    """File name the watcher and backfill recognize ("كشوفات الغياب الاسبوعي DD-MM-YYYY(drive).xlsx")"""
+    return f"كشوفات الغياب الاسبوعي {start:%d-%m-%Y}(drive).xlsx"
+
+
+def group_names(groups):
+    """
+    Sheet names in the style of the real workbooks
+
+    Every third name has a trailing space, as several real sheets do, so the
+    group registry's name normalization is exercised too.
+    """
+    names = []
+    for i in range(groups):
+        name = f"{GROUP_PREFIXES[i % len(GROUP_PREFIXES)]} {i // len(GROUP_PREFIXES) + 1}"
+        names.append(name + ' ' if i % 3 == 2 else name)
+    return names
+
+
+def new_student(rng, used_ids):
+    """A student with a random four-part name, a unique 10-digit ID and an attendance propensity"""
+    name = (f"{rng.choice(FIRST_NAMES)} بن {rng.choice(FIRST_NAMES)} "
+            f"بن {rng.choice(FIRST_NAMES)} {rng.choice(FAMILY_NAMES)}")
+    while True:
+        student_id = rng.randint(1100000000, 1199999999)
+        if student_id not in used_ids:
+            used_ids.add(student_id)
+            break
+    # About 1 in 12 students never attends, the rest attend most days
+    propensity = 0.0 if rng.random() < 0.08 else rng.uniform(0.5, 0.98)
+    return {'name': name, 'student_id': student_id, 'propensity': propensity}
+
+
+def synthetic_roster(groups=20, students_per_group=25, seed=0):
+    """
+    Students of every group
+
+    Returns:
+        dict: Sheet name -> list of students ({'name', 'student_id', 'propensity'})
+    """
+    rng = random.Random(seed)
+    used_ids = set()
+    return {
+        name: [new_student(rng, used_ids) for _ in range(students_per_group)]
+        for name in group_names(groups)
+    }
+
+
+def evolve_roster(roster, churn=0.02, seed=0):
+    """
+    The roster of the following week
+
+    A `churn` fraction of each group leaves and is replaced by new students,
+    and about as many move to another group, so roster diffs, cohorts and
+    transfers see realistic movement.
+    """
+    rng = random.Random(seed)
+    used_ids = {student['student_id'] for students in roster.values() for student in students}
+    names = list(roster)
+    following = {name: list(students) for name, students in roster.items()}
+    for name in names:
+        students = following[name]
+        for _ in range(int(round(len(students) * churn))):
+            if not students:
+                break
+            students.pop(rng.randrange(len(students)))
+            students.append(new_student(rng, used_ids))
+        if len(names) > 1 and students and rng.random() < churn * len(students):
+            student = students.pop(rng.randrange(len(students)))
+            following[rng.choice([other for other in names if other != name])].append(student)
+    return following
+
+
+def day_sessions(rng, propensity):
+    """Four session values for one day: mostly all present or all absent, sometimes a session missed"""
+    if rng.random() < propensity:
+        return [rng.random() > 0.1 for _ in range(SESSIONS_PER_DAY)]
+    return [rng.random() < 0.1 for _ in range(SESSIONS_PER_DAY)]
+
+
+def write_group_sheet(ws, start, students, rng, missing_rate, days_recorded, junk_rows):
+    """Header rows, student rows and trailing junk of one group sheet"""
+    # Rows 1-3: "Names" over A1:C3, then day name, date and session number per day
+    ws.cell(row=1, column=1, value='Names')
+    ws.merge_cells(start_row=1, start_column=1, end_row=FIRST_STUDENT_ROW - 1, end_column=ROSTER_COLUMNS)
+    for day in range(DAYS_PER_WEEK):
+        first = ROSTER_COLUMNS + 1 + day * SESSIONS_PER_DAY
+        last = first + SESSIONS_PER_DAY - 1
+        ws.cell(row=1, column=first, value=DAY_NAMES[day])
+        ws.merge_cells(start_row=1, start_column=first, end_row=1, end_column=last)
+        ws.cell(row=2, column=first, value=start + timedelta(days=day))
+        ws.merge_cells(start_row=2, start_column=first, end_row=2, end_column=last)
+        for session in range(SESSIONS_PER_DAY):
+            ws.cell(row=3, column=first + session, value=session + 1)
+        ws.cell(row=1, column=first).alignment = Alignment(horizontal='center')
+
+    last_column = ROSTER_COLUMNS + DAYS_PER_WEEK * SESSIONS_PER_DAY
+    row = FIRST_STUDENT_ROW
+    for number, student in enumerate(students, 1):
+        values = [number, student['name'], student['student_id']]
+        for day in range(DAYS_PER_WEEK):
+            if day >= days_recorded:
+                values.extend([None] * SESSIONS_PER_DAY)
+                continue
+            for value in day_sessions(rng, student['propensity']):
+                values.append(None if rng.random() < missing_rate else value)
+        for column, value in enumerate(values, 1):
+            if value is not None:
+                ws.cell(row=row, column=column, value=value)
+        row += 1
+
+    # Trailing junk: bordered empty rows, then a signature line below a gap
+    for _ in range(junk_rows):
+        for column in range(1, last_column + 1):
+            ws.cell(row=row, column=column).border = CELL_BORDER
+        row += 1
+    if junk_rows:
+        ws.cell(row=row + 2, column=2, value='توقيع المشرف')
+        ws.cell(row=row + 3, column=2, value='ملاحظات')
+
+
+def write_synthetic_workbook(path, roster=None, start=datetime(2025, 8, 31), groups=20,
+                             students_per_group=25, missing_rate=0.02, junk_rows=5,
+                             days_recorded=DAYS_PER_WEEK, blank_sheet=True, seed=0):
+    """
+    Write a weekly workbook in the layout the analyzer parses
+
+    One sheet per group with 3 header rows, then one row per student:
+    number, name and ID in columns A-C followed by 5 days × 4 session
+    columns (True/False). Like the real workbooks it can end with the empty
+    'الورقة1' sheet.
+
+    Args:
+        path (str): Output .xlsx path
+        roster (dict): Sheet name -> students (see synthetic_roster); generated
+            from `groups`, `students_per_group` and `seed` if not given
+        start (datetime): Sunday the week starts
+        missing_rate (float): Fraction of session cells left empty
+        junk_rows (int): Bordered empty rows after the students, followed by
+            signature lines; 0 for none
+        days_recorded (int): Days with values, for mid-week workbooks
+        blank_sheet (bool): Add the empty 'الورقة1' sheet
+        seed (int): Seed of the attendance values
+
+    Returns:
+        str: `path`
+    """
+    if roster is None:
+        roster = synthetic_roster(groups, students_per_group, seed)
+    rng = random.Random(f"{seed}-{start:%Y%m%d}")
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet_name, students in roster.items():
+        write_group_sheet(wb.create_sheet(sheet_name), start, students, rng,
+                          missing_rate, days_recorded, junk_rows)
+    if blank_sheet:
+        wb.create_sheet('الورقة1')
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    wb.save(path)
+    return path
+
+
+def write_synthetic_weeks(folder, weeks=4, start=datetime(2025, 8, 31), groups=20,
+                          students_per_group=25, churn=0.02, seed=0, **options):
+    """
+    Write consecutive weekly workbooks with an evolving roster
+
+    Files are named like the real downloads, so backfill.py and the folder
+    watcher pick them up. Extra keyword arguments go to write_synthetic_workbook.
+
+    Returns:
+        list: Paths of the written workbooks, oldest week first
+    """
+    roster = synthetic_roster(groups, students_per_group, seed)
+    paths = []
+    for week in range(weeks):
+        week_start = start + timedelta(weeks=week)
+        if week:
+            roster = evolve_roster(roster, churn, seed=seed * 1000 + week)
+        path = os.path.join(folder, workbook_filename(week_start))
+        paths.append(write_synthetic_workbook(path, roster, week_start, seed=seed, **options))
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic weekly attendance workbooks")
+    parser.add_argument('folder')
+    parser.add_argument('--weeks', type=int, default=1)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--students', type=int, default=25, help="students per group")
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--junk-rows', type=int, default=5)
+    parser.add_argument('--days-recorded', type=int, default=DAYS_PER_WEEK)
+    parser.add_argument('--start', default='2025-08-31', help="Sunday of the first week (YYYY-MM-DD)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_synthetic_weeks(
+        args.folder, args.weeks, datetime.strptime(args.start, '%Y-%m-%d'), args.groups, args.students,
+        seed=args.seed, missing_rate=args.missing_rate, junk_rows=args.junk_rows,
+        days_recorded=args.days_recorded,
+    )
+    for path in paths:
+        print(f"Written {path}")
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_watch import week_from_filename
+from synthetic_workbooks import write_synthetic_weeks
+
+
+@pytest.fixture
+def synthetic_weeks(tmp_path):
+    """Three small consecutive weekly workbooks, oldest first"""
+    return write_synthetic_weeks(str(tmp_path / 'sheets'), weeks=3, groups=2, students_per_group=8,
+                                 churn=0.2, junk_rows=0)
+
+
+@pytest.fixture
+def run_weeks(tmp_path, monkeypatch):
+    """
+    Analyze workbooks in the given order in a fresh folder and return the analyzer
+
+    Each call uses its own folder, so two orders of the same weeks can be compared.
+    """
+    from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+    runs = []
+
+    def run(paths, **options):
+        folder = tmp_path / f"run{len(runs)}"
+        folder.mkdir()
+        monkeypatch.chdir(folder)
+        analyzer = MultiWeekAttendanceAnalyzer(str(folder / 'weeks'), metrics=False, **options)
+        for path in paths:
+            week = week_from_filename(path)
+            week_info = analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path)
+            week_info['year'] = week['year']
+            assert analyzer.analyze_week(week['week_id'], path)
+        runs.append(analyzer)
+        return analyzer
+
+    return run
@@ -0,0 +1,146 @@
+import os
+import time
+
+import pytest
+from openpyxl import Workbook
+from PIL import Image, ImageDraw
+
+from artifact_store import MANIFEST, ArtifactStore, load_manifest
+
+
+def write_chart(path, colour='steelblue'):
+    """An anti-aliased RGBA chart-like image"""
+    image = Image.new('RGBA', (600, 400), 'white')
+    draw = ImageDraw.Draw(image)
+    for i in range(8):
+        draw.rectangle([40 + i * 65, 380 - i * 40, 90 + i * 65, 380], fill=colour)
+        draw.line([0, i * 50, 600, i * 50 + 30], fill='grey', width=2)
+    image.save(path)
+
+
+def write_report(path, value=1):
+    wb = Workbook()
+    wb.active.append(['Group', 'Students'])
+    wb.active.append(['Group A', value])
+    wb.save(path)
+
+
+@pytest.fixture
+def week_dir(tmp_path):
+    week = tmp_path / 'weeks' / 'week_1'
+    (week / 'groups').mkdir(parents=True)
+    write_chart(str(week / 'group_distribution.png'))
+    write_report(str(week / 'attendance_report_week_1.xlsx'))
+    (week / 'groups' / 'group_a.html').write_text('<p>Group A</p>', encoding='utf-8')
+    (week / 'data_week_1.json').write_text('{}', encoding='utf-8')
+    return str(week)
+
+
+def store_objects(store):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(store.root) for name in files)
+
+
+def test_publish_links_files_to_their_objects(week_dir):
+    store = ArtifactStore(os.path.join(os.path.dirname(week_dir), 'assets'))
+    stats = store.publish(week_dir)
+
+    manifest = load_manifest(week_dir)
+    assert sorted(manifest) == ['attendance_report_week_1.xlsx', 'group_distribution.png', 'groups/group_a.html']
+    assert stats['files'] == 3 and stats['new_objects'] == 3
+    for name, entry in manifest.items():
+        assert os.path.samefile(os.path.join(week_dir, name), store.object_path(entry))
+    # The chart is stored re-encoded as a palette PNG
+    with Image.open(os.path.join(week_dir, 'group_distribution.png')) as image:
+        assert image.mode == 'P'
+
+
+def test_republish_writes_no_new_objects(week_dir):
+    store = ArtifactStore(os.path.join(os.path.dirname(week_dir), 'assets'))
+    store.publish(week_dir)
+    objects = store_objects(store)
+
+    stats = store.publish(week_dir)
+    assert stats['new_objects'] == 0 and stats['new_bytes'] == 0 and stats['files'] == 3
+    assert store_objects(store) == objects
+
+
+def test_regenerated_week_reuses_objects(week_dir):
+    store = ArtifactStore(os.path.join(os.path.dirname(week_dir), 'assets'))
+    store.publish(week_dir)
+    objects = store_objects(store)
+
+    # What analyze_week does: unlink, write the same outputs again (a later save time), publish
+    store.release(week_dir)
+    assert not os.path.exists(os.path.join(week_dir, 'group_distribution.png'))
+    time.sleep(1)
+    write_chart(os.path.join(week_dir, 'group_distribution.png'))
+    write_report(os.path.join(week_dir, 'attendance_report_week_1.xlsx'))
+    with open(os.path.join(week_dir, 'groups', 'group_a.html'), 'w', encoding='utf-8') as f:
+        f.write('<p>Group A</p>')
+    stats = store.publish(week_dir)
+    assert stats['new_objects'] == 0
+    assert store_objects(store) == objects
+
+    # A changed report is a new object; prune drops the old one
+    store.release(week_dir)
+    write_report(os.path.join(week_dir, 'attendance_report_week_1.xlsx'), value=2)
+    write_chart(os.path.join(week_dir, 'group_distribution.png'))
+    with open(os.path.join(week_dir, 'groups', 'group_a.html'), 'w', encoding='utf-8') as f:
+        f.write('<p>Group A</p>')
+    assert store.publish(week_dir)['new_objects'] == 1
+    assert store.prune([week_dir])[0] == 1
+    assert len(store_objects(store)) == len(objects)
+
+
+def test_webp_without_links_copies_converted_files(week_dir):
+    store = ArtifactStore(os.path.join(os.path.dirname(week_dir), 'assets'), image_format='webp', link_files=False)
+    store.publish(week_dir)
+
+    entry = load_manifest(week_dir)['group_distribution.png']
+    webp = os.path.join(week_dir, 'group_distribution.webp')
+    assert entry['file'] == 'group_distribution.webp'
+    assert not os.path.exists(os.path.join(week_dir, 'group_distribution.png'))
+    assert not os.path.samefile(webp, store.object_path(entry))
+    with Image.open(webp) as image:
+        assert image.format == 'WEBP'
+
+    assert store.publish(week_dir)['new_objects'] == 0
+    assert load_manifest(week_dir)['group_distribution.png'] == entry
+
+
+def test_checkout_restores_files(week_dir):
+    store = ArtifactStore(os.path.join(os.path.dirname(week_dir), 'assets'))
+    store.publish(week_dir)
+    for name in load_manifest(week_dir):
+        os.remove(os.path.join(week_dir, name))
+
+    assert store.checkout(week_dir) == 3
+    assert store.publish(week_dir)['new_objects'] == 0
+    assert os.path.exists(os.path.join(week_dir, MANIFEST))
+
+
+def test_reanalyzed_week_keeps_artifacts_it_does_not_regenerate(tmp_path, monkeypatch):
+    from folder_watch import week_from_filename
+    from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+    from synthetic_workbooks import write_synthetic_weeks
+
+    path = write_synthetic_weeks(str(tmp_path / 'sheets'), weeks=1, groups=2, students_per_group=8, junk_rows=0)[0]
+    monkeypatch.chdir(tmp_path)
+    analyzer = MultiWeekAttendanceAnalyzer(str(tmp_path / 'weeks'), metrics=False)
+    week = week_from_filename(path)
+    week_dir = analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path)['directory']
+    # Outputs of the older scripts that analyze_week no longer writes
+    write_chart(os.path.join(week_dir, 'chart1.png'))
+    write_report(os.path.join(week_dir, 'weekly_attendance_results.xlsx'))
+
+    assert analyzer.analyze_week(week['week_id'], path)
+    first = load_manifest(week_dir)
+    assert {'chart1.png', 'weekly_attendance_results.xlsx'} <= set(first)
+
+    assert analyzer.analyze_week(week['week_id'], path)
+    second = load_manifest(week_dir)
+    assert set(second) == set(first)
+    for name in ('chart1.png', 'weekly_attendance_results.xlsx'):
+        assert second[name] == first[name]
+        assert os.path.samefile(os.path.join(week_dir, name), analyzer.artifacts.object_path(second[name]))
+    assert analyzer.artifacts.prune([week_dir]) == (0, 0)
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from attendance_api import AttendanceAPI, AttendanceStore, window_params
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    """API over two analyzed synthetic weeks (analyzed once for the module)"""
+    from folder_watch import week_from_filename
+    from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+    from synthetic_workbooks import write_synthetic_weeks
+
+    folder = tmp_path_factory.mktemp('api')
+    paths = write_synthetic_weeks(str(folder / 'sheets'), weeks=2, groups=2, students_per_group=8, junk_rows=0)
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        analyzer = MultiWeekAttendanceAnalyzer(str(folder / 'weeks'), metrics=False)
+        for path in paths:
+            week = week_from_filename(path)
+            analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path)['year'] = week['year']
+            assert analyzer.analyze_week(week['week_id'], path)
+        # Left in the journal, so the store is tested reading it
+        analyzer.save_weeks_index(compact=False)
+    finally:
+        os.chdir(cwd)
+    return AttendanceAPI(AttendanceStore(str(folder / 'weeks_index.json'), str(folder / 'weeks')))
+
+
+def get(api, target):
+    status, _, body = api.respond(target, {})
+    return status, json.loads(body) if body else None
+
+
+@pytest.mark.parametrize('value', ['0', '-1', 'abc', '1.5', ''])
+def test_window_params_reject_non_positive_weeks(value):
+    with pytest.raises(ValueError):
+        window_params({'last_weeks': value})
+
+
+def test_window_params():
+    assert window_params({'last_weeks': '2', 'start': '2025-09-01'}) == {'last_weeks': 2, 'start_date': '2025-09-01'}
+
+
+@pytest.mark.parametrize('last_weeks', ['0', '-3', 'x'])
+def test_invalid_window_is_a_bad_request(api, last_weeks):
+    status, body = get(api, f"/api/aggregates?last_weeks={last_weeks}")
+    assert status == 400
+    assert 'last_weeks' in body['error']
+
+
+def test_window_queries(api):
+    status, body = get(api, "/api/aggregates?last_weeks=1")
+    assert status == 200
+
+    status, weeks = get(api, "/api/weeks")
+    assert status == 200 and len(weeks) == 2
+    assert get(api, "/api/weeks/week_missing")[0] == 404
+
+
+def test_store_reads_journaled_weeks(api):
+    # The weeks are still in the journal, not in weeks_index.json
+    assert os.path.getsize(api.store.index_path + '.journal') > 0
+    assert len(api.store.weeks_data) == 2
+
+
+def test_groups_match_sheet_names_with_trailing_spaces(tmp_path):
+    """Group stats saved under the sheet name as typed (no group_id, as in older weeks) are found by id"""
+    week_dir = tmp_path / 'weeks' / 'week_1'
+    week_dir.mkdir(parents=True)
+    stats = {'total_students': 12, 'average_attendance': 87.5, 'full_week_count': 9,
+             'partial_count': 3, 'never_attended_count': 0}
+    (week_dir / 'data_week_1.json').write_text(json.dumps({'group_stats': {'SAIPEM 7 ': stats}}), encoding='utf-8')
+    (tmp_path / 'weeks' / 'group_registry.json').write_text(json.dumps(
+        {'groups': {'2': {'name': 'SAIPEM 7', 'key': 'saipem 7'}}, 'aliases': {}}), encoding='utf-8')
+    (tmp_path / 'weeks_index.json').write_text(json.dumps({'week_1': {
+        'week_id': 'week_1', 'start_date': '31-Aug', 'end_date': '4-Sep', 'directory': str(week_dir)}}), encoding='utf-8')
+    api = AttendanceAPI(AttendanceStore(str(tmp_path / 'weeks_index.json'), str(tmp_path / 'weeks')))
+
+    status, groups = get(api, "/api/groups")
+    assert status == 200
+    assert groups == [{'group_id': 2, 'name': 'SAIPEM 7',
+                       'weeks': {'week_1': {'total_students': 12, 'average_attendance': 87.5}}}]
+    assert api.store.group(2)['weeks'] == {'week_1': stats}
@@ -0,0 +1,36 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from attendance_cohorts import CohortTracker
+from student_table import StudentTable
+
+
+def week_table(ids):
+    sessions = np.ones((len(ids), 20), dtype=np.int8)
+    return StudentTable.build('Group A', 1, list(range(1, len(ids) + 1)), [f"Student {i}" for i in ids],
+                              ids, sessions, np.full((len(ids), 5), 4))
+
+
+def test_older_week_is_refused(tmp_path):
+    tracker = CohortTracker(str(tmp_path / 'cohort_state.json'))
+    assert tracker.update_week('week_7Sep', week_table([1000000001, 1000000002]), datetime(2025, 9, 7))
+    assert tracker.update_week('week_14Sep', week_table([1000000001]), datetime(2025, 9, 14))
+
+    assert not tracker.update_week('week_31Aug', week_table([1000000001, 1000000003]), datetime(2025, 8, 31))
+    assert tracker.weeks == ['week_7Sep', 'week_14Sep']
+    assert set(tracker.first_seen.values()) == {'week_7Sep'}
+
+
+def test_out_of_order_analysis_matches_date_order(synthetic_weeks, run_weeks):
+    in_order = run_weeks(synthetic_weeks)
+    shuffled = run_weeks([synthetic_weeks[1], synthetic_weeks[2], synthetic_weeks[0]])
+
+    cohorts = [
+        json.load(open(os.path.join(analyzer.base_dir, 'cohorts.json'), encoding='utf-8'))
+        for analyzer in (in_order, shuffled)
+    ]
+    assert [row['cohort'] for row in cohorts[1]] == ['week_31Aug-4Sep', 'week_7Sep-11Sep', 'week_14Sep-18Sep']
+    assert cohorts[1] == cohorts[0]
@@ -0,0 +1,73 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from attendance_risk import AttendanceRiskTracker
+from student_table import StudentTable
+
+
+def week_table(ids, present_days, recorded_sessions=4):
+    """One-group table where every student attends the first `present_days` days in full"""
+    sessions = np.zeros((len(ids), 5, 4), dtype=np.int8)
+    sessions[:, :present_days] = 1
+    return StudentTable.build('Group A', 1, list(range(1, len(ids) + 1)), [f"Student {i}" for i in ids],
+                              ids, sessions.reshape(len(ids), -1), np.full((len(ids), 5), recorded_sessions))
+
+
+def test_older_week_is_refused(tmp_path):
+    tracker = AttendanceRiskTracker(str(tmp_path / 'risk_state.json'))
+    ids = [1000000001, 1000000002]
+    assert tracker.update_week('week_7Sep', week_table(ids, 5), datetime(2025, 9, 7))
+    assert tracker.update_week('week_14Sep', week_table(ids, 0), datetime(2025, 9, 14))
+
+    assert not tracker.update_week('week_31Aug', week_table(ids, 5), datetime(2025, 8, 31))
+    assert tracker.weeks == ['week_7Sep', 'week_14Sep']
+    assert tracker.state['consecutive_absent'].tolist() == [5, 5]
+
+
+def test_latest_week_can_be_reapplied(tmp_path):
+    tracker = AttendanceRiskTracker(str(tmp_path / 'risk_state.json'))
+    ids = [1000000001]
+    tracker.update_week('week_7Sep', week_table(ids, 0), datetime(2025, 9, 7))
+    tracker.update_week('week_14Sep', week_table(ids, 0), datetime(2025, 9, 14))
+    assert tracker.update_week('week_14Sep', week_table(ids, 5), datetime(2025, 9, 14))
+    assert tracker.weeks == ['week_7Sep', 'week_14Sep']
+    assert tracker.state['consecutive_absent'].tolist() == [0]
+
+    tracker.save()
+    loaded = AttendanceRiskTracker(tracker.state_path).load()
+    assert loaded.week_starts == ['2025-09-07', '2025-09-14']
+
+
+def test_window_without_recorded_weeks_has_no_rolling_rate(tmp_path, recwarn):
+    tracker = AttendanceRiskTracker(str(tmp_path / 'risk_state.json'), window_weeks=2)
+    ids = [1000000001]
+    tracker.update_week('week_31Aug', week_table(ids, 0), datetime(2025, 8, 31))
+    tracker.update_week('week_7Sep', week_table(ids, 0, recorded_sessions=0), datetime(2025, 9, 7))
+    tracker.update_week('week_14Sep', week_table(ids, 0, recorded_sessions=0), datetime(2025, 9, 14))
+
+    # Still at risk from the streak before the window, with no rate to show
+    rows = tracker.at_risk_by_group('week_14Sep')['Group A']
+    assert rows[0]['consecutive_absent_days'] == 5
+    assert rows[0]['rolling_attendance_rate'] is None
+    json.dumps(rows, allow_nan=False)
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+
+    tracker.save()
+    with open(tracker.state_path, encoding='utf-8') as f:
+        json.loads(f.read(), parse_constant=lambda name: pytest.fail(f"{name} in risk_state.json"))
+
+
+def test_out_of_order_analysis_matches_date_order(synthetic_weeks, run_weeks):
+    in_order = run_weeks(synthetic_weeks)
+    shuffled = run_weeks([synthetic_weeks[1], synthetic_weeks[2], synthetic_weeks[0]])
+
+    states = [
+        json.load(open(os.path.join(analyzer.base_dir, 'risk_state.json'), encoding='utf-8'))
+        for analyzer in (in_order, shuffled)
+    ]
+    assert states[1]['weeks'] == states[0]['weeks']
+    assert states[1]['state'] == states[0]['state']
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import folder_watch
+from folder_watch import week_from_filename
+
+
+def analyzer_in(tmp_path, monkeypatch):
+    from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+    monkeypatch.chdir(tmp_path)
+    return MultiWeekAttendanceAnalyzer(str(tmp_path / 'weeks'), metrics=False)
+
+
+def test_week_without_source_is_not_analyzed_again(synthetic_weeks, tmp_path, monkeypatch):
+    analyzer = analyzer_in(tmp_path, monkeypatch)
+    path = synthetic_weeks[0]
+    week = week_from_filename(path)
+    # A week saved by the older per-week scripts: a summary but no recorded source
+    analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path)['summary'] = {'total_students': 16}
+
+    def analyze_week(*args, **kwargs):
+        raise AssertionError("an analyzed week was analyzed again")
+    monkeypatch.setattr(analyzer, 'analyze_week', analyze_week)
+
+    assert analyzer.ingest_workbook(path) is None
+    assert analyzer.weeks_data[week['week_id']]['source']['size'] == os.path.getsize(path)
+    assert analyzer.ingest_workbook(path) is None
+
+
+def test_watcher_keeps_running_after_a_failed_workbook(synthetic_weeks, tmp_path, monkeypatch):
+    analyzer = analyzer_in(tmp_path, monkeypatch)
+    folder = tmp_path / 'inbox'
+    folder.mkdir()
+    for path in synthetic_weeks[:2]:
+        shutil.copy(path, folder)
+
+    ingested = []
+
+    def ingest_workbook(path):
+        ingested.append(os.path.basename(path))
+        if len(ingested) == 1:
+            raise FileNotFoundError(path)
+    monkeypatch.setattr(analyzer, 'ingest_workbook', ingest_workbook)
+    monkeypatch.setattr(folder_watch.FolderWatcher, '_open_inotify', lambda self: None)
+
+    analyzer.watch(str(folder), settle_seconds=0, poll_interval=0.01, stop=lambda: len(ingested) >= 2)
+    assert sorted(ingested) == sorted(os.path.basename(path) for path in synthetic_weeks[:2])
@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+
+from group_reports import create_group_reports, group_file_stem
+from student_table import StudentTable
+
+
+def group_table(group, group_id):
+    return StudentTable.build(group, group_id, [1, 2], ['Student 1', 'Student 2'], [1000000001, 1000000002],
+                              np.ones((2, 20)), np.full((2, 5), 4))
+
+
+def test_file_stem_includes_the_group_id():
+    assert group_file_stem('Aman+Elc+Fahss', 20) == '20_aman_elc_fahss'
+    assert group_file_stem('Aman+Elc+Fahss') == 'aman_elc_fahss'
+
+
+def test_non_latin_groups_get_separate_reports(tmp_path):
+    group_stats = {
+        'الدفعة الأولى': {'group_id': 1, 'students': group_table('الدفعة الأولى', 1)},
+        'الدفعة الثانية': {'group_id': 2, 'students': group_table('الدفعة الثانية', 2)},
+    }
+    create_group_reports(str(tmp_path), group_stats, 'week 1', max_workers=1)
+
+    assert sorted(os.listdir(tmp_path)) == ['1_group.html', '1_group.xlsx', '2_group.html', '2_group.xlsx']
+    with open(tmp_path / '2_group.html', encoding='utf-8') as f:
+        assert 'الدفعة الثانية' in f.read()
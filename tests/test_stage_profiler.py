@@ -0,0 +1,19 @@
+import json
+import os
+
+from stage_profiler import StageProfiler
+
+
+def test_run_peak_covers_every_stage(tmp_path):
+    profiler = StageProfiler(str(tmp_path / 'profile')).start()
+    with profiler.stage('large'):
+        block = bytearray(8 * 1024 * 1024)
+        del block
+    with profiler.stage('small'):
+        sum(range(1000))
+    summary = profiler.stop()
+
+    assert summary['stages']['large']['peak_memory_bytes'] >= 8 * 1024 * 1024
+    assert summary['peak_memory_bytes'] >= summary['stages']['large']['peak_memory_bytes']
+    with open(os.path.join(str(tmp_path / 'profile'), 'summary.json'), encoding='utf-8') as f:
+        assert json.load(f)['peak_memory_bytes'] == summary['peak_memory_bytes']
@@ -0,0 +1,35 @@
+import numpy as np
+
+from student_keys import person_key
+from student_table import MISSING_ID, StudentTable
+
+
+def _table(ids):
+    count = len(ids)
+    return StudentTable.build('Group A', 1, list(range(1, count + 1)), [f'Student {i}' for i in range(count)],
+                              ids, np.ones((count, 20)), np.full((count, 5), 4))
+
+
+def test_ten_digit_ids_are_packed():
+    table = _table([1105924000.0, '2234567890', None])
+    assert table.ids.dtype == np.uint32
+    assert table.ids[2] == MISSING_ID
+    assert table.id_strings() == ['1105924000', '2234567890', None]
+
+
+def test_leading_zeros_are_kept():
+    table = _table(['00123', 1105924000.0, None])
+    assert table.id_strings() == ['00123', '1105924000', None]
+    assert table.person_keys()[0] == person_key({'student_id': '00123', 'name': 'Student 0'})
+    assert table.person_keys()[0] != person_key({'student_id': '123', 'name': 'Student 0'})
+
+
+def test_leading_zeros_survive_concat_and_columns():
+    packed = _table([1105924000.0])
+    zeros = _table(['0012345678'])
+    table = StudentTable.concat([packed, zeros])
+    assert table.id_strings() == ['1105924000', '0012345678']
+
+    restored = StudentTable.from_columns(zeros.to_columns(), 'Group A', 1)
+    assert restored.id_strings() == ['0012345678']
+    assert restored.person_keys() == zeros.person_keys()
@@ -0,0 +1,32 @@
+import json
+import os
+
+from weeks_feed import load_feed
+
+
+def test_backfilled_weeks_share_the_canonical_group_series(synthetic_weeks, run_weeks):
+    analyzer = run_weeks(synthetic_weeks[:2])
+    analyzer.save_weeks_index()
+
+    # The first week as an older run saved it: sheet names as typed and no group ids
+    week_info = analyzer.weeks_data['week_31Aug-4Sep']
+    path = os.path.join(week_info['directory'], 'data_week_31Aug-4Sep.json')
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    data['group_stats'] = {
+        f"{group.upper()} ": {key: value for key, value in stats.items() if key != 'group_id'}
+        for group, stats in data['group_stats'].items()
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    # Rebuild the feed from the saved data, the older week first
+    os.remove('weeks_feed.json')
+    analyzer.create_master_dashboard()
+
+    feed = load_feed('weeks_feed.json')
+    assert feed['weeks']['id'] == ['week_31Aug-4Sep', 'week_7Sep-11Sep']
+    assert sorted(feed['groups']) == sorted(str(group_id) for group_id in analyzer.group_registry.groups)
+    for group_id, series in feed['groups'].items():
+        assert series['name'] == analyzer.group_registry.name(int(group_id))
+        assert None not in series['average']
@@ -0,0 +1,114 @@
+import json
+import multiprocessing
+import os
+
+from group_registry import GroupRegistry
+from weeks_feed import load_feed
+from weeks_index import WeeksIndex
+
+
+def test_journal_is_replayed_over_the_snapshot(tmp_path):
+    index = WeeksIndex(str(tmp_path / 'weeks_index.json'))
+    index.append({'week_1': {'week_id': 'week_1', 'v': 1}})
+    index.append({'week_2': {'week_id': 'week_2'}, 'week_1': {'week_id': 'week_1', 'v': 2}})
+
+    # Below the threshold appends never write the snapshot
+    assert not os.path.exists(index.path)
+    assert index.load() == {'week_1': {'week_id': 'week_1', 'v': 2}, 'week_2': {'week_id': 'week_2'}}
+
+
+def test_compaction_writes_the_snapshot_and_empties_the_journal(tmp_path):
+    index = WeeksIndex(str(tmp_path / 'weeks_index.json'))
+    index.append({'week_1': {'week_id': 'week_1'}})
+    assert index.compact()
+
+    with open(index.path, encoding='utf-8') as f:
+        assert json.load(f) == {'week_1': {'week_id': 'week_1'}}
+    assert os.path.getsize(index.journal_path) == 0
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_journal_past_the_threshold_is_compacted(tmp_path):
+    index = WeeksIndex(str(tmp_path / 'weeks_index.json'), compact_bytes=200)
+    index.append({'week_1': {'week_id': 'week_1', 'padding': 'x' * 300}})
+    assert os.path.exists(index.path)
+    assert os.path.getsize(index.journal_path) == 0
+
+
+def test_torn_record_is_skipped_and_next_append_survives(tmp_path):
+    index = WeeksIndex(str(tmp_path / 'weeks_index.json'))
+    index.append({'week_1': {'week_id': 'week_1'}})
+    with open(index.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"week_id": "week_2", "we')
+    index.append({'week_3': {'week_id': 'week_3'}})
+
+    assert sorted(index.load()) == ['week_1', 'week_3']
+
+
+def append_weeks(path, worker):
+    index = WeeksIndex(path, compact_bytes=2048)
+    for i in range(20):
+        index.append({f"week_{worker}_{i}": {'worker': worker, 'i': i}})
+
+
+def register_groups(path, worker):
+    registry = GroupRegistry(path).load()
+    registry.register([f"Group {worker}-{i}" for i in range(10)] + ['Shared Group'])
+
+
+def run_workers(target, path, workers=6):
+    processes = [multiprocessing.Process(target=target, args=(path, worker)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def test_parallel_appends_keep_every_week(tmp_path):
+    path = str(tmp_path / 'weeks_index.json')
+    run_workers(append_weeks, path)
+    assert len(WeeksIndex(path).load()) == 6 * 20
+
+
+def test_parallel_registrations_get_distinct_ids(tmp_path):
+    path = str(tmp_path / 'group_registry.json')
+    run_workers(register_groups, path)
+
+    registry = GroupRegistry(path).load()
+    assert len(registry.groups) == 6 * 10 + 1
+    assert sorted(registry.groups) == list(range(1, 6 * 10 + 2))
+
+
+def test_parallel_analyses_share_the_index_and_feed(synthetic_weeks, tmp_path, monkeypatch):
+    """Two analyzers with stale in-memory weeks both end up in the index, feed and search index"""
+    from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+    from folder_watch import week_from_filename
+
+    monkeypatch.chdir(tmp_path)
+    base_dir = str(tmp_path / 'weeks')
+    analyzers = [MultiWeekAttendanceAnalyzer(base_dir, metrics=False) for _ in synthetic_weeks[:2]]
+    for analyzer in analyzers:
+        analyzer.load_weeks_index()
+    for analyzer, path in zip(analyzers, synthetic_weeks):
+        week = week_from_filename(path)
+        analyzer.add_week(week['week_id'], week['start_date'], week['end_date'], path)['year'] = week['year']
+        assert analyzer.analyze_week(week['week_id'], path)
+        analyzer.save_weeks_index()
+
+    week_ids = ['week_31Aug-4Sep', 'week_7Sep-11Sep']
+    assert sorted(WeeksIndex().load()) == sorted(week_ids)
+    assert sorted(load_feed('weeks_feed.json')['weeks']['id']) == sorted(week_ids)
+    # Saving again with nothing changed merges in the week the other analyzer saved
+    analyzers[0].save_weeks_index()
+    assert sorted(analyzers[0].weeks_data) == sorted(week_ids)
+    assert WeeksIndex().load()['week_31Aug-4Sep'] == analyzers[0].weeks_data['week_31Aug-4Sep']
+
+
+def test_single_week_run_reaches_the_snapshot(synthetic_weeks, run_weeks):
+    analyzer = run_weeks(synthetic_weeks[:1])
+    analyzer.save_weeks_index()
+
+    with open('weeks_index.json', encoding='utf-8') as f:
+        assert sorted(json.load(f)) == ['week_31Aug-4Sep']
+    assert os.path.getsize('weeks_index.json.journal') == 0
@@ -4,6 +4,10 @@ import seaborn as sns
 from collections import defaultdict
 import os
 
+from excel_reports import write_attendance_report
+from student_table import StudentTable
+from dashboard_templates import render_page, script_json
+
 # Set up plotting style
 plt.rcParams['font.size'] = 10
 plt.rcParams['figure.figsize'] = (15, 10)
@@ -404,83 +408,14 @@ def create_updated_visualizations(group_stats, all_students, total_full_week, to
 def create_updated_excel_report(group_stats, all_students):
     """Create detailed Excel report with updated data"""
     
-    with pd.ExcelWriter('weekly_attendance_results_31Aug-4Sep.xlsx', engine='openpyxl') as writer:
-        
-        # Main summary sheet
-        summary_data = []
-        for group, stats in group_stats.items():
-            summary_data.append({
-                'Group': group,
-                'Total Students': stats['total_students'],
-                'Full Week (5/5)': stats['full_week_count'],
-                'Partial (1-4)': stats['partial_count'],
-                'Never Attended': stats['never_attended_count'],
-                'Average Attendance %': round(stats['average_attendance'], 1)
-            })
-        
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        # All students details
-        students_data = []
-        for student in all_students:
-            # Calculate session details for each day
-            day_details = []
-            for day_idx, day_sessions in enumerate(student['session_data']):
-                sessions_count = sum(day_sessions)
-                day_details.append(f"{sessions_count}/4")
-            
-            students_data.append({
-                'Group': student['group'],
-                'Student Number': student['student_number'],
-                'Student Name': student['name'],
-                'Student ID': student['student_id'],
-                'Days Attended': student['days_attended'],
-                'Attendance %': round(student['attendance_percentage'], 1),
-                'Total Sessions': f"{student['total_sessions']}/20",
-                'Sun (31-Aug)': '✓' if student['daily_attendance'][0] else '✗',
-                'Mon (1-Sep)': '✓' if student['daily_attendance'][1] else '✗',
-                'Tue (2-Sep)': '✓' if student['daily_attendance'][2] else '✗',
-                'Wed (3-Sep)': '✓' if student['daily_attendance'][3] else '✗',
-                'Thu (4-Sep)': '✓' if student['daily_attendance'][4] else '✗',
-                'Sun Sessions': day_details[0],
-                'Mon Sessions': day_details[1],
-                'Tue Sessions': day_details[2],
-                'Wed Sessions': day_details[3],
-                'Thu Sessions': day_details[4]
-            })
-        
-        all_students_df = pd.DataFrame(students_data)
-        all_students_df.to_excel(writer, sheet_name='All Students', index=False)
-        
-        # Full week students (5/5 days with 3+ sessions each day)
-        full_week_students = [s for s in all_students if s['days_attended'] == 5]
-        if full_week_students:
-            full_week_data = []
-            for student in full_week_students:
-                full_week_data.append({
-                    'Group': student['group'],
-                    'Student Number': student['student_number'],
-                    'Student Name': student['name'],
-                    'Student ID': student['student_id']
-                })
-            full_week_df = pd.DataFrame(full_week_data)
-            full_week_df.to_excel(writer, sheet_name='Full Week Students', index=False)
-        
-        # Never attended students
-        never_students = [s for s in all_students if s['days_attended'] == 0]
-        if never_students:
-            never_data = []
-            for student in never_students:
-                never_data.append({
-                    'Group': student['group'],
-                    'Student Number': student['student_number'],
-                    'Student Name': student['name'],
-                    'Student ID': student['student_id']
-                })
-            never_df = pd.DataFrame(never_data)
-            never_df.to_excel(writer, sheet_name='Never Attended', index=False)
-        
+    write_attendance_report(
+        'weekly_attendance_results_31Aug-4Sep.xlsx', group_stats, StudentTable.from_records(all_students),
+        day_labels=['Sun (31-Aug)', 'Mon (1-Sep)', 'Tue (2-Sep)', 'Wed (3-Sep)', 'Thu (4-Sep)'],
+        session_labels=['Sun Sessions', 'Mon Sessions', 'Tue Sessions', 'Wed Sessions', 'Thu Sessions'],
+        summary_headers=('Group', 'Total Students', 'Full Week (5/5)', 'Partial (1-4)',
+                         'Never Attended', 'Average Attendance %'),
+    )
+    
     print("Weekly Excel report saved as: weekly_attendance_results_31Aug-4Sep.xlsx")
 
 def create_updated_html_dashboard(group_stats, all_students, full_week, partial, never):
@@ -500,384 +435,38 @@ def create_updated_html_dashboard(group_stats, all_students, full_week, partial,
         day_attendance = sum(1 for student in all_students if student['daily_attendance'][day_idx] == 1)
         daily_counts.append(day_attendance)
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Weekly Attendance Analytics Dashboard (31 Aug - 4 Sep 2025)</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-            }}
-            
-            .dashboard-container {{
-                max-width: 1400px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 15px;
-                box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-                padding: 30px;
-            }}
-            
-            .header {{
-                text-align: center;
-                margin-bottom: 40px;
-                color: #333;
-            }}
-            
-            .header h1 {{
-                font-size: 2.5rem;
-                margin: 0;
-                color: #2c3e50;
-            }}
-            
-            .header p {{
-                font-size: 1.1rem;
-                color: #7f8c8d;
-                margin: 10px 0;
-            }}
-            
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 40px;
-            }}
-            
-            .kpi-card {{
-                background: linear-gradient(135deg, #3498db, #2980b9);
-                color: white;
-                padding: 25px;
-                border-radius: 10px;
-                text-align: center;
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                transition: transform 0.3s ease;
-            }}
-            
-            .kpi-card:hover {{
-                transform: translateY(-5px);
-            }}
-            
-            .kpi-card.success {{
-                background: linear-gradient(135deg, #27ae60, #229954);
-            }}
-            
-            .kpi-card.warning {{
-                background: linear-gradient(135deg, #f39c12, #e67e22);
-            }}
-            
-            .kpi-card.danger {{
-                background: linear-gradient(135deg, #e74c3c, #c0392b);
-            }}
-            
-            .kpi-number {{
-                font-size: 2.5rem;
-                font-weight: bold;
-                margin: 0;
-            }}
-            
-            .kpi-label {{
-                font-size: 0.9rem;
-                margin: 5px 0 0 0;
-                opacity: 0.9;
-            }}
-            
-            .charts-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-                gap: 30px;
-                margin-bottom: 40px;
-            }}
-            
-            .chart-card {{
-                background: white;
-                border-radius: 10px;
-                padding: 25px;
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                border: 1px solid #ecf0f1;
-            }}
-            
-            .chart-title {{
-                font-size: 1.3rem;
-                font-weight: bold;
-                color: #2c3e50;
-                margin-bottom: 20px;
-                text-align: center;
-            }}
-            
-            .chart-container {{
-                position: relative;
-                height: 300px;
-            }}
-            
-            .insights {{
-                background: #f8f9fa;
-                border-radius: 10px;
-                padding: 25px;
-                margin-top: 30px;
-                border-left: 5px solid #3498db;
-            }}
-            
-            .insights h3 {{
-                color: #2c3e50;
-                margin-top: 0;
-            }}
-            
-            .insight-item {{
-                margin: 10px 0;
-                padding: 10px;
-                background: white;
-                border-radius: 5px;
-                border-left: 3px solid #3498db;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="dashboard-container">
-            <div class="header">
-                <h1>📊 Weekly Attendance Analytics Dashboard</h1>
-                <h2 style="color: #3498db; margin: 10px 0;">Week of 31 August - 4 September 2025</h2>
-                <p>Comprehensive analysis with updated logic: 3/4 or 4/4 sessions = Full Day Attendance</p>
-                <p><strong>Total Students Analyzed:</strong> {len(all_students)} students from {len(group_stats)} groups</p>
-            </div>
-            
-            <div class="kpi-grid">
-                <div class="kpi-card success">
-                    <div class="kpi-number">{full_week}</div>
-                    <div class="kpi-label">Full Week Attendees</div>
-                </div>
-                <div class="kpi-card warning">
-                    <div class="kpi-number">{partial}</div>
-                    <div class="kpi-label">Partial Attendees</div>
-                </div>
-                <div class="kpi-card danger">
-                    <div class="kpi-number">{never}</div>
-                    <div class="kpi-label">Never Attended</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-number">{sum(s['attendance_percentage'] for s in all_students) / len(all_students):.1f}%</div>
-                    <div class="kpi-label">Overall Avg Attendance</div>
-                </div>
-            </div>
-            
-            <div class="charts-grid">
-                <div class="chart-card">
-                    <div class="chart-title">📊 Weekly Attendance Distribution by Group</div>
-                    <div class="chart-container">
-                        <canvas id="groupChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-card">
-                    <div class="chart-title">🥧 Weekly Attendance Overview</div>
-                    <div class="chart-container">
-                        <canvas id="pieChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-card">
-                    <div class="chart-title">📈 Average Weekly Performance by Group</div>
-                    <div class="chart-container">
-                        <canvas id="avgChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-card">
-                    <div class="chart-title">📅 Daily Attendance Pattern (31 Aug - 4 Sep)</div>
-                    <div class="chart-container">
-                        <canvas id="dailyChart"></canvas>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="insights">
-                <h3>🔍 Key Insights</h3>
-                <div class="insight-item">
-                    <strong>Analysis Period:</strong> Week of 31 August - 4 September 2025 (5 working days)
-                </div>
-                <div class="insight-item">
-                    <strong>Highest Performing Group:</strong> {max(group_stats.keys(), key=lambda g: group_stats[g]['average_attendance'])} 
-                    ({group_stats[max(group_stats.keys(), key=lambda g: group_stats[g]['average_attendance'])]['average_attendance']:.1f}% avg attendance)
-                </div>
-                <div class="insight-item">
-                    <strong>Best Day:</strong> {days[daily_counts.index(max(daily_counts))]} 
-                    ({max(daily_counts)} students present)
-                </div>
-                <div class="insight-item">
-                    <strong>Weekly Completion Rate:</strong> {full_week/len(all_students)*100:.1f}% of students attended all 5 days
-                </div>
-                <div class="insight-item">
-                    <strong>Total Data Analyzed:</strong> {len(group_stats)} groups with {len(all_students)} students
-                </div>
-            </div>
-        </div>
-
-        <script>
-            // Group Attendance Chart (Stacked Bar)
-            const groupCtx = document.getElementById('groupChart').getContext('2d');
-            new Chart(groupCtx, {{
-                type: 'bar',
-                data: {{
-                    labels: {groups},
-                    datasets: [
-                        {{
-                            label: 'Full Week (5/5)',
-                            data: {full_week_counts},
-                            backgroundColor: '#27ae60',
-                            borderColor: '#229954',
-                            borderWidth: 1
-                        }},
-                        {{
-                            label: 'Partial (1-4)',
-                            data: {partial_counts},
-                            backgroundColor: '#f39c12',
-                            borderColor: '#e67e22',
-                            borderWidth: 1
-                        }},
-                        {{
-                            label: 'Never Attended',
-                            data: {never_counts},
-                            backgroundColor: '#e74c3c',
-                            borderColor: '#c0392b',
-                            borderWidth: 1
-                        }}
-                    ]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    scales: {{
-                        x: {{
-                            stacked: true,
-                            ticks: {{
-                                maxRotation: 45
-                            }}
-                        }},
-                        y: {{
-                            stacked: true,
-                            beginAtZero: true
-                        }}
-                    }},
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                        }}
-                    }}
-                }}
-            }});
-
-            // Overall Distribution Pie Chart
-            const pieCtx = document.getElementById('pieChart').getContext('2d');
-            new Chart(pieCtx, {{
-                type: 'pie',
-                data: {{
-                    labels: ['Full Week', 'Partial', 'Never Attended'],
-                    datasets: [{{
-                        data: [{full_week}, {partial}, {never}],
-                        backgroundColor: ['#27ae60', '#f39c12', '#e74c3c'],
-                        borderColor: ['#229954', '#e67e22', '#c0392b'],
-                        borderWidth: 2
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'bottom'
-                        }}
-                    }}
-                }}
-            }});
-
-            // Average Attendance Chart
-            const avgCtx = document.getElementById('avgChart').getContext('2d');
-            new Chart(avgCtx, {{
-                type: 'bar',
-                data: {{
-                    labels: {groups},
-                    datasets: [{{
-                        label: 'Average Attendance %',
-                        data: {avg_attendance},
-                        backgroundColor: '#3498db',
-                        borderColor: '#2980b9',
-                        borderWidth: 1
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    scales: {{
-                        x: {{
-                            ticks: {{
-                                maxRotation: 45
-                            }}
-                        }},
-                        y: {{
-                            beginAtZero: true,
-                            max: 100,
-                            ticks: {{
-                                callback: function(value) {{
-                                    return value + '%';
-                                }}
-                            }}
-                        }}
-                    }},
-                    plugins: {{
-                        legend: {{
-                            display: false
-                        }}
-                    }}
-                }}
-            }});
-
-            // Daily Pattern Chart
-            const dailyCtx = document.getElementById('dailyChart').getContext('2d');
-            new Chart(dailyCtx, {{
-                type: 'line',
-                data: {{
-                    labels: {days},
-                    datasets: [{{
-                        label: 'Students Present',
-                        data: {daily_counts},
-                        borderColor: '#9b59b6',
-                        backgroundColor: 'rgba(155, 89, 182, 0.2)',
-                        borderWidth: 3,
-                        fill: true,
-                        tension: 0.4,
-                        pointRadius: 6,
-                        pointHoverRadius: 8
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    scales: {{
-                        y: {{
-                            beginAtZero: true
-                        }}
-                    }},
-                    plugins: {{
-                        legend: {{
-                            display: false
-                        }}
-                    }}
-                }}
-            }});
-        </script>
-    </body>
-    </html>
-    """
+    best_group = max(group_stats.keys(), key=lambda g: group_stats[g]['average_attendance'])
+    
+    chart_data = {
+        'groups': groups,
+        'full_counts': full_week_counts,
+        'partial_counts': partial_counts,
+        'never_counts': never_counts,
+        'avg_attendance': avg_attendance,
+        'days': days,
+        'daily_counts': daily_counts,
+        'full_week': full_week,
+        'partial': partial,
+        'never': never,
+    }
     
-    with open('weekly_attendance_dashboard_31Aug-4Sep.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    render_page(
+        'bi_dashboard.html', 'weekly_attendance_dashboard_31Aug-4Sep.html',
+        period='31 Aug - 4 Sep 2025',
+        period_long='31 August - 4 September 2025',
+        total_students=len(all_students),
+        total_groups=len(group_stats),
+        full_week=full_week,
+        partial=partial,
+        never=never,
+        overall_average=f"{sum(s['attendance_percentage'] for s in all_students) / len(all_students):.1f}",
+        best_group=best_group,
+        best_group_average=f"{group_stats[best_group]['average_attendance']:.1f}",
+        best_day=days[daily_counts.index(max(daily_counts))],
+        best_day_count=max(daily_counts),
+        completion_rate=f"{full_week/len(all_students)*100:.1f}",
+        chart_data=script_json(chart_data),
+    )
     
     print("Weekly HTML BI Dashboard saved as: weekly_attendance_dashboard_31Aug-4Sep.html")
 
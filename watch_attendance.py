@@ -0,0 +1,7 @@
+from multi_week_analyzer import MultiWeekAttendanceAnalyzer
+
+if __name__ == "__main__":
+    # Analyze every weekly workbook saved into "Attendance sheets" as soon as it is complete.
+    # Workbooks already analyzed are skipped; stop with Ctrl+C.
+    analyzer = MultiWeekAttendanceAnalyzer()
+    analyzer.watch("Attendance sheets")
@@ -0,0 +1,84 @@
+import json
+import os
+
+from attendance_history import week_start_datetime
+
+WEEK_COLUMNS = ('id', 'label', 'start', 'students', 'average', 'full_week', 'partial', 'never', 'groups')
+
+
+def empty_feed():
+    """Skeleton of the master dashboard feed"""
+    return {
+        'version': 1,
+        'weeks': {column: [] for column in WEEK_COLUMNS},
+        'groups': {},
+    }
+
+
+def load_feed(path):
+    """Load the weeks feed, or an empty one if it does not exist yet"""
+    if not os.path.exists(path):
+        return empty_feed()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_feed(feed, path):
+    """Write the feed as compact JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(feed, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def upsert_week(feed, week_info, group_stats):
+    """
+    Add a week to the feed, or replace it if it is already there
+
+    Week summaries are stored column by column, and every group has one
+    series per statistic aligned with the week columns. A new week therefore
+    only appends one value to each column and series.
+    """
+    weeks = feed['weeks']
+    summary = week_info['summary']
+    year = week_info.get('year', 2025)
+    values = {
+        'id': week_info['week_id'],
+        'label': f"{week_info['start_date']} - {week_info['end_date']}, {year}"
+                 + (f" (provisional, {summary['days_elapsed']}/5 days)" if 'days_elapsed' in summary else ''),
+        'start': week_start_datetime(week_info).strftime('%Y-%m-%d'),
+        'students': summary['total_students'],
+        'average': round(summary['average_attendance'], 1),
+        'full_week': summary['full_week'],
+        'partial': summary['partial'],
+        'never': summary['never'],
+        'groups': summary['groups'],
+    }
+
+    if week_info['week_id'] in weeks['id']:
+        position = weeks['id'].index(week_info['week_id'])
+        for column in WEEK_COLUMNS:
+            weeks[column][position] = values[column]
+        for series in feed['groups'].values():
+            series['average'][position] = None
+            series['students'][position] = None
+    else:
+        position = len(weeks['id'])
+        for column in WEEK_COLUMNS:
+            weeks[column].append(values[column])
+        for series in feed['groups'].values():
+            series['average'].append(None)
+            series['students'].append(None)
+
+    for group, stats in group_stats.items():
+        group_id = str(stats['group_id'])
+        if group_id not in feed['groups']:
+            feed['groups'][group_id] = {
+                'name': group,
+                'average': [None] * len(weeks['id']),
+                'students': [None] * len(weeks['id']),
+            }
+        series = feed['groups'][group_id]
+        series['name'] = group
+        series['average'][position] = round(stats['average_attendance'], 1)
+        series['students'][position] = stats['total_students']
+
+    return feed
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import tempfile
+
+from file_lock import file_lock
+
+
+class WeeksIndex:
+    """
+    weeks_index.json shared safely by concurrent analyzer processes
+
+    The index is a snapshot (weeks_index.json, week_id -> week info) plus an
+    append-only journal (weeks_index.json.journal) of one JSON record per
+    updated week. Writers only append the weeks they changed, so two runs
+    (say a backfill and this week's ingest) never drop each other's entries;
+    readers replay the journal over the snapshot. Compaction folds the
+    journal into a new snapshot written to a temporary file and renamed
+    over the old one, so the snapshot is always a complete file.
+
+    Every read, append and compaction holds an exclusive lock on
+    weeks_index.json.lock (see file_lock) for a few milliseconds only.
+    Appends never rewrite the snapshot: the journal is compacted once it
+    grows past compact_bytes, or when compact() is called (e.g. at the end
+    of a batch or before committing the index), and compaction after an
+    append never waits for the lock.
+    """
+
+    def __init__(self, path='weeks_index.json', compact_bytes=64 * 1024):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.compact_bytes = compact_bytes
+
+    def locked(self, blocking=True):
+        """Hold the index lock; yields False (without the lock) if blocking is off and it is taken"""
+        return file_lock(self.path, blocking)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_journal(self):
+        """Journal records in write order; a line cut short by a crash mid-append is skipped"""
+        if not os.path.exists(self.journal_path):
+            return []
+        records = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Skipping an incomplete record in {self.journal_path}")
+        return records
+
+    def _replay(self):
+        weeks_data = self._read_snapshot()
+        records = self._read_journal()
+        for record in records:
+            weeks_data[record['week_id']] = record['week']
+        return weeks_data, len(records)
+
+    def load(self):
+        """All weeks: the snapshot with the journal replayed over it"""
+        with self.locked():
+            weeks_data, _ = self._replay()
+        return weeks_data
+
+    def append(self, weeks):
+        """
+        Record updated weeks (week_id -> week info) in the journal
+
+        The records are written with a single write and fsynced before the
+        lock is released. The snapshot is only rewritten once the journal
+        has grown past compact_bytes, and then only if no other process is
+        using the index.
+        """
+        if not weeks:
+            return
+        lines = ''.join(
+            json.dumps({'week_id': week_id, 'week': week_info}, ensure_ascii=False) + '\n'
+            for week_id, week_info in weeks.items()
+        )
+        data = lines.encode('utf-8')
+        with self.locked():
+            with open(self.journal_path, 'a+b') as f:
+                # Start on a new line if a crashed writer left its last record unfinished
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                journal_bytes = f.tell()
+        if journal_bytes >= self.compact_bytes:
+            self.compact(blocking=False)
+
+    def compact(self, blocking=True):
+        """
+        Fold the journal into a new snapshot
+
+        Returns:
+            bool: False if blocking is off and another process held the lock
+        """
+        with self.locked(blocking) as acquired:
+            if not acquired:
+                return False
+            weeks_data, records = self._replay()
+            if not records:
+                return True
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.weeks_index.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(weeks_data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            # Replaying records already in the snapshot is harmless, so a crash here loses nothing
+            open(self.journal_path, 'w').close()
+        return True
+
+    def mtime(self):
+        """Latest change of the snapshot or journal (None if neither exists), for readers polling for updates"""
+        times = [os.path.getmtime(p) for p in (self.path, self.journal_path) if os.path.exists(p)]
+        return max(times) if times else None
+
+
+def load_weeks_index(path='weeks_index.json'):
+    """Weeks of a weeks index, journal included"""
+    return WeeksIndex(path).load()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold the weeks index journal into weeks_index.json")
+    parser.add_argument('command', choices=['compact'])
+    parser.add_argument('--index', default='weeks_index.json')
+    args = parser.parse_args()
+
+    index = WeeksIndex(args.index)
+    index.compact()
+    print(f"{args.index}: {len(index.load())} weeks, journal compacted")